@@ -0,0 +1,191 @@
+"""
+Outils communs aux benchmarks de l'application.
+
+Les benchmarks se lancent depuis la racine du projet :
+
+    python -m benchmarks.<nom> --help
+
+Ils ne font pas partie de la suite de tests. Chaque scénario s'exécute dans
+son propre processus : les settings Django (et donc Sentry, le cache, la base)
+sont lus une seule fois au démarrage et ne peuvent pas être reconfigurés à chaud.
+"""
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from urllib.parse import unquote_to_bytes
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def setup_django(test_database=True):
+    """
+    Initialise Django et, si demandé, crée une base de test vierge et migrée.
+
+    Args:
+        test_database (bool): Crée la base de test (SQLite en mémoire par défaut)
+            pour ne jamais modifier la base de l'application.
+
+    Returns:
+        None
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'oc_lettings_site.settings')
+    import django
+    django.setup()
+    if test_database:
+        from django.db import connection
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+
+
+def collect_static(directory):
+    """
+    Collecte les fichiers statiques dans directory, comme en production (DEBUG=False).
+
+    Hors DEBUG, {% static %} lit le manifeste écrit par collectstatic : les
+    scénarios qui rendent des pages avec DEBUG=False reçoivent STATIC_ROOT.
+
+    Args:
+        directory (str): Répertoire de destination (STATIC_ROOT).
+
+    Returns:
+        dict: Variables d'environnement à transmettre aux scénarios.
+    """
+    env = {'DEBUG': 'False', 'STATIC_ROOT': directory, 'SENTRY_DSN': ''}
+    subprocess.run([sys.executable, 'manage.py', 'collectstatic', '--noinput'],
+                   cwd=ROOT_DIR, env={**os.environ, **env}, check=True, capture_output=True)
+    return {'STATIC_ROOT': directory}
+
+
+def seed_database(lettings=100, profiles=100):
+    """
+    Remplit la base avec des lettings et des profils factices.
+
+    Args:
+        lettings (int): Nombre de lettings (et d'adresses) à créer.
+        profiles (int): Nombre d'utilisateurs (et de profils) à créer.
+
+    Returns:
+        None
+    """
+    from django.contrib.auth.models import User
+    from lettings.models import Address, Letting
+    from profiles.models import Profile
+
+    Address.objects.bulk_create(
+        Address(id=i, number=i, street=f'Street {i}', city='Springfield', state='IL',
+                zip_code=62701, country_iso_code='USA')
+        for i in range(1, lettings + 1)
+    )
+    Letting.objects.bulk_create(
+        Letting(id=i, title=f'Letting {i}', address_id=i) for i in range(1, lettings + 1)
+    )
+    User.objects.bulk_create(
+        User(id=i, username=f'user{i:06d}', email=f'user{i}@example.com') for i in range(1, profiles + 1)
+    )
+    Profile.objects.bulk_create(
+        Profile(id=i, user_id=i, favorite_city='Springfield') for i in range(1, profiles + 1)
+    )
+
+
+def wsgi_get(application, path, headers=None):
+    """
+    Exécute une requête GET complète sur l'application WSGI, sans réseau.
+
+    Contrairement au Client de test Django, la requête traverse le WSGIHandler
+    réel et donc les intégrations qui l'instrumentent (Sentry).
+
+    Args:
+        application (callable): Application WSGI.
+        path (str): Chemin demandé, query string comprise.
+        headers (dict): En-têtes HTTP supplémentaires (ex: {'If-None-Match': ...}).
+
+    Returns:
+        tuple: (statut HTTP (int), en-têtes (list), corps (bytes)).
+    """
+    from wsgiref.util import setup_testing_defaults
+
+    path_info, _, query = path.partition('?')
+    # Comme un serveur WSGI : chemin décodé des %XX, en octets UTF-8 vus en latin-1
+    environ = {'PATH_INFO': unquote_to_bytes(path_info).decode('iso-8859-1'), 'QUERY_STRING': query,
+               'REQUEST_METHOD': 'GET', 'wsgi.input': io.BytesIO(), 'wsgi.errors': sys.stderr}
+    for name, value in (headers or {}).items():
+        environ['HTTP_' + name.upper().replace('-', '_')] = value
+    setup_testing_defaults(environ)
+
+    result = {}
+
+    def start_response(status, response_headers, exc_info=None):
+        result['status'] = int(status.split(' ', 1)[0])
+        result['headers'] = response_headers
+
+    chunks = application(environ, start_response)
+    try:
+        body = b''.join(chunks)
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+    return result['status'], result['headers'], body
+
+
+def summarize(durations):
+    """
+    Résume une série de durées (en secondes) en millisecondes.
+
+    Args:
+        durations (list[float]): Durées mesurées.
+
+    Returns:
+        dict: count, mean, p50, p95, p99 et max en millisecondes.
+    """
+    ordered = sorted(durations)
+
+    def percentile(p):
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p))] * 1000
+
+    return {
+        'count': len(ordered),
+        'mean_ms': round(statistics.mean(ordered) * 1000, 3),
+        'p50_ms': round(percentile(0.50), 3),
+        'p95_ms': round(percentile(0.95), 3),
+        'p99_ms': round(percentile(0.99), 3),
+        'max_ms': round(ordered[-1] * 1000, 3),
+    }
+
+
+def timed(func, *args, **kwargs):
+    """
+    Exécute func et retourne (résultat, durée en secondes).
+    """
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def run_scenario(module, args, env):
+    """
+    Lance un scénario de benchmark dans un processus séparé.
+
+    Le processus enfant doit écrire un unique document JSON sur sa dernière
+    ligne de sortie standard.
+
+    Args:
+        module (str): Module à exécuter (ex: 'benchmarks.sentry_overhead').
+        args (list[str]): Arguments de ligne de commande du scénario.
+        env (dict): Variables d'environnement ajoutées à celles du parent.
+
+    Returns:
+        dict: Résultat JSON du scénario.
+
+    Raises:
+        RuntimeError: Si le processus enfant échoue.
+    """
+    completed = subprocess.run(
+        [sys.executable, '-m', module] + list(args),
+        cwd=ROOT_DIR, env={**os.environ, **env}, capture_output=True, text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Scénario {args} en échec:\n{completed.stderr}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
@@ -0,0 +1,357 @@
+"""
+Benchmark de bout en bout de chaque URL de l'application sur des bases de tailles croissantes.
+
+Pour chaque taille (1k, 100k et 1M lettings et profils par défaut), une base
+temporaire est générée (setup_production --scale), puis un processus dédié
+exécute les requêtes sur l'application WSGI réelle (oc_lettings_site.wsgi),
+sans réseau, avec DEBUG=False. Chaque URL de oc_lettings_site/urls.py a au
+moins un cas (CASES) ; un cas manquant fait échouer le benchmark.
+
+Mesures par cas : latences p50/p95/p99, nombre de requêtes SQL par requête
+HTTP, pic de mémoire Python alloué pendant une requête (tracemalloc, sur une
+passe séparée pour ne pas fausser les latences) et codes de statut.
+
+Le résultat JSON (--output) peut servir de référence : --compare signale les
+cas dont la latence médiane, le nombre de requêtes SQL ou le pic mémoire ont
+régressé, ainsi que les réponses en erreur. Le p95 sur une centaine de
+requêtes varie trop d'une exécution à l'autre pour servir de seuil.
+
+Usage:
+    python -m benchmarks.endpoints --scales 1000 --requests 50
+    python -m benchmarks.endpoints --output results.json
+    python -m benchmarks.endpoints --compare benchmarks/baseline.json --data-dir /tmp/bench
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime, timezone
+
+from benchmarks import ROOT_DIR, collect_static, run_scenario, setup_django, summarize, timed, wsgi_get
+
+DEFAULT_SCALES = '1000,100000,1000000'
+DEFAULT_BASELINE = os.path.join(ROOT_DIR, 'benchmarks', 'baseline.json')
+
+# Nombre de lettings et de profils différents visités par les cas de détail
+SAMPLE_SIZE = 200
+# Lignes diffusées par les cas de liste de l'API (fin de table, via ?after=)
+API_LIST_ROWS = 1000
+# Clés par lecture groupée de l'API
+API_BATCH_SIZE = 50
+SEARCH_QUERIES = ['loft', 'cozy apartment', 'seattle', 'garden view', 'main st', 'villa miami']
+NEARBY_ZIPS = ['10001', '98101', '60601', '30301', '80201', '2108']
+
+# Seuils de --compare : hausse relative tolérée, et hausses absolues en dessous
+# desquelles un écart est considéré comme du bruit de mesure
+REGRESSION_MIN_MS = 1.0
+REGRESSION_MIN_KIB = 64
+
+
+def build_cases(samples):
+    """
+    Construit les cas mesurés à partir des données de la base.
+
+    Args:
+        samples (dict): scale, letting_ids, usernames et curseurs de milieu de liste.
+
+    Returns:
+        list[dict]: Cas avec 'name', 'url' (nom d'URL couvert) et 'path' (index -> chemin).
+    """
+    from django.urls import reverse
+
+    ids, usernames = samples['letting_ids'], samples['usernames']
+
+    def cycle(values, template):
+        return lambda i: template.format(values[i % len(values)])
+
+    def batch(values):
+        return lambda i: ','.join(str(values[(i + k) % len(values)]) for k in range(API_BATCH_SIZE))
+
+    api_after = max(samples['scale'] - API_LIST_ROWS, 0)
+    lettings_batch, profiles_batch = batch(ids), batch(usernames)
+    return [
+        {'name': 'home', 'url': 'home', 'path': lambda i: reverse('home')},
+        {'name': 'lettings:index', 'url': 'lettings:index', 'path': lambda i: reverse('lettings:index')},
+        {'name': 'lettings:index (mid-list)', 'url': 'lettings:index',
+         'path': lambda i: f"{reverse('lettings:index')}?after={samples['lettings_cursor']}"},
+        {'name': 'lettings:letting', 'url': 'lettings:letting', 'path': cycle(ids, '/lettings/{}/')},
+        {'name': 'lettings:search', 'url': 'lettings:search',
+         'path': cycle(SEARCH_QUERIES, reverse('lettings:search') + '?q={}')},
+        {'name': 'lettings:nearby', 'url': 'lettings:nearby',
+         'path': cycle(NEARBY_ZIPS, reverse('lettings:nearby') + '?zip={}&radius=25')},
+        {'name': 'profiles:index', 'url': 'profiles:index', 'path': lambda i: reverse('profiles:index')},
+        {'name': 'profiles:index (mid-list)', 'url': 'profiles:index',
+         'path': lambda i: f"{reverse('profiles:index')}?after={samples['profiles_cursor']}"},
+        {'name': 'profiles:profile', 'url': 'profiles:profile', 'path': cycle(usernames, '/profiles/{}/')},
+        {'name': f'lettings-api:list ({API_LIST_ROWS} rows)', 'url': 'lettings-api:list',
+         'path': lambda i: f"{reverse('lettings-api:list')}?after={api_after}"},
+        {'name': 'lettings-api:detail', 'url': 'lettings-api:detail', 'path': cycle(ids, '/api/lettings/{}/')},
+        {'name': f'lettings-api:batch ({API_BATCH_SIZE} ids)', 'url': 'lettings-api:batch',
+         'path': lambda i: f"{reverse('lettings-api:batch')}?ids={lettings_batch(i)}"},
+        {'name': f'profiles-api:list ({API_LIST_ROWS} rows)', 'url': 'profiles-api:list',
+         'path': lambda i: f"{reverse('profiles-api:list')}?after={api_after}"},
+        {'name': 'profiles-api:detail', 'url': 'profiles-api:detail', 'path': cycle(usernames, '/api/profiles/{}/')},
+        {'name': f'profiles-api:batch ({API_BATCH_SIZE} usernames)', 'url': 'profiles-api:batch',
+         'path': lambda i: f"{reverse('profiles-api:batch')}?usernames={profiles_batch(i)}"},
+        {'name': 'metrics', 'url': 'metrics', 'path': lambda i: reverse('metrics')},
+        # Les autres pages de l'administration exigent une session authentifiée
+        {'name': 'admin:login', 'url': 'admin', 'path': lambda i: reverse('admin:login')},
+    ]
+
+
+def url_names(patterns=None, namespace=''):
+    """
+    Liste les URLs nommées du projet ; l'administration compte pour une seule URL ('admin').
+
+    Returns:
+        set[str]: Noms qualifiés (ex: 'lettings:letting').
+    """
+    from django.urls import URLResolver, get_resolver
+
+    names = set()
+    for pattern in get_resolver().url_patterns if patterns is None else patterns:
+        if isinstance(pattern, URLResolver):
+            if pattern.namespace == 'admin':
+                names.add('admin')
+                continue
+            prefix = f'{namespace}{pattern.namespace}:' if pattern.namespace else namespace
+            names |= url_names(pattern.url_patterns, prefix)
+        elif pattern.name:
+            names.add(namespace + pattern.name)
+    return names
+
+
+def load_samples(scale, seed):
+    """
+    Tire les identifiants et noms d'utilisateur visités, et les curseurs de milieu de liste.
+    """
+    from lettings.models import Letting
+    from oc_lettings_site.pagination import encode_cursor
+    from profiles.models import Profile
+
+    rng = random.Random(seed)
+    max_id = Letting.objects.order_by('-id').values_list('id', flat=True).first()
+    letting_ids = rng.sample(range(1, max_id + 1), min(SAMPLE_SIZE, max_id))
+    profile_ids = rng.sample(range(1, scale + 1), min(SAMPLE_SIZE, scale))
+    usernames = list(Profile.objects.filter(id__in=profile_ids).values_list('user__username', flat=True))
+    rng.shuffle(usernames)
+    middle = Profile.objects.order_by('user__username').values_list('user__username', flat=True)[scale // 2]
+    return {
+        'scale': scale, 'letting_ids': letting_ids, 'usernames': usernames,
+        'lettings_cursor': encode_cursor(max_id // 2), 'profiles_cursor': encode_cursor(middle),
+    }
+
+
+def measure_case(application, case, requests, warmup, memory_requests):
+    """
+    Mesure un cas : latences, requêtes SQL, statuts, puis pic mémoire sur une passe séparée.
+    """
+    from django.db import connection
+
+    queries = []
+
+    def count_queries(execute, sql, params, many, context):
+        queries[-1] += 1
+        return execute(sql, params, many, context)
+
+    for i in range(warmup):
+        wsgi_get(application, case['path'](i))
+
+    durations, statuses = [], Counter()
+    with connection.execute_wrapper(count_queries):
+        for i in range(requests):
+            queries.append(0)
+            (status, _, _), duration = timed(wsgi_get, application, case['path'](i))
+            durations.append(duration)
+            statuses[status] += 1
+
+    peaks = []
+    tracemalloc.start()
+    try:
+        for i in range(memory_requests):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            wsgi_get(application, case['path'](i))
+            peaks.append(tracemalloc.get_traced_memory()[1] - before)
+    finally:
+        tracemalloc.stop()
+
+    result = summarize(durations)
+    result['queries'] = max(queries)
+    result['peak_kib'] = round(max(peaks) / 1024, 1)
+    result['statuses'] = {str(status): count for status, count in sorted(statuses.items())}
+    return result
+
+
+def run_child(scale, requests, warmup, memory_requests, seed):
+    """
+    Mesure tous les cas sur la base courante (processus enfant) et affiche le résultat JSON.
+    """
+    setup_django(test_database=False)
+    from oc_lettings_site.wsgi import application
+
+    cases = build_cases(load_samples(scale, seed))
+    missing = url_names() - {case['url'] for case in cases}
+    if missing:
+        raise SystemExit(f"URLs sans cas de benchmark: {', '.join(sorted(missing))}")
+
+    results = {case['name']: measure_case(application, case, requests, warmup, memory_requests)
+               for case in cases}
+    print(json.dumps(results))
+
+
+def prepare_database(path, scale):
+    """
+    Crée et remplit la base d'une taille donnée, sauf si elle existe déjà (--data-dir).
+    """
+    if os.path.exists(path):
+        return
+    env = {**os.environ, 'DATABASE_PATH': path, 'DEBUG': 'False'}
+    start = time.perf_counter()
+    for command in (['migrate', '--noinput'], ['setup_production', '--scale', str(scale)]):
+        subprocess.run([sys.executable, 'manage.py'] + command, cwd=ROOT_DIR, env=env,
+                       check=True, capture_output=True)
+    print(f"   base de {scale} lignes générée en {time.perf_counter() - start:.0f}s", file=sys.stderr)
+
+
+def machine_info():
+    """
+    Décrit la machine de mesure, enregistrée dans le résultat : les latences de référence en dépendent.
+
+    Returns:
+        dict: Architecture, système, modèle et nombre de processeurs.
+    """
+    cpu = platform.processor()
+    try:
+        with open('/proc/cpuinfo') as stream:
+            cpu = next((line.split(':', 1)[1].strip() for line in stream if line.startswith('model name')), cpu)
+    except OSError:
+        pass
+    return {'machine': platform.machine(), 'platform': platform.platform(), 'cpu': cpu, 'cpu_count': os.cpu_count()}
+
+
+def git_revision():
+    """
+    Retourne le commit mesuré, ou None hors d'un dépôt git.
+    """
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline, current, threshold):
+    """
+    Compare deux résultats et liste les régressions.
+
+    Args:
+        baseline (dict): Résultat de référence.
+        current (dict): Résultat courant.
+        threshold (float): Hausse relative tolérée (ex: 0.25 pour +25 %).
+
+    Returns:
+        list[str]: Description des régressions (vide si aucune).
+    """
+    regressions = []
+    for scale, cases in current['results'].items():
+        for name, result in cases.items():
+            reference = baseline['results'].get(scale, {}).get(name)
+            if reference is None:
+                continue
+            label = f"{name} @ {scale}"
+            p50, ref_p50 = result['p50_ms'], reference['p50_ms']
+            if p50 > ref_p50 * (1 + threshold) and p50 - ref_p50 > REGRESSION_MIN_MS:
+                regressions.append(f"{label}: p50 {ref_p50} -> {p50} ms")
+            if result['queries'] > reference['queries']:
+                regressions.append(f"{label}: requêtes SQL {reference['queries']} -> {result['queries']}")
+            peak, ref_peak = result['peak_kib'], reference['peak_kib']
+            if peak > ref_peak * (1 + threshold) and peak - ref_peak > REGRESSION_MIN_KIB:
+                regressions.append(f"{label}: pic mémoire {ref_peak} -> {peak} KiB")
+            errors = sum(count for status, count in result['statuses'].items() if int(status) >= 400)
+            if errors:
+                regressions.append(f"{label}: {errors} réponses en erreur")
+    return regressions
+
+
+def print_table(output):
+    print(f"{'cas':<40}{'lignes':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'SQL':>5}{'pic KiB':>10}")
+    for scale, cases in output['results'].items():
+        for name, result in cases.items():
+            print(f"{name:<40}{scale:>9}{result['p50_ms']:>9}{result['p95_ms']:>9}{result['p99_ms']:>9}"
+                  f"{result['queries']:>5}{result['peak_kib']:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--scales', default=DEFAULT_SCALES,
+                        help=f"Tailles de base, séparées par des virgules (défaut: {DEFAULT_SCALES})")
+    parser.add_argument('--requests', type=int, default=100, help="Requêtes mesurées par cas (défaut: 100)")
+    parser.add_argument('--warmup', type=int, default=5, help="Requêtes de chauffe par cas (défaut: 5)")
+    parser.add_argument('--memory-requests', type=int, default=5,
+                        help="Requêtes de la passe de mesure mémoire (défaut: 5)")
+    parser.add_argument('--seed', type=int, default=42, help="Graine du tirage des objets visités")
+    parser.add_argument('--data-dir', help="Conserve et réutilise les bases générées dans ce répertoire")
+    parser.add_argument('--output', help="Écrit le résultat JSON dans ce fichier")
+    parser.add_argument('--compare', nargs='?', const=DEFAULT_BASELINE,
+                        help="Compare à un résultat de référence (défaut: benchmarks/baseline.json)")
+    parser.add_argument('--threshold', type=float, default=0.5,
+                        help="Hausse relative tolérée par --compare (défaut: 0.5, soit +50 %%)")
+    parser.add_argument('--child', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.requests, args.warmup, args.memory_requests, args.seed)
+        return
+
+    scales = [int(scale) for scale in args.scales.split(',') if scale]
+    # Variables d'environnement de l'application mesurée (hors chemins temporaires)
+    settings = {'DEBUG': 'False', 'SENTRY_DSN': ''}
+    output = {
+        'meta': {
+            'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'commit': git_revision(),
+            'python': platform.python_version(), 'sqlite': sqlite3.sqlite_version,
+            **machine_info(),
+            'scales': scales, 'requests': args.requests, 'warmup': args.warmup,
+            'memory_requests': args.memory_requests, 'seed': args.seed, 'settings': settings,
+        },
+        'results': {},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = args.data_dir or tmp
+        os.makedirs(data_dir, exist_ok=True)
+        static_env = collect_static(os.path.join(tmp, 'static'))
+        for scale in scales:
+            path = os.path.join(data_dir, f'bench-{scale}.sqlite3')
+            prepare_database(path, scale)
+            child_args = ['--child', str(scale), '--requests', str(args.requests), '--warmup', str(args.warmup),
+                          '--memory-requests', str(args.memory_requests), '--seed', str(args.seed)]
+            env = {'DATABASE_PATH': path, **settings, **static_env}
+            output['results'][str(scale)] = run_scenario('benchmarks.endpoints', child_args, env)
+
+    if args.output:
+        with open(args.output, 'w') as stream:
+            json.dump(output, stream, indent=2)
+    print_table(output)
+
+    if args.compare:
+        with open(args.compare) as stream:
+            regressions = compare(json.load(stream), output, args.threshold)
+        for regression in regressions:
+            print(f"RÉGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"Aucune régression par rapport à {args.compare}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+"""
+Benchmark du démarrage de gunicorn : disponibilité, premières requêtes et mémoire.
+
+Chaque variante démarre un vrai serveur gunicorn sur une base remplie
+(setup_production --scale) et mesure :
+    - ready_ms : délai entre le lancement et la première connexion TCP acceptée ;
+    - first_wave_ms : latence de W requêtes simultanées envoyées dès que le
+      port répond (W = nombre de workers), c'est-à-dire la première requête
+      de chaque worker, à froid ou préchauffé ;
+    - steady_p50_ms : latence médiane une fois le serveur chaud ;
+    - pss_mib / uss_mib : mémoire proportionnelle et privée (Pss, Private_*)
+      cumulée du maître et des workers, lue dans /proc/<pid>/smaps_rollup.
+
+Variantes :
+    stock : commande d'origine du Dockerfile (workers sync, sans fichier de configuration)
+    tuned : gunicorn.conf.py (preload, préchauffage, gc.freeze, gthread)
+
+Usage:
+    python -m benchmarks.gunicorn_startup
+    python -m benchmarks.gunicorn_startup --workers 4 --runs 5 --scale 100000 --json
+"""
+import argparse
+import http.client
+import json
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import ROOT_DIR, collect_static, summarize
+from benchmarks.endpoints import prepare_database
+
+# Page mesurée : détail d'un letting (URL, ORM, template, logs)
+PATH = '/lettings/1/'
+READY_TIMEOUT = 60
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def get(port, path=PATH):
+    """
+    Exécute une requête GET et retourne (statut, durée en secondes).
+    """
+    start = time.perf_counter()
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=READY_TIMEOUT)
+    try:
+        connection.request('GET', path, headers={'Host': 'localhost'})
+        response = connection.getresponse()
+        response.read()
+        return response.status, time.perf_counter() - start
+    finally:
+        connection.close()
+
+
+def wait_for_port(port, process, start):
+    """
+    Attend que le port accepte les connexions ; retourne le délai en secondes.
+
+    Raises:
+        RuntimeError: Si gunicorn s'arrête ou ne répond pas à temps.
+    """
+    while time.perf_counter() - start < READY_TIMEOUT:
+        if process.poll() is not None:
+            raise RuntimeError(f"gunicorn s'est arrêté (code {process.returncode})")
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.1).close()
+            return time.perf_counter() - start
+        except OSError:
+            time.sleep(0.005)
+    raise RuntimeError("gunicorn ne répond pas")
+
+
+def process_tree(pid):
+    """
+    Retourne le pid du maître et ceux de ses processus enfants (workers).
+    """
+    try:
+        with open(f'/proc/{pid}/task/{pid}/children') as stream:
+            return [pid] + [int(child) for child in stream.read().split()]
+    except OSError:
+        return [pid]
+
+
+def memory_kib(pids):
+    """
+    Cumule Pss et mémoire privée (Private_Clean + Private_Dirty) des processus, en Kio.
+    """
+    pss = uss = 0
+    for pid in pids:
+        try:
+            with open(f'/proc/{pid}/smaps_rollup') as stream:
+                fields = dict(line.split(':', 1) for line in stream if ':' in line)
+        except OSError:
+            continue
+        kib = {name: int(fields.get(name, '0 kB').split()[0]) for name in ('Pss', 'Private_Clean', 'Private_Dirty')}
+        pss += kib['Pss']
+        uss += kib['Private_Clean'] + kib['Private_Dirty']
+    return pss, uss
+
+
+def command(variant, workers, port, empty_config):
+    """
+    Ligne de commande gunicorn d'une variante.
+    """
+    base = [sys.executable, '-m', 'gunicorn', 'oc_lettings_site.wsgi:application', '--bind', f'127.0.0.1:{port}']
+    if variant == 'stock':
+        # Fichier de configuration vide : empêche le chargement de gunicorn.conf.py
+        return base + ['--workers', str(workers), '--config', empty_config]
+    return base + ['--config', 'gunicorn.conf.py']
+
+
+def run_once(variant, workers, requests, env, empty_config):
+    """
+    Démarre gunicorn, mesure une fois puis l'arrête.
+
+    Returns:
+        dict: ready_ms, first_wave_ms (max et moyenne), steady_p50_ms, pss_mib et uss_mib.
+    """
+    port = free_port()
+    start = time.perf_counter()
+    process = subprocess.Popen(command(variant, workers, port, empty_config), cwd=ROOT_DIR, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        ready = wait_for_port(port, process, start)
+        with ThreadPoolExecutor(workers) as pool:
+            first_wave = list(pool.map(lambda _: get(port), range(workers)))
+        if any(status != 200 for status, _ in first_wave):
+            raise RuntimeError(f"Réponses en erreur: {[status for status, _ in first_wave]}")
+        steady = [get(port)[1] for _ in range(requests)]
+        pss, uss = memory_kib(process_tree(process.pid))
+    finally:
+        process.send_signal(signal.SIGTERM)
+        process.wait(timeout=READY_TIMEOUT)
+    latencies = [duration for _, duration in first_wave]
+    return {
+        'ready_ms': round(ready * 1000, 1),
+        'first_wave_max_ms': round(max(latencies) * 1000, 1),
+        'first_wave_mean_ms': round(statistics.mean(latencies) * 1000, 1),
+        'steady_p50_ms': summarize(steady)['p50_ms'],
+        'pss_mib': round(pss / 1024, 1),
+        'uss_mib': round(uss / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--workers', type=int, default=3, help="Workers par serveur (défaut: 3, comme le Dockerfile)")
+    parser.add_argument('--runs', type=int, default=3, help="Démarrages par variante, médiane retenue (défaut: 3)")
+    parser.add_argument('--requests', type=int, default=50, help="Requêtes de la mesure à chaud (défaut: 50)")
+    parser.add_argument('--scale', type=int, default=1000, help="Lettings et profils de la base (défaut: 1000)")
+    parser.add_argument('--data-dir', help="Conserve et réutilise la base générée dans ce répertoire")
+    parser.add_argument('--json', action='store_true', help="Affiche le résultat en JSON")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = args.data_dir or tmp
+        os.makedirs(data_dir, exist_ok=True)
+        database = os.path.join(data_dir, f'bench-{args.scale}.sqlite3')
+        prepare_database(database, args.scale)
+        empty_config = os.path.join(tmp, 'stock.conf.py')
+        open(empty_config, 'w').close()
+        env = {**os.environ, 'DATABASE_PATH': database, 'DEBUG': 'False', 'SENTRY_DSN': '',
+               'GUNICORN_WORKERS': str(args.workers), **collect_static(os.path.join(tmp, 'static'))}
+        # Métriques en processus pour stock, comme avant gunicorn.conf.py
+        env.pop('PROMETHEUS_MULTIPROC_DIR', None)
+        for variant in ('stock', 'tuned'):
+            runs = [run_once(variant, args.workers, args.requests, env, empty_config) for _ in range(args.runs)]
+            results[variant] = {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+
+    if args.json:
+        print(json.dumps(results))
+        return
+    columns = list(results['stock'])
+    print(f"{'variante':<8} " + ' '.join(f'{column:>18}' for column in columns))
+    for variant, result in results.items():
+        print(f"{variant:<8} " + ' '.join(f'{result[column]:>18}' for column in columns))
+
+
+if __name__ == '__main__':
+    main()
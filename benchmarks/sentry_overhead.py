@@ -0,0 +1,169 @@
+"""
+Benchmark du coût par requête de l'intégration Sentry.
+
+Un faux serveur Sentry local reçoit les envois (aucun trafic sortant). Chaque
+scénario démarre un processus avec sa propre configuration SENTRY_*, exécute
+les mêmes requêtes sur l'application WSGI réelle, puis vide la file d'envoi
+de Sentry. Le résultat compare la latence et le nombre de transactions reçues
+par rapport au scénario sans Sentry.
+
+Usage:
+    python -m benchmarks.sentry_overhead
+    python -m benchmarks.sentry_overhead --requests 2000 --only disabled,routed
+    python -m benchmarks.sentry_overhead --json > sentry.json
+"""
+import argparse
+import gzip
+import json
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks import collect_static, run_scenario, seed_database, setup_django, summarize, timed, wsgi_get
+
+PATHS = ['/', '/lettings/', '/lettings/1/', '/profiles/', '/profiles/user000001/', '/inexistant/']
+
+SCENARIOS = {
+    'disabled': {'SENTRY_DSN': ''},
+    'flat-100': {'SENTRY_TRACES_SAMPLE_RATE': '1.0'},
+    'flat-100-no-spans': {
+        'SENTRY_TRACES_SAMPLE_RATE': '1.0',
+        'SENTRY_MIDDLEWARE_SPANS': 'false',
+        'SENTRY_SIGNALS_SPANS': 'false',
+    },
+    'flat-10': {'SENTRY_TRACES_SAMPLE_RATE': '0.1'},
+    'routed': {
+        'SENTRY_TRACES_SAMPLE_RATE': '0.1',
+        'SENTRY_TRACES_ROUTE_RATES': 'lettings:index=0.01,profiles:index=0.01',
+        'SENTRY_TRACES_CANDIDATE_RATE': '0.25',
+        'SENTRY_TRACES_SLOW_MS': '200',
+    },
+}
+
+
+def count_transactions(envelope):
+    """
+    Compte les items de type transaction d'une envelope Sentry.
+
+    Les en-têtes d'items et les événements ont tous deux un champ type : seuls
+    les en-têtes (sans event_id) sont comptés.
+    """
+    count = 0
+    for line in envelope.split(b'\n')[1:]:
+        try:
+            item = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(item, dict) and item.get('type') == 'transaction' and 'event_id' not in item:
+            count += 1
+    return count
+
+
+class FakeSentryHandler(BaseHTTPRequestHandler):
+    """
+    Point d'entrée Sentry factice : accepte les envelopes et compte les transactions.
+    """
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if self.headers.get('Content-Encoding') == 'gzip':
+            body = gzip.decompress(body)
+        with self.server.lock:
+            self.server.stats['envelopes'] += 1
+            self.server.stats['bytes'] += len(body)
+            self.server.stats['transactions'] += count_transactions(body)
+        self.send_response(200)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'{}')
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fake_sentry():
+    """
+    Démarre le faux serveur Sentry sur un port libre, dans un thread.
+
+    Returns:
+        ThreadingHTTPServer: Serveur dont l'attribut stats compte les envois.
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeSentryHandler)
+    server.lock = threading.Lock()
+    server.stats = {'envelopes': 0, 'bytes': 0, 'transactions': 0}
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_child(requests, seed):
+    """
+    Exécute le scénario courant (processus enfant) et affiche son résultat JSON.
+    """
+    setup_django()
+    seed_database(lettings=seed, profiles=seed)
+
+    import sentry_sdk
+    from oc_lettings_site.wsgi import application
+
+    for path in PATHS:
+        wsgi_get(application, path)
+
+    durations = []
+    for i in range(requests):
+        _, duration = timed(wsgi_get, application, PATHS[i % len(PATHS)])
+        durations.append(duration)
+
+    start = time.perf_counter()
+    sentry_sdk.flush(timeout=10)
+    result = summarize(durations)
+    result['flush_ms'] = round((time.perf_counter() - start) * 1000, 3)
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--requests', type=int, default=600, help="Requêtes mesurées par scénario")
+    parser.add_argument('--seed', type=int, default=200, help="Lettings et profils créés")
+    parser.add_argument('--only', default='', help="Scénarios à exécuter, séparés par des virgules")
+    parser.add_argument('--json', action='store_true', help="Affiche le résultat en JSON")
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.requests, args.seed)
+        return
+
+    names = [name for name in args.only.split(',') if name] or list(SCENARIOS)
+    server = start_fake_sentry()
+    dsn = f'http://public@127.0.0.1:{server.server_address[1]}/1'
+    results = {}
+    with tempfile.TemporaryDirectory() as static_root:
+        static_env = collect_static(static_root)
+        for name in names:
+            env = {'SENTRY_DSN': dsn, 'SENTRY_TRACES_ROUTE_RATES': '', 'DEBUG': 'False', **static_env,
+                   **SCENARIOS[name]}
+            with server.lock:
+                server.stats = {'envelopes': 0, 'bytes': 0, 'transactions': 0}
+            result = run_scenario('benchmarks.sentry_overhead',
+                                  ['--child', '--requests', str(args.requests), '--seed', str(args.seed)], env)
+            with server.lock:
+                result.update(server.stats)
+            results[name] = result
+    server.shutdown()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    baseline = results.get('disabled', {}).get('mean_ms')
+    print(f"{'scénario':<20}{'moy. ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'surcoût':>10}"
+          f"{'transactions':>14}{'Ko envoyés':>12}")
+    for name, result in results.items():
+        overhead = f"{result['mean_ms'] - baseline:+.3f}" if baseline is not None else '-'
+        print(f"{name:<20}{result['mean_ms']:>10.3f}{result['p95_ms']:>10.3f}{result['p99_ms']:>10.3f}"
+              f"{overhead:>10}{result['transactions']:>14}{result['bytes'] / 1024:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
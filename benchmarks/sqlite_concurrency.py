@@ -0,0 +1,148 @@
+"""
+Benchmark du débit SQLite en lecture/écriture sous plusieurs workers concurrents.
+
+Une base temporaire est créée et remplie (setup_production --scale), puis
+chaque scénario lance W processus (comme des workers gunicorn) qui enchaînent
+pendant une durée fixe des « requêtes » de lecture (détail d'un letting, page
+de profils) et d'écriture (mise à jour d'un letting). Chaque opération est
+encadrée par les signaux request_started/request_finished, ce qui applique
+CONN_MAX_AGE exactement comme pour une vraie requête.
+
+Scénarios :
+    stock : journal rollback, synchronous=FULL, pas de mmap, connexion par requête
+    tuned : configuration par défaut de settings (WAL, NORMAL, mmap, connexions persistantes)
+
+Usage:
+    python -m benchmarks.sqlite_concurrency
+    python -m benchmarks.sqlite_concurrency --workers 6 --duration 10 --write-ratio 0.2 --json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks import ROOT_DIR, run_scenario, setup_django, summarize
+
+SCENARIOS = {
+    'stock': {
+        'DATABASE_CONN_MAX_AGE': '0',
+        'SQLITE_JOURNAL_MODE': 'delete',
+        'SQLITE_SYNCHRONOUS': 'full',
+        'SQLITE_MMAP_SIZE': '0',
+        'SQLITE_CACHE_SIZE': '-2000',
+    },
+    'tuned': {},
+}
+
+
+def worker(worker_id, deadline, write_ratio, scale, results):
+    """
+    Boucle d'un worker : lectures et écritures jusqu'à l'échéance.
+    """
+    from django.core.signals import request_finished, request_started
+    from django.db import OperationalError
+    from lettings.models import Letting
+    from profiles.models import Profile
+
+    rng = random.Random(worker_id)
+    durations = {'read': [], 'write': []}
+    errors = 0
+    while time.time() < deadline:
+        kind = 'write' if rng.random() < write_ratio else 'read'
+        letting_id = rng.randint(1, scale)
+        start = time.perf_counter()
+        request_started.send(sender=None)
+        try:
+            if kind == 'write':
+                Letting.objects.filter(id=letting_id).update(title=f'Letting {letting_id} v{rng.randint(0, 999)}')
+            else:
+                list(Letting.objects.select_related('address').filter(id=letting_id))
+                list(Profile.objects.select_related('user').order_by('user__username')
+                     .filter(user__username__gt=f'{letting_id % 26 + 10:x}')[:20])
+        except OperationalError:
+            errors += 1
+            continue
+        finally:
+            request_finished.send(sender=None)
+        durations[kind].append(time.perf_counter() - start)
+    results.put((durations, errors))
+
+
+def run_child(workers, duration, write_ratio, scale):
+    """
+    Exécute le scénario courant (processus enfant) et affiche son résultat JSON.
+    """
+    setup_django(test_database=False)
+    from django.db import connection, connections
+
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA journal_mode')
+        journal_mode = cursor.fetchone()[0]
+    # Aucune connexion ne doit être partagée avec les processus forkés
+    connections.close_all()
+
+    context = multiprocessing.get_context('fork')
+    results = context.Queue()
+    deadline = time.time() + duration
+    processes = [context.Process(target=worker, args=(i, deadline, write_ratio, scale, results))
+                 for i in range(workers)]
+    for process in processes:
+        process.start()
+    collected = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    output = {'journal_mode': journal_mode, 'errors': sum(errors for _, errors in collected)}
+    for kind in ('read', 'write'):
+        durations = [d for worker_durations, _ in collected for d in worker_durations[kind]]
+        if durations:
+            output[kind] = summarize(durations)
+            output[kind]['per_second'] = round(len(durations) / duration, 1)
+    print(json.dumps(output))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--workers', type=int, default=3, help="Processus concurrents (défaut: 3)")
+    parser.add_argument('--duration', type=float, default=5.0, help="Durée par scénario, en secondes")
+    parser.add_argument('--write-ratio', type=float, default=0.1, help="Part d'écritures (défaut: 0.1)")
+    parser.add_argument('--scale', type=int, default=20000, help="Lettings et profils de la base de test")
+    parser.add_argument('--only', default='', help="Scénarios à exécuter, séparés par des virgules")
+    parser.add_argument('--json', action='store_true', help="Affiche le résultat en JSON")
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.workers, args.duration, args.write_ratio, args.scale)
+        return
+
+    names = [name for name in args.only.split(',') if name] or list(SCENARIOS)
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {'DATABASE_PATH': os.path.join(tmp, 'bench.sqlite3')}
+        for command in (['migrate', '--noinput'], ['setup_production', '--scale', str(args.scale)]):
+            subprocess.run([sys.executable, 'manage.py'] + command, cwd=ROOT_DIR, env={**os.environ, **env},
+                           check=True, capture_output=True)
+        child_args = ['--child', '--workers', str(args.workers), '--duration', str(args.duration),
+                      '--write-ratio', str(args.write_ratio), '--scale', str(args.scale)]
+        results = {name: run_scenario('benchmarks.sqlite_concurrency', child_args, {**env, **SCENARIOS[name]})
+                   for name in names}
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'scénario':<10}{'journal':>9}{'lect./s':>10}{'p95 lect.':>11}{'écr./s':>9}"
+          f"{'p95 écr.':>10}{'erreurs':>9}")
+    for name, result in results.items():
+        read, write = result.get('read', {}), result.get('write', {})
+        print(f"{name:<10}{result['journal_mode']:>9}{read.get('per_second', 0):>10}{read.get('p95_ms', 0):>11}"
+              f"{write.get('per_second', 0):>9}{write.get('p95_ms', 0):>10}{result['errors']:>9}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""
+Benchmark du poids d'un chargement de page à froid (cache du navigateur vide).
+
+Les fichiers statiques sont collectés comme en production (DEBUG=False :
+noms hachés, versions gzip et Brotli), puis chaque page est demandée à
+l'application WSGI avec les fichiers qu'un navigateur téléchargerait :
+feuilles de style, scripts et images de la page servis par WhiteNoise, et
+polices déclarées par les feuilles de style ou la CSS incluse (@font-face). Les ressources
+externes (CDN) sont comptées mais pas téléchargées.
+
+Pour chaque encodage accepté (identity, gzip, br) : octets transférés et
+durée de transfert estimée au débit --mbps. Chaque fichier statique doit
+être servi avec un cache immuable (Cache-Control: immutable).
+
+Usage:
+    python -m benchmarks.static_assets
+    python -m benchmarks.static_assets --pages / /lettings/ --mbps 5 --json
+"""
+import argparse
+import json
+import os
+import re
+import tempfile
+from urllib.parse import urljoin
+
+from benchmarks import collect_static, seed_database, setup_django, wsgi_get
+
+ENCODINGS = ('identity', 'gzip', 'br')
+PAGE_ASSET = re.compile(rb'<(?:link|script|img)\b[^>]*?\b(?:href|src)="([^"]+)"')
+CSS_URL = re.compile(rb'url\(\s*["\']?([^"\')]+)["\']?\s*\)')
+FONT_FACE = re.compile(rb'@font-face\s*{[^}]*}')
+
+
+def fetch(application, path, encoding):
+    """
+    Demande un chemin avec un Accept-Encoding ; retourne (statut, en-têtes (dict), corps compressé).
+    """
+    status, headers, body = wsgi_get(application, path, {'Accept-Encoding': encoding})
+    return status, dict(headers), body
+
+
+def page_assets(application, page):
+    """
+    Fichiers téléchargés au premier affichage d'une page.
+
+    Returns:
+        tuple: (chemins locaux, dans l'ordre de découverte ; nombre de ressources externes).
+    """
+    _, _, html = fetch(application, page, 'identity')
+    local, external = [], 0
+    for url in PAGE_ASSET.findall(html):
+        url = url.decode()
+        if url.startswith(('http://', 'https://', '//')):
+            external += 1
+        elif url not in local:
+            local.append(url)
+    # Polices des feuilles de style de la page et de sa CSS incluse (<style>)
+    stylesheets = [(page, html)]
+    stylesheets += [(url, fetch(application, url, 'identity')[2]) for url in local if url.endswith('.css')]
+    for stylesheet, css in stylesheets:
+        for rule in FONT_FACE.findall(css):
+            for url in CSS_URL.findall(rule):
+                font = urljoin(stylesheet, url.decode())
+                if font not in local:
+                    local.append(font)
+    return local, external
+
+
+def measure_page(application, page, mbps):
+    """
+    Mesure le transfert d'une page et de ses fichiers pour chaque encodage.
+
+    Returns:
+        dict: Octets et durée estimée par encodage, détail par fichier.
+
+    Raises:
+        RuntimeError: Si un fichier manque ou n'est pas servi avec un cache immuable.
+    """
+    assets, external = page_assets(application, page)
+    files = {}
+    totals = dict.fromkeys(ENCODINGS, 0)
+    for path in [page] + assets:
+        sizes = {}
+        for encoding in ENCODINGS:
+            status, headers, body = fetch(application, path, encoding)
+            if status != 200:
+                raise RuntimeError(f"{path} : statut {status}")
+            if path != page and 'immutable' not in headers.get('Cache-Control', ''):
+                raise RuntimeError(f"{path} : Cache-Control {headers.get('Cache-Control')!r} sans immutable")
+            sizes[encoding] = len(body)
+            totals[encoding] += len(body)
+        files[path] = sizes
+    return {
+        'requests': 1 + len(assets),
+        'external': external,
+        'kib': {encoding: round(size / 1024, 1) for encoding, size in totals.items()},
+        'transfer_ms': {encoding: round(size * 8 / (mbps * 1000), 1) for encoding, size in totals.items()},
+        'files': files,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--pages', nargs='+', default=['/', '/lettings/', '/profiles/user000001/'],
+                        help="Pages mesurées (défaut: accueil, liste des lettings, un profil)")
+    parser.add_argument('--mbps', type=float, default=10, help="Débit du réseau simulé en Mbit/s (défaut: 10)")
+    parser.add_argument('--json', action='store_true', help="Affiche le résultat en JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as static_root:
+        os.environ.update(collect_static(static_root), DEBUG='False', SENTRY_DSN='')
+        setup_django()
+        seed_database(lettings=20, profiles=20)
+        from oc_lettings_site.wsgi import application
+        results = {page: measure_page(application, page, args.mbps) for page in args.pages}
+
+    if args.json:
+        print(json.dumps(results))
+        return
+    for page, result in results.items():
+        print(f"{page} : {result['requests']} requêtes locales, {result['external']} ressources externes")
+        print(f"  {'fichier':<66} " + ' '.join(f'{encoding:>9}' for encoding in ENCODINGS))
+        for path, sizes in result['files'].items():
+            print(f"  {path[-66:]:<66} " + ' '.join(f'{sizes[encoding] / 1024:>7.1f}Ki' for encoding in ENCODINGS))
+        print(f"  {'total (Kio)':<66} " + ' '.join(f"{result['kib'][encoding]:>9}" for encoding in ENCODINGS))
+        print(f"  {f'transfert à {args.mbps:g} Mbit/s (ms)':<66} "
+              + ' '.join(f"{result['transfer_ms'][encoding]:>9}" for encoding in ENCODINGS))
+
+
+if __name__ == '__main__':
+    main()
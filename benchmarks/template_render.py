@@ -0,0 +1,155 @@
+"""
+Micro-benchmark du rendu des templates de liste selon le nombre de lignes.
+
+Chaque template de liste est rendu avec 10, 1 000 et 10 000 lignes (objets
+en mémoire, sans base de données ni requête HTTP), avec deux configurations
+du backend de settings.TEMPLATES :
+    - reparse : loaders sans cache (DEBUG, TEMPLATE_CACHE=False) ; chaque
+      rendu relit et recompile le template et ceux qu'il étend ou inclut ;
+    - cached : loader en cache, templates compilés une fois au démarrage
+      (lifecycle.compile_templates(), comme gunicorn.conf.py) ; seul le
+      rendu est mesuré.
+
+La durée de compilation initiale de tous les templates du projet est aussi
+mesurée. Le cache des fragments ({% cache %} des lignes) est désactivé par
+défaut pour mesurer le rendu complet de chaque ligne ; --fragment-cache le
+mesure plein, comme en régime établi.
+
+Usage:
+    python -m benchmarks.template_render
+    python -m benchmarks.template_render --rows 10 1000 --repeat 20 --fragment-cache --json
+"""
+import argparse
+import copy
+import json
+import os
+import tempfile
+import time
+
+from benchmarks import collect_static, setup_django, summarize, timed
+
+TEMPLATES = ('lettings/index.html', 'lettings/search.html', 'lettings/nearby.html', 'profiles/index.html')
+
+
+class Page:
+    """
+    Page de keyset pagination factice : lien 'Next' affiché, comme en production.
+    """
+    has_previous = False
+    has_next = True
+    next_cursor = 'cursor'
+
+
+def build_context(template_name, rows):
+    """
+    Contexte de rendu d'un template de liste, tel que construit par sa vue.
+
+    Args:
+        template_name (str): Nom du template (voir TEMPLATES).
+        rows (int): Nombre de lignes de la liste.
+
+    Returns:
+        dict: Contexte du template.
+    """
+    from django.contrib.auth.models import User
+    from lettings.models import Letting
+    from profiles.models import Profile
+
+    if template_name == 'profiles/index.html':
+        profiles = [Profile(id=i, user=User(id=i, username=f'user{i:06d}')) for i in range(1, rows + 1)]
+        return {'profiles_list': profiles, 'page': Page()}
+    lettings = [Letting(id=i, title=f'Letting {i}') for i in range(1, rows + 1)]
+    if template_name == 'lettings/nearby.html':
+        for letting in lettings:
+            letting.distance_km = letting.id / 10
+        return {'zip': '62701', 'radius': '50', 'searched': True, 'lettings_list': lettings, 'next_url': '?after=1'}
+    return {'query': 'Letting', 'lettings_list': lettings, 'page': Page()}
+
+
+def build_backend(cached):
+    """
+    Instancie le backend de settings.TEMPLATES avec ou sans loader en cache.
+
+    Args:
+        cached (bool): Encapsule les loaders dans le loader en cache.
+
+    Returns:
+        DjangoTemplates: Backend indépendant de engines['django'].
+    """
+    from django.conf import settings
+    from django.utils.module_loading import import_string
+
+    params = {'APP_DIRS': False, **copy.deepcopy(settings.TEMPLATES[0])}
+    params['OPTIONS']['loaders'] = [('django.template.loaders.cached.Loader', settings.TEMPLATE_LOADERS)] if cached \
+        else list(settings.TEMPLATE_LOADERS)
+    return import_string(params.pop('BACKEND'))(params)
+
+
+def measure(backend, template_name, context, repeat):
+    """
+    Chronomètre repeat rendus complets (chargement du template compris).
+
+    Returns:
+        tuple: (durées en secondes, taille du HTML en octets).
+    """
+    durations = []
+    for _ in range(repeat):
+        html, duration = timed(lambda: backend.get_template(template_name).render(context))
+        durations.append(duration)
+    return durations, len(html.encode())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10, 1000, 10000],
+                        help="Tailles de liste (défaut: 10 1000 10000)")
+    parser.add_argument('--repeat', type=int, default=10, help="Rendus mesurés par cas (défaut: 10)")
+    parser.add_argument('--fragment-cache', action='store_true', help="Mesure avec le cache des fragments plein")
+    parser.add_argument('--json', action='store_true', help="Affiche le résultat en JSON")
+    args = parser.parse_args()
+
+    os.environ['DEBUG'] = 'False'
+    os.environ.setdefault('SENTRY_DSN', '')
+    if args.fragment_cache:
+        # Une entrée par ligne rendue : aucune éviction pendant la mesure
+        os.environ['FRAGMENT_CACHE_MAX_ENTRIES'] = str(2 * max(args.rows))
+    else:
+        os.environ['FRAGMENT_CACHE_BACKEND'] = 'django.core.cache.backends.dummy.DummyCache'
+    static_root = tempfile.TemporaryDirectory()
+    os.environ.update(collect_static(static_root.name))
+    setup_django(test_database=False)
+    from oc_lettings_site.fragment_cache import fragment_cache
+    from oc_lettings_site.lifecycle import compile_templates
+
+    backends = {'reparse': build_backend(cached=False), 'cached': build_backend(cached=True)}
+    start = time.perf_counter()
+    compiled = compile_templates(backends['cached'])
+    compile_ms = round((time.perf_counter() - start) * 1000, 3)
+    results = {'compile': {'templates': len(compiled), 'ms': compile_ms}, 'cases': []}
+
+    for template_name in TEMPLATES:
+        for rows in args.rows:
+            # Sans requête, le context processor des fragments n'est pas appliqué par render()
+            context = {**fragment_cache(None), **build_context(template_name, rows)}
+            case = {'template': template_name, 'rows': rows}
+            for mode, backend in backends.items():
+                # Rendu non mesuré : remplit le cache des fragments et les caches de Django (URLs, filtres)
+                backend.get_template(template_name).render(context)
+                durations, size = measure(backend, template_name, context, args.repeat)
+                case[mode] = summarize(durations)
+            case['html_kib'] = round(size / 1024, 1)
+            case['speedup'] = round(case['reparse']['p50_ms'] / case['cached']['p50_ms'], 2)
+            results['cases'].append(case)
+
+    if args.json:
+        print(json.dumps(results))
+        return
+    print(f"Compilation initiale : {results['compile']['templates']} templates en {results['compile']['ms']} ms")
+    print(f"{'template':<22} {'lignes':>7} {'HTML Kio':>9} {'reparse p50':>12} {'cached p50':>11} {'gain':>6}")
+    for case in results['cases']:
+        print(f"{case['template']:<22} {case['rows']:>7} {case['html_kib']:>9} {case['reparse']['p50_ms']:>12} "
+              f"{case['cached']['p50_ms']:>11} {case['speedup']:>6}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+"""
+Configuration gunicorn de oc_lettings_site.wsgi:application.
+
+Chargée automatiquement par gunicorn depuis le répertoire courant, dans le
+processus maître et avant l'import de l'application.
+
+Cycle de vie :
+    - le maître importe l'application une seule fois (preload_app), la
+      préchauffe (résolveurs d'URL, templates) puis gèle le ramasse-miettes
+      (gc.freeze) : les objets chargés restent dans des pages partagées avec
+      les workers au lieu d'être recopiés à la première collecte ;
+    - chaque worker réactive le ramasse-miettes (post_fork), puis ouvre ses
+      connexions SQLite et termine le préchauffage avant sa première requête
+      (post_worker_init, aussi sans preload) ;
+    - un worker est recyclé après max_requests requêtes, ou dès que sa mémoire
+      anonyme a augmenté de plus de GUNICORN_MAX_MEMORY_GROWTH_MB depuis son
+      démarrage ;
+    - à l'arrêt, il vide sa file de logs et ferme ses connexions (worker_exit).
+
+Example:
+    gunicorn --config gunicorn.conf.py oc_lettings_site.wsgi:application
+    GUNICORN_WORKERS=4 GUNICORN_THREADS=1 gunicorn oc_lettings_site.wsgi:application
+"""
+import gc
+import os
+import shutil
+import tempfile
+
+# Recommandation de la documentation de gc.freeze() : pas de collecte dans le
+# maître pendant le chargement (pas de trous dans les pages partagées), gel
+# avant chaque fork, réactivation dans le worker.
+gc.disable()
+
+# Métriques Prometheus partagées entre workers (voir oc_lettings_site/metrics.py) :
+# le répertoire doit exister avant le premier import de prometheus_client. Il est
+# vidé au démarrage du maître (pas lors d'un rechargement par SIGHUP) pour ne pas
+# reprendre les compteurs d'une exécution précédente.
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'oc-lettings-metrics'))
+if os.environ.get('OC_LETTINGS_METRICS_MASTER') != str(os.getpid()):
+    os.environ['OC_LETTINGS_METRICS_MASTER'] = str(os.getpid())
+    shutil.rmtree(os.environ['PROMETHEUS_MULTIPROC_DIR'], ignore_errors=True)
+    os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'oc_lettings_site.settings')
+
+
+def _cpu_count():
+    # Import différé : Django n'est pas encore initialisé à la lecture du fichier
+    from oc_lettings_site.lifecycle import cpu_count
+    return cpu_count()
+
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+# Workers : 2 par CPU + 1 (conseil de gunicorn), plafonné pour borner la mémoire.
+# Threads : 2 par worker (gthread) pour qu'un client lent ou une attente SQLite
+# n'immobilise pas tout le worker ; GUNICORN_THREADS=1 revient aux workers sync.
+workers = int(os.getenv('GUNICORN_WORKERS', min(2 * _cpu_count() + 1, int(os.getenv('GUNICORN_MAX_WORKERS', 8)))))
+threads = int(os.getenv('GUNICORN_THREADS', 2))
+worker_class = 'gthread' if threads > 1 else 'sync'
+preload_app = os.getenv('GUNICORN_PRELOAD', 'True').lower() == 'true'
+
+# Recyclage : le jitter évite que tous les workers redémarrent en même temps
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 100))
+max_memory_growth = int(os.getenv('GUNICORN_MAX_MEMORY_GROWTH_MB', 200)) * 1024 * 1024
+# Intervalle de vérification de la mémoire, en requêtes
+memory_check_interval = 50
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+graceful_timeout = 30
+keepalive = 5
+# Fichier de battement de cœur des workers en mémoire (évite les blocages
+# d'écriture sur le système de fichiers en couches de Docker)
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+
+def when_ready(server):
+    """
+    Préchauffe l'application chargée dans le maître, avant le premier fork.
+    """
+    if not preload_app:
+        return
+    from django.db import connections
+    from oc_lettings_site.lifecycle import warm_up
+
+    report = warm_up(database=False)
+    # Aucune connexion ne doit être héritée par les workers
+    connections.close_all()
+    server.log.info("Application préchauffée dans le maître: %s", report)
+
+
+def pre_fork(server, worker):
+    """
+    Gèle les objets du maître : les collectes des workers ne les modifient plus.
+    """
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    """
+    Réactive le ramasse-miettes dans le worker.
+    """
+    gc.enable()
+
+
+def post_worker_init(worker):
+    """
+    Termine le préchauffage du worker, application chargée, avant sa première requête.
+    """
+    from oc_lettings_site.lifecycle import anonymous_memory, warm_up
+
+    report = warm_up()
+    worker.memory_baseline = anonymous_memory()
+    worker.requests_since_check = 0
+    worker.log.info("Worker %s préchauffé: %s", worker.pid, report)
+
+
+def post_request(worker, req, environ, resp):
+    """
+    Recycle le worker si sa mémoire a trop augmenté depuis son démarrage.
+    """
+    baseline = getattr(worker, 'memory_baseline', None)
+    if baseline is None:
+        return
+    worker.requests_since_check += 1
+    if worker.requests_since_check < memory_check_interval:
+        return
+    worker.requests_since_check = 0
+
+    from oc_lettings_site.lifecycle import anonymous_memory
+    growth = anonymous_memory() - baseline
+    if growth > max_memory_growth:
+        worker.log.info("Worker %s recyclé: mémoire +%.0f Mio depuis son démarrage", worker.pid, growth / 1024 / 1024)
+        worker.alive = False
+
+
+def worker_exit(server, worker):
+    """
+    Vide la file de logs du worker et ferme ses connexions avant sa sortie.
+    """
+    from django.db import connections
+    from oc_lettings_site.log_queue import stop_queue_logging
+
+    stop_queue_logging()
+    connections.close_all()
+
+
+def child_exit(server, worker):
+    """
+    Retire le worker arrêté de la jauge des requêtes en cours (ses compteurs restent acquis).
+    """
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
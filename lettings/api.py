@@ -0,0 +1,108 @@
+"""
+Endpoints JSON en lecture seule des lettings (liste, détail, lecture groupée).
+
+Chaque letting est exposé à plat avec les champs de son adresse. Le paramètre
+'fields' restreint les colonnes lues (ex: ?fields=id,title,city).
+
+Examples:
+    GET /api/lettings/?fields=id,title&after=1000
+    GET /api/lettings/42/
+    GET /api/lettings/batch/?ids=1,2,3
+"""
+from django.db import router
+from django.http import JsonResponse
+
+from oc_lettings_site.access_log import get_access_logger
+from oc_lettings_site.json_api import (
+    ApiError, batch_response, error_response, parse_fields, parse_id, parse_list, project, stream_list,
+)
+from oc_lettings_site.pagination import MAX_ID
+from .models import Letting
+
+logger = get_access_logger('lettings')
+
+# {nom public: chemin ORM}
+LETTING_FIELDS = {
+    'id': 'id',
+    'title': 'title',
+    'number': 'address__number',
+    'street': 'address__street',
+    'city': 'address__city',
+    'state': 'address__state',
+    'zip_code': 'address__zip_code',
+    'country_iso_code': 'address__country_iso_code',
+    'latitude': 'address__latitude',
+    'longitude': 'address__longitude',
+    'updated_at': 'updated_at',
+}
+
+
+def _lettings():
+    # Base fixée pendant la requête : la diffusion a lieu hors du routage des lectures
+    return Letting.objects.using(router.db_for_read(Letting))
+
+
+def letting_list(request):
+    """
+    Diffuse tous les lettings par identifiant croissant.
+
+    Args:
+        request: L'objet HttpRequest de Django (paramètres 'fields' et 'after',
+            identifiant après lequel reprendre).
+
+    Returns:
+        StreamingHttpResponse: {"results": [...]}, ou 400 si un paramètre est invalide.
+    """
+    log = logger.endpoint('lettings-api:list')
+    try:
+        names = parse_fields(request, LETTING_FIELDS)
+        after = parse_id(request.GET.get('after', 0))
+    except ApiError as e:
+        log.warning("Requête de liste des lettings invalide: %s", e)
+        return error_response(str(e))
+    log.info("Export JSON des lettings après %s par %s", after, request.META.get('REMOTE_ADDR', 'IP inconnue'))
+    rows = project(_lettings().filter(id__gt=after).order_by('id'), LETTING_FIELDS, names)
+    return stream_list(rows, names)
+
+
+def letting_detail(request, letting_id):
+    """
+    Retourne un letting.
+
+    Returns:
+        JsonResponse: Champs demandés du letting, ou 404 s'il n'existe pas.
+    """
+    log = logger.endpoint('lettings-api:detail')
+    try:
+        names = parse_fields(request, LETTING_FIELDS)
+    except ApiError as e:
+        log.warning("Lecture d'un letting invalide: %s", e)
+        return error_response(str(e))
+    row = None
+    # Au-delà de la plage des INTEGER de SQLite, aucun letting ne peut avoir cet identifiant
+    if letting_id <= MAX_ID:
+        row = project(_lettings().filter(id=letting_id), LETTING_FIELDS, names).first()
+    if row is None:
+        log.warning("Letting avec l'ID %s introuvable (API) - 404", letting_id)
+        return error_response("Letting introuvable", status=404)
+    log.info("Letting %s lu (API) par %s", letting_id, request.META.get('REMOTE_ADDR', 'IP inconnue'))
+    return JsonResponse(dict(zip(names, row)), json_dumps_params={'ensure_ascii': False})
+
+
+def letting_batch(request):
+    """
+    Retourne plusieurs lettings en une requête SQL (paramètre 'ids').
+
+    Returns:
+        JsonResponse: {"results": [...], "missing": [...]} dans l'ordre des ids demandés.
+    """
+    log = logger.endpoint('lettings-api:batch')
+    try:
+        names = parse_fields(request, LETTING_FIELDS)
+        ids = parse_list(request, 'ids', parse_id)
+    except ApiError as e:
+        log.warning("Lecture groupée de lettings invalide: %s", e)
+        return error_response(str(e))
+    log.info("Lecture groupée de %s lettings par %s", len(ids), request.META.get('REMOTE_ADDR', 'IP inconnue'))
+    rows = project(_lettings().filter(id__in=ids), LETTING_FIELDS, names + ['id'])
+    return batch_response(rows, names, ids)
@@ -0,0 +1,13 @@
+"""
+Configuration des URLs de l'API JSON des lettings (montée sous /api/lettings/).
+"""
+from django.urls import path
+from . import api
+
+app_name = 'lettings-api'
+
+urlpatterns = [
+    path('', api.letting_list, name='list'),
+    path('batch/', api.letting_batch, name='batch'),
+    path('<int:letting_id>/', api.letting_detail, name='detail'),
+]
@@ -0,0 +1,385 @@
+"""
+Coordonnées des adresses et recherche des lettings par proximité.
+
+Les coordonnées d'une adresse sont dérivées de son code postal, sans service
+externe : centroïde du code postal dans la table settings.ZIP_CENTROIDS_PATH,
+à défaut moyenne des codes postaux connus de même préfixe à 3 chiffres (même
+centre de tri postal), à défaut centroïde de l'état.
+
+La table livrée (lettings/data/zip_centroids.csv) ne couvre que les villes
+du jeu de démonstration. ZIP_CENTROIDS_PATH peut désigner la table complète,
+par exemple le fichier « ZCTA Gazetteer » du Census (colonnes GEOID, INTPTLAT,
+INTPTLONG séparées par des tabulations), puis manage.py geocode_addresses
+recalcule les coordonnées existantes. Une adresse placée au centre de son état
+(code postal absent de la table) est signalée par un avertissement : toutes
+les adresses de l'état partagent alors le même point.
+
+Sur SQLite, les coordonnées sont indexées dans la table R*Tree SPATIAL_TABLE
+(une boîte réduite à un point par adresse). Une recherche de proximité lit
+les points d'une boîte englobante via l'index, calcule leur distance sur les
+coordonnées de l'index (sans jointure) puis trie en SQL, avec LIMIT : le coût
+dépend du nombre de résultats demandés et de la densité locale, pas de la
+taille de la table.
+"""
+import csv
+import logging
+import math
+import os
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connections, router
+
+from oc_lettings_site.bulk import batched
+from oc_lettings_site.pagination import KeysetPage, decode_cursor, encode_cursor, parse_id
+
+logger = logging.getLogger(__name__)
+
+SPATIAL_TABLE = 'lettings_address_rtree'
+
+STATE_CENTROIDS_PATH = os.path.join(os.path.dirname(__file__), 'data', 'state_centroids.csv')
+
+# Longueur d'un degré de latitude (rayon terrestre moyen de 6371 km)
+KM_PER_DEGREE = 6371.0 * math.pi / 180
+# Recherche des plus proches voisins : rayon initial, facteur d'agrandissement
+# et rayon maximal (demi-circonférence terrestre)
+INITIAL_RADIUS_KM = 1.0
+RADIUS_GROWTH = 4
+MAX_RADIUS_KM = 20000.0
+
+# Noms de colonnes acceptés : table livrée, puis fichier Gazetteer du Census
+ZIP_COLUMNS = ('zip', 'GEOID')
+LATITUDE_COLUMNS = ('latitude', 'INTPTLAT')
+LONGITUDE_COLUMNS = ('longitude', 'INTPTLONG')
+
+
+def _column(row, names):
+    for name in names:
+        if name in row:
+            return row[name]
+    raise KeyError(f"Colonne manquante, attendue parmi: {', '.join(names)}")
+
+
+def read_centroids(path, key_columns):
+    """
+    Lit une table de centroïdes (CSV, ou TSV pour les fichiers Gazetteer).
+
+    Args:
+        path (str): Chemin du fichier avec en-tête.
+        key_columns (tuple[str]): Noms acceptés pour la colonne de clé.
+
+    Returns:
+        dict: {clé: (latitude, longitude)}.
+    """
+    with open(path, encoding='utf-8-sig', newline='') as stream:
+        header = stream.readline()
+        delimiter = '\t' if '\t' in header else ','
+        names = [name.strip() for name in header.strip().split(delimiter)]
+        centroids = {}
+        for row in csv.DictReader(stream, fieldnames=names, delimiter=delimiter):
+            centroids[_column(row, key_columns).strip()] = (
+                float(_column(row, LATITUDE_COLUMNS)), float(_column(row, LONGITUDE_COLUMNS))
+            )
+    return centroids
+
+
+@lru_cache(maxsize=None)
+def _tables(zip_path):
+    zips = read_centroids(zip_path, ZIP_COLUMNS)
+    prefixes = {}
+    for zip_code, point in zips.items():
+        prefixes.setdefault(zip_code[:3], []).append(point)
+    zip3 = {
+        prefix: (sum(lat for lat, _ in points) / len(points), sum(lon for _, lon in points) / len(points))
+        for prefix, points in prefixes.items()
+    }
+    return zips, zip3, read_centroids(STATE_CENTROIDS_PATH, ('state',))
+
+
+def _locate(zip_code, state):
+    """
+    Retourne ((latitude, longitude), niveau) ; niveau vaut 'zip', 'zip3', 'state' ou None.
+    """
+    zips, zip3, states = _tables(settings.ZIP_CENTROIDS_PATH)
+    key = f'{zip_code:05d}' if isinstance(zip_code, int) else str(zip_code or '').zfill(5)
+    for level, table, table_key in (('zip', zips, key), ('zip3', zip3, key[:3]),
+                                    ('state', states, (state or '').upper())):
+        if table_key in table:
+            return table[table_key], level
+    return (None, None), None
+
+
+def geocode(zip_code, state):
+    """
+    Détermine les coordonnées d'une adresse à partir de son code postal.
+
+    Args:
+        zip_code (int): Code postal (ex: 2108 pour « 02108 »).
+        state (str): Code d'état à deux lettres.
+
+    Returns:
+        tuple: (latitude, longitude) en degrés, ou (None, None) si rien ne correspond.
+
+    Side Effects:
+        - Log WARNING si seul le centre de l'état correspond
+    """
+    point, level = _locate(zip_code, state)
+    if level == 'state':
+        logger.warning("Code postal %s absent de ZIP_CENTROIDS_PATH : adresse placée au centre de l'état %s",
+                       zip_code, state)
+    return point
+
+
+def _geocode_batch(addresses):
+    """
+    Renseigne les coordonnées des adresses ; retourne le nombre placé au centre de leur état.
+    """
+    fallbacks = 0
+    for address in addresses:
+        (address.latitude, address.longitude), level = _locate(address.zip_code, address.state)
+        fallbacks += level == 'state'
+    return fallbacks
+
+
+def _warn_state_fallbacks(fallbacks, total):
+    if fallbacks:
+        logger.warning("%s adresses sur %s absentes de ZIP_CENTROIDS_PATH, placées au centre de leur état",
+                       fallbacks, total)
+
+
+def geocode_addresses(addresses):
+    """
+    Renseigne latitude et longitude d'adresses non sauvegardées (insertion en masse).
+
+    Args:
+        addresses (list[Address]): Adresses dont zip_code et state sont renseignés.
+
+    Side Effects:
+        - Log WARNING (un seul pour le lot) si des adresses sont placées au centre de leur état
+    """
+    _warn_state_fallbacks(_geocode_batch(addresses), len(addresses))
+
+
+def geocode_all(address_model, using='default', batch_size=2000):
+    """
+    Recalcule les coordonnées de toutes les adresses, par lots.
+
+    Args:
+        address_model (Model): Modèle Address (ou modèle historique d'une migration).
+        using (str): Alias de la base principale.
+        batch_size (int): Nombre d'adresses mises à jour par requête.
+
+    Returns:
+        int: Nombre d'adresses traitées.
+
+    Side Effects:
+        - Log WARNING (un seul) si des adresses sont placées au centre de leur état
+    """
+    queryset = address_model._default_manager.using(using).only('id', 'zip_code', 'state').order_by('pk')
+    count = fallbacks = 0
+    for batch in batched(queryset.iterator(chunk_size=batch_size), batch_size):
+        fallbacks += _geocode_batch(batch)
+        address_model._default_manager.using(using).bulk_update(batch, ['latitude', 'longitude'])
+        count += len(batch)
+    _warn_state_fallbacks(fallbacks, count)
+    return count
+
+
+def create_table_sql():
+    """
+    Retourne l'instruction de création de la table R*Tree (utilisée par la migration).
+    """
+    return (f"CREATE VIRTUAL TABLE IF NOT EXISTS {SPATIAL_TABLE} "
+            f"USING rtree(id, min_lat, max_lat, min_lon, max_lon)")
+
+
+def _insert_sql(where):
+    return (f"INSERT INTO {SPATIAL_TABLE} (id, min_lat, max_lat, min_lon, max_lon) "
+            f"SELECT id, latitude, latitude, longitude, longitude FROM lettings_address "
+            f"WHERE latitude IS NOT NULL AND longitude IS NOT NULL {where}")
+
+
+_rtree_available = {}
+
+
+def uses_rtree(using):
+    """
+    Indique si la base donnée dispose de l'index R*Tree.
+
+    Comme pour l'index plein texte, seule une réponse positive est mémorisée.
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return False
+    if using not in _rtree_available and SPATIAL_TABLE in connection.introspection.table_names():
+        _rtree_available[using] = True
+    return _rtree_available.get(using, False)
+
+
+def index_addresses(address_ids, using='default'):
+    """
+    Indexe (ou réindexe) les coordonnées actuelles des adresses données.
+
+    Args:
+        address_ids (iterable[int]): Identifiants des adresses.
+        using (str): Alias de la base principale.
+    """
+    if not uses_rtree(using):
+        return
+    with connections[using].cursor() as cursor:
+        for batch in batched(address_ids, 500):
+            placeholders = ', '.join(['%s'] * len(batch))
+            cursor.execute(f"DELETE FROM {SPATIAL_TABLE} WHERE id IN ({placeholders})", batch)
+            cursor.execute(_insert_sql(f"AND id IN ({placeholders})"), batch)
+
+
+def remove_addresses(address_ids, using='default'):
+    """
+    Retire les adresses données de l'index.
+
+    Args:
+        address_ids (iterable[int]): Identifiants des adresses supprimées.
+        using (str): Alias de la base principale.
+    """
+    if not uses_rtree(using):
+        return
+    with connections[using].cursor() as cursor:
+        for batch in batched(address_ids, 500):
+            placeholders = ', '.join(['%s'] * len(batch))
+            cursor.execute(f"DELETE FROM {SPATIAL_TABLE} WHERE id IN ({placeholders})", batch)
+
+
+def rebuild_spatial_index(using='default'):
+    """
+    Reconstruit entièrement l'index (après une écriture en masse sans signaux).
+
+    Args:
+        using (str): Alias de la base principale.
+    """
+    if not uses_rtree(using):
+        return
+    with connections[using].cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SPATIAL_TABLE}")
+        cursor.execute(_insert_sql(''))
+
+
+def _parse_distance_cursor(value):
+    d2, _, letting_id = value.partition(':')
+    d2 = float(d2)
+    if not math.isfinite(d2):
+        raise ValueError(f"Distance invalide: {d2!r}")
+    return d2, parse_id(letting_id)
+
+
+def _scale(latitude):
+    # Projection équirectangulaire : un degré de longitude vaut cos(latitude) degré de latitude
+    return max(math.cos(math.radians(latitude)), 0.01)
+
+
+def nearby_lettings(latitude, longitude, page_size, radius_km=None, after=None):
+    """
+    Recherche les lettings les plus proches d'un point, par distance croissante.
+
+    Les distances sont calculées en projection équirectangulaire centrée sur
+    le point (erreur négligeable sous quelques centaines de kilomètres).
+    Sans rayon, la recherche agrandit la zone jusqu'à trouver page_size
+    lettings (k plus proches voisins).
+
+    Args:
+        latitude (float): Latitude du point, en degrés.
+        longitude (float): Longitude du point, en degrés.
+        page_size (int): Nombre de résultats par page.
+        radius_km (float | None): Distance maximale, en kilomètres.
+        after (str | None): Curseur de la page précédente (page.next_cursor).
+
+    Returns:
+        KeysetPage: Lettings de la page (adresse préchargée), chacun avec un
+        attribut distance_km, et next_cursor.
+
+    Raises:
+        InvalidCursor: Si le curseur est invalide.
+        ValueError: Si le rayon n'est pas un nombre fini strictement positif.
+    """
+    # Import local : lettings/models.py importe ce module pour ses receivers
+    from .models import Letting
+
+    # Un rayon NaN ne serait jamais atteint par l'agrandissement de la zone
+    if radius_km is not None and not (math.isfinite(radius_km) and radius_km > 0):
+        raise ValueError(f"Rayon invalide : {radius_km!r}")
+    after_key = decode_cursor(after, _parse_distance_cursor) if after else None
+    max_radius = min(radius_km, MAX_RADIUS_KM) if radius_km is not None else MAX_RADIUS_KM
+    using = router.db_for_read(Letting)
+    find = _nearby_rtree if uses_rtree(using) else _nearby_orm
+    scale = _scale(latitude)
+
+    # Un résultat à distance <= r est exact : tout letting hors de la zone est plus loin
+    radius = min(INITIAL_RADIUS_KM, max_radius)
+    while True:
+        rows = find(using, latitude, longitude, scale, radius, after_key, page_size + 1)
+        if len(rows) > page_size or radius >= max_radius:
+            break
+        radius = min(radius * RADIUS_GROWTH, max_radius)
+
+    has_next = len(rows) > page_size
+    rows = rows[:page_size]
+    lettings = Letting.objects.using(using).select_related('address').in_bulk([letting_id for letting_id, _ in rows])
+    object_list = []
+    for letting_id, d2 in rows:
+        if letting_id in lettings:
+            lettings[letting_id].distance_km = math.sqrt(d2) * KM_PER_DEGREE
+            object_list.append(lettings[letting_id])
+    next_cursor = encode_cursor('%r:%d' % (rows[-1][1], rows[-1][0])) if has_next else None
+    return KeysetPage(object_list, next_cursor)
+
+
+def _nearby_rtree(using, latitude, longitude, scale, radius_km, after_key, limit):
+    """
+    Lettings à moins de radius_km, via la boîte englobante de l'index R*Tree.
+
+    Returns:
+        list: Couples (identifiant du letting, carré de la distance en degrés de
+        latitude) triés par distance puis identifiant.
+    """
+    delta_lat = radius_km / KM_PER_DEGREE
+    delta_lon = delta_lat / scale
+    # Distance calculée sur les coordonnées de l'index (flottants 32 bits,
+    # précision de l'ordre du mètre) : seuls les points retenus sont joints
+    distance = ("((min_lat - %s) * (min_lat - %s) "
+                "+ (min_lon - %s) * %s * (min_lon - %s) * %s)")
+    distance_params = [latitude, latitude, longitude, scale, longitude, scale]
+    where, params = '', []
+    if after_key:
+        where = 'WHERE r.d2 > %s OR (r.d2 = %s AND l.id > %s)'
+        params = [after_key[0], after_key[0], after_key[1]]
+    sql = (f"SELECT l.id, r.d2 FROM ("
+           f"SELECT id, {distance} AS d2 FROM {SPATIAL_TABLE} "
+           f"WHERE min_lat <= %s AND max_lat >= %s AND min_lon <= %s AND max_lon >= %s AND d2 <= %s"
+           f") r JOIN lettings_letting l ON l.address_id = r.id "
+           f"{where} ORDER BY r.d2, l.id LIMIT %s")
+    box = [latitude + delta_lat, latitude - delta_lat, longitude + delta_lon, longitude - delta_lon]
+    with connections[using].cursor() as cursor:
+        cursor.execute(sql, distance_params + box + [delta_lat ** 2] + params + [limit])
+        return cursor.fetchall()
+
+
+def _nearby_orm(using, latitude, longitude, scale, radius_km, after_key, limit):
+    """
+    Recherche de repli sans index R*Tree : boîte englobante filtrée par l'ORM.
+    """
+    from django.db.models import ExpressionWrapper, F, FloatField, Q
+
+    from .models import Letting
+
+    delta_lat = radius_km / KM_PER_DEGREE
+    delta_lon = delta_lat / scale
+    d_lat = F('address__latitude') - latitude
+    d_lon = (F('address__longitude') - longitude) * scale
+    queryset = Letting.objects.using(using).filter(
+        address__latitude__range=(latitude - delta_lat, latitude + delta_lat),
+        address__longitude__range=(longitude - delta_lon, longitude + delta_lon),
+    ).annotate(
+        d2=ExpressionWrapper(d_lat * d_lat + d_lon * d_lon, output_field=FloatField())
+    ).filter(d2__lte=delta_lat ** 2)
+    if after_key:
+        queryset = queryset.filter(Q(d2__gt=after_key[0]) | Q(d2=after_key[0], id__gt=after_key[1]))
+    return list(queryset.order_by('d2', 'id').values_list('id', 'd2')[:limit])
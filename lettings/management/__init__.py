@@ -0,0 +1,3 @@
+"""
+Package de commandes de management Django pour l'application lettings.
+"""
@@ -0,0 +1,5 @@
+"""
+Commandes de management personnalisées pour l'application lettings.
+
+Ce module contient les commandes d'import de données des lettings.
+"""
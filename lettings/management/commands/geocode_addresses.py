@@ -0,0 +1,47 @@
+"""
+Commande Django de recalcul des coordonnées de toutes les adresses.
+
+À lancer après avoir changé la table des centroïdes (ZIP_CENTROIDS_PATH),
+par exemple pour passer de la table livrée au fichier Gazetteer complet.
+
+Examples:
+    python manage.py geocode_addresses
+    ZIP_CENTROIDS_PATH=2020_Gaz_zcta_national.txt python manage.py geocode_addresses
+"""
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from lettings.geo import geocode_all, rebuild_spatial_index
+from lettings.models import Address
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Commande Django de recalcul des coordonnées des adresses et de leur index spatial.
+
+    Attributes:
+        help (str): Description de la commande affichée dans --help
+    """
+
+    help = 'Recalcule les coordonnées des adresses depuis la table des centroïdes de codes postaux'
+
+    def handle(self, *args, **options):
+        """
+        Point d'entrée principal de la commande Django.
+
+        Side Effects:
+            - Met à jour latitude et longitude de toutes les adresses
+            - Reconstruit l'index de recherche par proximité
+        """
+        start = time.perf_counter()
+        with transaction.atomic():
+            count = geocode_all(Address)
+            rebuild_spatial_index()
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(f"✅ {count} adresses géocodées en {elapsed:.1f}s"))
+        logger.info("Coordonnées de %s adresses recalculées", count)
@@ -0,0 +1,283 @@
+"""
+Commande Django d'import en masse de lettings et de leurs adresses.
+
+Le fichier (CSV avec en-tête ou JSON Lines) est lu en flux : seules les lignes
+du lot en cours sont en mémoire. Chaque lot est validé ligne par ligne puis
+inséré avec bulk_create dans une transaction (adresses puis lettings).
+
+Colonnes attendues : title, number, street, city, state, zip_code, country_iso_code.
+
+Examples:
+    python manage.py import_lettings lettings.csv
+    python manage.py import_lettings lettings.jsonl --batch-size 5000
+    cat lettings.csv | python manage.py import_lettings - --format csv --strict
+"""
+import csv
+import json
+import logging
+import os
+import sys
+import time
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from lettings.geo import geocode_addresses, index_addresses
+from lettings.models import Address, Letting
+from lettings.search import index_lettings
+from oc_lettings_site.bulk import batched, bulk_insert
+
+logger = logging.getLogger(__name__)
+
+ADDRESS_FIELDS = ('number', 'street', 'city', 'state', 'zip_code', 'country_iso_code')
+LETTING_FIELDS = ('title',)
+FORMATS = ('csv', 'jsonl')
+
+# Nombre d'erreurs de validation détaillées sur la sortie d'erreur
+MAX_REPORTED_ERRORS = 20
+# Intervalle minimal entre deux lignes de progression, en secondes
+PROGRESS_INTERVAL = 1.0
+
+
+def read_csv(stream):
+    """
+    Lit un CSV avec en-tête et produit (numéro de ligne, dict) pour chaque ligne.
+    """
+    reader = csv.DictReader(stream)
+    for row in reader:
+        yield reader.line_num, row
+
+
+def read_jsonl(stream):
+    """
+    Lit un fichier JSON Lines et produit (numéro de ligne, dict ou ValidationError).
+    """
+    for line_num, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_num, ValidationError(f"JSON invalide: {e}")
+            continue
+        if not isinstance(row, dict):
+            yield line_num, ValidationError("Un objet JSON est attendu")
+            continue
+        yield line_num, row
+
+
+def row_fields():
+    """
+    Champs de formulaire des colonnes, dérivés des modèles (comme un ModelForm).
+
+    Returns:
+        dict: {nom de colonne: champ de formulaire}.
+    """
+    fields = {}
+    for model, names in ((Address, ADDRESS_FIELDS), (Letting, LETTING_FIELDS)):
+        for name in names:
+            fields[name] = model._meta.get_field(name).formfield()
+    return fields
+
+
+def clean_row(row, fields):
+    """
+    Valide une ligne avec les règles des modèles et construit les objets à insérer.
+
+    Les règles sont celles des champs de formulaire des modèles (longueur
+    maximale, entier positif, champ obligatoire), appliquées sans requête en base.
+
+    Args:
+        row (dict): Valeurs brutes de la ligne.
+        fields (dict): Champs retournés par row_fields().
+
+    Returns:
+        tuple: (Address, Letting) non sauvegardés.
+
+    Raises:
+        ValidationError: Si une valeur est absente ou invalide.
+    """
+    values, errors = {}, {}
+    for name, field in fields.items():
+        try:
+            values[name] = field.clean(row.get(name))
+        except ValidationError as e:
+            errors[name] = e.messages
+    if errors:
+        raise ValidationError(errors)
+    address = Address(**{name: values[name] for name in ADDRESS_FIELDS})
+    letting = Letting(title=values['title'])
+    return address, letting
+
+
+class Command(BaseCommand):
+    """
+    Commande Django d'import en masse des lettings depuis un fichier CSV ou JSONL.
+
+    Attributes:
+        help (str): Description de la commande affichée dans --help
+
+    Examples:
+        python manage.py import_lettings lettings.csv --batch-size 2000
+    """
+
+    help = 'Importe en masse des lettings et leurs adresses depuis un fichier CSV ou JSON Lines'
+
+    def add_arguments(self, parser):
+        """
+        Ajouter les arguments de ligne de commande disponibles.
+
+        Args:
+            parser (ArgumentParser): Parser d'arguments Django
+        """
+        parser.add_argument('path', help="Fichier à importer ('-' pour l'entrée standard)")
+        parser.add_argument(
+            '--format', choices=FORMATS,
+            help="Format du fichier (défaut: déduit de l'extension)"
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Nombre de lignes insérées par transaction (défaut: 1000)'
+        )
+        parser.add_argument(
+            '--strict', action='store_true',
+            help="Interrompt l'import à la première ligne invalide au lieu de l'ignorer"
+        )
+
+    def handle(self, *args, **options):
+        """
+        Point d'entrée principal de la commande Django.
+
+        Args:
+            *args: Arguments positionnels (non utilisés)
+            **options: Options de la commande (path, format, batch_size, strict)
+
+        Raises:
+            CommandError: Fichier illisible, format inconnu, ou ligne invalide en mode strict.
+                Les lots déjà validés restent importés.
+
+        Side Effects:
+            - Crée des Address et Letting en base, par lots transactionnels
+            - Affiche la progression (lignes/seconde) sur stdout
+            - Affiche les lignes invalides sur stderr
+        """
+        path = options['path']
+        file_format = options['format'] or self._guess_format(path)
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size doit être supérieur ou égal à 1")
+
+        reader = read_csv if file_format == 'csv' else read_jsonl
+        try:
+            if path == '-':
+                stats = self._import(reader(sys.stdin), options)
+            else:
+                with open(path, encoding='utf-8-sig', newline='') as stream:
+                    stats = self._import(reader(stream), options)
+        except OSError as e:
+            raise CommandError(f"Impossible de lire {path}: {e}")
+
+        rate = stats['imported'] / stats['elapsed'] if stats['elapsed'] else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {stats['imported']} lettings importés en {stats['elapsed']:.1f}s "
+            f"({rate:.0f} lignes/s), {stats['invalid']} lignes invalides ignorées"
+        ))
+        logger.info("Import de lettings terminé: %s importés, %s invalides, %.0f lignes/s",
+                    stats['imported'], stats['invalid'], rate)
+
+    def _guess_format(self, path):
+        """
+        Déduit le format du fichier de son extension.
+
+        Raises:
+            CommandError: Si l'extension n'est pas reconnue.
+        """
+        extension = os.path.splitext(path)[1].lower().lstrip('.')
+        if extension in ('jsonl', 'ndjson'):
+            return 'jsonl'
+        if extension == 'csv':
+            return 'csv'
+        raise CommandError(f"Format de {path} inconnu: précisez --format ({', '.join(FORMATS)})")
+
+    def _import(self, rows, options):
+        """
+        Valide et insère les lignes par lots.
+
+        Args:
+            rows (iterable): Couples (numéro de ligne, dict ou ValidationError).
+            options (dict): Options de la commande.
+
+        Returns:
+            dict: imported, invalid et elapsed (secondes).
+        """
+        stats = {'imported': 0, 'invalid': 0}
+        fields = row_fields()
+        start = last_report = time.perf_counter()
+
+        for batch in batched(rows, options['batch_size']):
+            addresses, lettings = [], []
+            for line_num, row in batch:
+                try:
+                    if isinstance(row, ValidationError):
+                        raise row
+                    address, letting = clean_row(row, fields)
+                except ValidationError as e:
+                    self._report_invalid(line_num, e, stats, options['strict'])
+                    continue
+                addresses.append(address)
+                lettings.append(letting)
+
+            self._write_batch(addresses, lettings)
+            stats['imported'] += len(lettings)
+
+            now = time.perf_counter()
+            if options['verbosity'] >= 1 and now - last_report >= PROGRESS_INTERVAL:
+                self.stdout.write(f"   {stats['imported']} lettings importés "
+                                  f"({stats['imported'] / (now - start):.0f} lignes/s)")
+                last_report = now
+
+        stats['elapsed'] = time.perf_counter() - start
+        return stats
+
+    def _report_invalid(self, line_num, error, stats, strict):
+        """
+        Signale une ligne invalide, ou interrompt l'import en mode strict.
+        """
+        stats['invalid'] += 1
+        message = f"Ligne {line_num} invalide: {'; '.join(self._messages(error))}"
+        if strict:
+            raise CommandError(f"{message} (import interrompu après {stats['imported']} lettings)")
+        if stats['invalid'] <= MAX_REPORTED_ERRORS:
+            self.stderr.write(message)
+        elif stats['invalid'] == MAX_REPORTED_ERRORS + 1:
+            self.stderr.write("Autres lignes invalides non détaillées...")
+
+    @staticmethod
+    def _messages(error):
+        """
+        Met à plat les messages d'une ValidationError, préfixés par le champ.
+        """
+        if hasattr(error, 'error_dict'):
+            return [f"{field}: {' '.join(messages)}" for field, messages in error.message_dict.items()]
+        return error.messages
+
+    @staticmethod
+    def _write_batch(addresses, lettings):
+        """
+        Insère un lot d'adresses et leurs lettings dans une seule transaction.
+
+        Side Effects:
+            - Renseigne et indexe les coordonnées des adresses et indexe les lettings
+              pour la recherche, comme les receivers pre_save et post_save (non
+              déclenchés par bulk_create)
+        """
+        if not lettings:
+            return
+        geocode_addresses(addresses)
+        with transaction.atomic():
+            bulk_insert(Address, addresses)
+            index_addresses([address.pk for address in addresses])
+            for address, letting in zip(addresses, lettings):
+                letting.address_id = address.pk
+            bulk_insert(Letting, lettings)
+            index_lettings([letting.pk for letting in lettings])
@@ -1,8 +1,15 @@
 from django.db import migrations
 
+from oc_lettings_site.migration_utils import copy_in_chunks
+
+
 def copy_lettings_data(apps, schema_editor):
     """
     Copie les données des anciens modèles Address et Letting vers les nouveaux modèles.
+
+    Les clés primaires sont conservées : l'adresse d'un letting copié est celle
+    de même identifiant, sans recherche par ligne. La copie se fait par lots
+    validés séparément et reprend là où elle s'est arrêtée si elle est relancée.
     """
     try:
         OldAddress = apps.get_model('oc_lettings_site', 'Address')
@@ -10,51 +17,46 @@ def copy_lettings_data(apps, schema_editor):
     except LookupError:
         # Les anciens modèles n'existent pas, on passe
         return
-    
+
     NewAddress = apps.get_model('lettings', 'Address')
     NewLetting = apps.get_model('lettings', 'Letting')
+    using = schema_editor.connection.alias
 
     # Copier les adresses
-    for old_address in OldAddress.objects.all():
-        new_address = NewAddress.objects.create(
-            number=old_address.number,
-            street=old_address.street,
-            city=old_address.city,
-            state=old_address.state,
-            zip_code=old_address.zip_code,
-            country_iso_code=old_address.country_iso_code
-        )
-        new_address.save()
+    copy_in_chunks(OldAddress.objects.all(), NewAddress, lambda old_address: NewAddress(
+        number=old_address.number,
+        street=old_address.street,
+        city=old_address.city,
+        state=old_address.state,
+        zip_code=old_address.zip_code,
+        country_iso_code=old_address.country_iso_code
+    ), using=using)
 
     # Copier les locations
-    for old_letting in OldLetting.objects.all():
-        # Récupérer la nouvelle adresse correspondante
-        try:
-            new_address = NewAddress.objects.get(
-                number=old_letting.address.number,
-                street=old_letting.address.street,
-                city=old_letting.address.city,
-                state=old_letting.address.state,
-                zip_code=old_letting.address.zip_code,
-                country_iso_code=old_letting.address.country_iso_code
-            )
-        except NewAddress.DoesNotExist:
-            continue
-        new_letting = NewLetting.objects.create(
-            title=old_letting.title,
-            address=new_address
-        )
-        new_letting.save()
+    copy_in_chunks(OldLetting.objects.all(), NewLetting, lambda old_letting: NewLetting(
+        title=old_letting.title,
+        address_id=old_letting.address_id
+    ), using=using)
+
 
 class Migration(migrations.Migration):
     """
     Migration personnalisée pour copier les données Address et Letting.
+
+    Non atomique : chaque lot copié est validé, ce qui permet la reprise.
     """
+    atomic = False
+
+    # Les anciennes tables doivent encore exister au moment de la copie
+    run_before = [
+        ('oc_lettings_site', '0002_delete_old_models'),
+    ]
+
     dependencies = [
         ('lettings', '0001_initial'),
         ('oc_lettings_site', '0001_initial'),
     ]
 
     operations = [
-        migrations.RunPython(copy_lettings_data),
-    ]
\ No newline at end of file
+        migrations.RunPython(copy_lettings_data, migrations.RunPython.noop),
+    ]
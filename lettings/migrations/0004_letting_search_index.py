@@ -0,0 +1,54 @@
+from django.db import migrations
+from django.db.utils import OperationalError
+
+# Copie figée de l'index défini à cette date dans lettings/search.py : une
+# migration ne doit pas changer si le module évolue.
+SEARCH_TABLE = 'lettings_letting_fts'
+
+CREATE_TABLE_SQL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS lettings_letting_fts USING fts5(title, street, city, state, zip_code, "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+)
+
+REBUILD_SQL = (
+    "DELETE FROM lettings_letting_fts",
+    "INSERT INTO lettings_letting_fts (rowid, title, street, city, state, zip_code) "
+    "SELECT l.id, l.title, a.street, a.city, a.state, CAST(a.zip_code AS TEXT) FROM lettings_letting l "
+    "JOIN lettings_address a ON a.id = l.address_id",
+    "INSERT INTO lettings_letting_fts (lettings_letting_fts) VALUES ('optimize')",
+)
+
+
+def create_search_index(apps, schema_editor):
+    """
+    Crée et remplit la table FTS5 de recherche des lettings (SQLite uniquement).
+
+    Sans le module FTS5 ou sur une autre base, la recherche utilise icontains.
+    """
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    try:
+        schema_editor.execute(CREATE_TABLE_SQL)
+    except OperationalError:
+        # SQLite compilé sans FTS5
+        return
+    for sql in REBUILD_SQL:
+        schema_editor.execute(sql)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+
+
+class Migration(migrations.Migration):
+    """
+    Migration ajoutant l'index de recherche plein texte des lettings.
+    """
+    dependencies = [
+        ('lettings', '0003_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,133 @@
+import csv
+import os
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.utils import OperationalError
+
+# Copie figée du géocodage et de l'index définis à cette date dans lettings/geo.py :
+# une migration ne doit pas changer si le module évolue. Seules les tables de
+# centroïdes (données) sont lues depuis leurs fichiers.
+SPATIAL_TABLE = 'lettings_address_rtree'
+
+CREATE_TABLE_SQL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS lettings_address_rtree USING rtree(id, min_lat, max_lat, min_lon, max_lon)"
+)
+
+REBUILD_SQL = (
+    "DELETE FROM lettings_address_rtree",
+    "INSERT INTO lettings_address_rtree (id, min_lat, max_lat, min_lon, max_lon) "
+    "SELECT id, latitude, latitude, longitude, longitude FROM lettings_address "
+    "WHERE latitude IS NOT NULL AND longitude IS NOT NULL",
+)
+
+STATE_CENTROIDS_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'state_centroids.csv'
+)
+ZIP_COLUMNS = ('zip', 'GEOID')
+LATITUDE_COLUMNS = ('latitude', 'INTPTLAT')
+LONGITUDE_COLUMNS = ('longitude', 'INTPTLONG')
+BATCH_SIZE = 2000
+
+
+def _column(row, names):
+    for name in names:
+        if name in row:
+            return row[name]
+    raise KeyError(f"Colonne manquante, attendue parmi: {', '.join(names)}")
+
+
+def read_centroids(path, key_columns):
+    """
+    Lit une table de centroïdes (CSV, ou TSV pour les fichiers Gazetteer) : {clé: (latitude, longitude)}.
+    """
+    with open(path, encoding='utf-8-sig', newline='') as stream:
+        header = stream.readline()
+        delimiter = '\t' if '\t' in header else ','
+        names = [name.strip() for name in header.strip().split(delimiter)]
+        return {
+            _column(row, key_columns).strip(): (
+                float(_column(row, LATITUDE_COLUMNS)), float(_column(row, LONGITUDE_COLUMNS))
+            )
+            for row in csv.DictReader(stream, fieldnames=names, delimiter=delimiter)
+        }
+
+
+def geocoder():
+    """
+    Retourne la fonction de géocodage : centroïde du code postal, à défaut moyenne
+    des codes postaux de même préfixe à 3 chiffres, à défaut centroïde de l'état.
+    """
+    zips = read_centroids(settings.ZIP_CENTROIDS_PATH, ZIP_COLUMNS)
+    prefixes = {}
+    for zip_code, point in zips.items():
+        prefixes.setdefault(zip_code[:3], []).append(point)
+    zip3 = {
+        prefix: (sum(lat for lat, _ in points) / len(points), sum(lon for _, lon in points) / len(points))
+        for prefix, points in prefixes.items()
+    }
+    states = read_centroids(STATE_CENTROIDS_PATH, ('state',))
+
+    def geocode(zip_code, state):
+        key = f'{zip_code:05d}' if isinstance(zip_code, int) else str(zip_code or '').zfill(5)
+        return zips.get(key) or zip3.get(key[:3]) or states.get((state or '').upper()) or (None, None)
+
+    return geocode
+
+
+def geocode_existing_addresses(apps, schema_editor):
+    """
+    Renseigne les coordonnées des adresses existantes puis crée l'index R*Tree (SQLite uniquement).
+
+    Sans le module R*Tree ou sur une autre base, la recherche par proximité
+    filtre une boîte englobante avec l'ORM.
+    """
+    manager = apps.get_model('lettings', 'Address')._default_manager.using(schema_editor.connection.alias)
+    geocode = geocoder()
+    batch = []
+    for address in manager.only('id', 'zip_code', 'state').order_by('pk').iterator(chunk_size=BATCH_SIZE):
+        address.latitude, address.longitude = geocode(address.zip_code, address.state)
+        batch.append(address)
+        if len(batch) == BATCH_SIZE:
+            manager.bulk_update(batch, ['latitude', 'longitude'])
+            batch = []
+    if batch:
+        manager.bulk_update(batch, ['latitude', 'longitude'])
+
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    try:
+        schema_editor.execute(CREATE_TABLE_SQL)
+    except OperationalError:
+        # SQLite compilé sans R*Tree
+        return
+    for sql in REBUILD_SQL:
+        schema_editor.execute(sql)
+
+
+def drop_spatial_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {SPATIAL_TABLE}')
+
+
+class Migration(migrations.Migration):
+    """
+    Migration ajoutant les coordonnées des adresses et leur index spatial.
+    """
+    dependencies = [
+        ('lettings', '0004_letting_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='address',
+            name='latitude',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='address',
+            name='longitude',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(geocode_existing_addresses, drop_spatial_index),
+    ]
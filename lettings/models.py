@@ -6,8 +6,10 @@ pour gérer les adresses et les locations.
 """
 import logging
 from django.db import models
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import post_save, post_delete, pre_save
 from django.dispatch import receiver
+from .geo import geocode, index_addresses, remove_addresses
+from .search import index_lettings, remove_lettings
 
 
 class Address(models.Model):
@@ -20,6 +22,10 @@ class Address(models.Model):
     state = models.CharField(max_length=2, null=False)
     zip_code = models.PositiveIntegerField(null=False)
     country_iso_code = models.CharField(max_length=3, null=False)
+    # Centroïde du code postal (voir lettings/geo.py), recalculé à chaque sauvegarde
+    latitude = models.FloatField(null=True, blank=True, editable=False)
+    longitude = models.FloatField(null=True, blank=True, editable=False)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         """
@@ -41,6 +47,7 @@ class Letting(models.Model):
     """
     title = models.CharField(max_length=256, null=False)
     address = models.OneToOneField(Address, on_delete=models.CASCADE)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         """
@@ -59,8 +66,25 @@ class Letting(models.Model):
 logger = logging.getLogger('lettings')
 
 
+@receiver(pre_save, sender=Address)
+def address_geocode(sender, instance, **kwargs):
+    """
+    Signal Django déclenché avant la sauvegarde d'une adresse.
+
+    Args:
+        sender (class): Classe du modèle qui a envoyé le signal (Address)
+        instance (Address): Instance de l'adresse à sauvegarder
+        **kwargs: Arguments supplémentaires du signal Django
+
+    Side Effects:
+        - Renseigne latitude et longitude à partir du code postal et de
+          l'état, pour qu'elles suivent toute modification de l'adresse
+    """
+    instance.latitude, instance.longitude = geocode(instance.zip_code, instance.state)
+
+
 @receiver(post_save, sender=Address)
-def address_saved(sender, instance, created, **kwargs):
+def address_saved(sender, instance, created, using, **kwargs):
     """
     Signal Django déclenché automatiquement après sauvegarde d'une adresse.
 
@@ -81,6 +105,11 @@ def address_saved(sender, instance, created, **kwargs):
     Side Effects:
         - Enregistre un log INFO avec représentation string de l'adresse
         - Log différencié selon création ou modification
+        - Reporte la date de modification sur le letting associé (updated_at),
+          utilisée par les validateurs HTTP de sa page de détail et par la clé
+          de sa carte d'adresse en cache
+        - Réindexe le letting associé pour la recherche plein texte
+        - Indexe les coordonnées de l'adresse pour la recherche par proximité
 
     Connected To:
         post_save signal du modèle Address via @receiver decorator
@@ -93,14 +122,18 @@ def address_saved(sender, instance, created, **kwargs):
         INFO - Nouvelle adresse créée: 123 Main Street, Paris, IL 75001, FR
         INFO - Adresse mise à jour: 123 Main Street, Paris, IL 75001, FR
     """
+    index_addresses([instance.pk], using=using)
     if created:
         logger.info(f"Nouvelle adresse créée: {instance}")
     else:
         logger.info(f"Adresse mise à jour: {instance}")
+        lettings = Letting.objects.filter(address_id=instance.pk)
+        lettings.update(updated_at=instance.updated_at)
+        index_lettings(list(lettings.values_list('id', flat=True)), using=using)
 
 
 @receiver(post_delete, sender=Address)
-def address_deleted(sender, instance, **kwargs):
+def address_deleted(sender, instance, using, **kwargs):
     """
     Signal Django déclenché automatiquement après suppression d'une adresse.
 
@@ -118,6 +151,7 @@ def address_deleted(sender, instance, **kwargs):
 
     Side Effects:
         - Enregistre un log WARNING avec représentation string de l'adresse
+        - Retire l'adresse de l'index de recherche par proximité
 
     Connected To:
         post_delete signal du modèle Address via @receiver decorator
@@ -130,10 +164,11 @@ def address_deleted(sender, instance, **kwargs):
         WARNING - Adresse supprimée: 123 Main Street, Paris, IL 75001, FR
     """
     logger.warning(f"Adresse supprimée: {instance}")
+    remove_addresses([instance.pk], using=using)
 
 
 @receiver(post_save, sender=Letting)
-def letting_saved(sender, instance, created, **kwargs):
+def letting_saved(sender, instance, created, using, **kwargs):
     """
     Signal Django déclenché automatiquement après sauvegarde d'un letting.
 
@@ -154,6 +189,7 @@ def letting_saved(sender, instance, created, **kwargs):
     Side Effects:
         - Enregistre un log INFO avec le titre du letting
         - Log différencié selon création ou modification
+        - Indexe le letting (titre et adresse) pour la recherche plein texte
 
     Connected To:
         post_save signal du modèle Letting via @receiver decorator
@@ -170,10 +206,11 @@ def letting_saved(sender, instance, created, **kwargs):
         logger.info(f"Nouveau letting créé: {instance.title}")
     else:
         logger.info(f"Letting mis à jour: {instance.title}")
+    index_lettings([instance.pk], using=using)
 
 
 @receiver(post_delete, sender=Letting)
-def letting_deleted(sender, instance, **kwargs):
+def letting_deleted(sender, instance, using, **kwargs):
     """
     Signal Django déclenché automatiquement après suppression d'un letting.
 
@@ -191,6 +228,7 @@ def letting_deleted(sender, instance, **kwargs):
 
     Side Effects:
         - Enregistre un log WARNING avec le titre du letting
+        - Retire le letting de l'index de recherche plein texte
 
     Connected To:
         post_delete signal du modèle Letting via @receiver decorator
@@ -203,3 +241,4 @@ def letting_deleted(sender, instance, **kwargs):
         WARNING - Letting supprimé: Cozy Downtown Apartment
     """
     logger.warning(f"Letting supprimé: {instance.title}")
+    remove_lettings([instance.pk], using=using)
@@ -0,0 +1,222 @@
+"""
+Recherche plein texte des lettings.
+
+Sur SQLite, la recherche s'appuie sur la table virtuelle FTS5 SEARCH_TABLE
+(titre du letting, rue, ville, état et code postal de son adresse), dont le
+rowid est l'identifiant du letting. Les receivers de lettings/models.py et
+les commandes d'écriture en masse la tiennent à jour avec index_lettings et
+remove_lettings.
+
+Les résultats sont triés par pertinence (bm25) puis par identifiant, et
+paginés par curseur sur ce couple : une page coûte une requête MATCH bornée
+par LIMIT, sans OFFSET. Sur les autres bases, une recherche icontains
+paginée par identifiant est utilisée à la place.
+"""
+import math
+import re
+
+from django.db import connections, router
+from django.db.models import Q
+
+from oc_lettings_site.bulk import batched
+from oc_lettings_site.pagination import KeysetPage, KeysetPaginator, decode_cursor, encode_cursor, parse_id
+
+SEARCH_TABLE = 'lettings_letting_fts'
+
+# Colonnes indexées : (colonne FTS, expression SQL sur lettings_letting l / lettings_address a)
+SEARCH_COLUMNS = (
+    ('title', 'l.title'),
+    ('street', 'a.street'),
+    ('city', 'a.city'),
+    ('state', 'a.state'),
+    ('zip_code', 'CAST(a.zip_code AS TEXT)'),
+)
+
+# Nombre maximal de mots pris en compte dans une recherche
+MAX_TERMS = 8
+
+WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def create_table_sql():
+    """
+    Retourne l'instruction de création de la table FTS5 (utilisée par la migration).
+    """
+    columns = ', '.join(name for name, _ in SEARCH_COLUMNS)
+    # prefix : index des préfixes de 2 et 3 caractères pour la recherche « en cours de frappe »
+    return (f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5({columns}, "
+            f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')")
+
+
+def _insert_sql(where):
+    columns = ', '.join(name for name, _ in SEARCH_COLUMNS)
+    expressions = ', '.join(expression for _, expression in SEARCH_COLUMNS)
+    return (f"INSERT INTO {SEARCH_TABLE} (rowid, {columns}) "
+            f"SELECT l.id, {expressions} FROM lettings_letting l "
+            f"JOIN lettings_address a ON a.id = l.address_id {where}")
+
+
+_fts_available = {}
+
+
+def uses_fts(using):
+    """
+    Indique si la base donnée dispose de l'index FTS5.
+
+    La migration ne crée la table que sur SQLite compilé avec FTS5. Seule
+    une réponse positive est mémorisée (par alias) : la table peut être créée
+    par la migration après une première vérification.
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return False
+    if using not in _fts_available and SEARCH_TABLE in connection.introspection.table_names():
+        _fts_available[using] = True
+    return _fts_available.get(using, False)
+
+
+def index_lettings(letting_ids, using='default'):
+    """
+    Indexe (ou réindexe) les lettings donnés avec leur adresse actuelle.
+
+    Args:
+        letting_ids (iterable[int]): Identifiants des lettings à indexer.
+        using (str): Alias de la base principale.
+
+    Returns:
+        None
+    """
+    if not uses_fts(using):
+        return
+    with connections[using].cursor() as cursor:
+        # Lots de 500 : limite de 999 paramètres par requête sur SQLite
+        for batch in batched(letting_ids, 500):
+            placeholders = ', '.join(['%s'] * len(batch))
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid IN ({placeholders})", batch)
+            cursor.execute(_insert_sql(f"WHERE l.id IN ({placeholders})"), batch)
+
+
+def remove_lettings(letting_ids, using='default'):
+    """
+    Retire les lettings donnés de l'index.
+
+    Args:
+        letting_ids (iterable[int]): Identifiants des lettings supprimés.
+        using (str): Alias de la base principale.
+    """
+    if not uses_fts(using):
+        return
+    with connections[using].cursor() as cursor:
+        for batch in batched(letting_ids, 500):
+            placeholders = ', '.join(['%s'] * len(batch))
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid IN ({placeholders})", batch)
+
+
+def rebuild_index(using='default'):
+    """
+    Reconstruit entièrement l'index (après une écriture en masse sans signaux).
+
+    Args:
+        using (str): Alias de la base principale.
+    """
+    if not uses_fts(using):
+        return
+    with connections[using].cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+        cursor.execute(_insert_sql(''))
+        cursor.execute(f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('optimize')")
+
+
+def search_terms(query):
+    """
+    Extrait les mots d'une saisie utilisateur.
+
+    Args:
+        query (str): Saisie brute (ex: "loft par").
+
+    Returns:
+        list[str]: Mots à rechercher, au plus MAX_TERMS.
+    """
+    return WORD_RE.findall(query or '')[:MAX_TERMS]
+
+
+def match_expression(terms):
+    """
+    Construit l'expression MATCH FTS5 : tous les mots, chacun en préfixe.
+
+    Chaque mot est placé entre guillemets : la saisie ne peut pas injecter
+    d'opérateurs FTS5 (NEAR, OR, colonnes...).
+    """
+    return ' AND '.join(f'"{term}"*' for term in terms)
+
+
+def _parse_rank_cursor(value):
+    rank, _, letting_id = value.partition(':')
+    rank = float(rank)
+    if not math.isfinite(rank):
+        raise ValueError(f"Rang invalide: {rank!r}")
+    return rank, parse_id(letting_id)
+
+
+def search_lettings(query, page_size, after=None):
+    """
+    Recherche les lettings correspondant à la saisie, par pertinence décroissante.
+
+    Args:
+        query (str): Saisie de l'utilisateur.
+        page_size (int): Nombre de résultats par page.
+        after (str | None): Curseur de la page précédente (page.next_cursor).
+
+    Returns:
+        KeysetPage: Lettings de la page (adresse préchargée), avec next_cursor.
+
+    Raises:
+        InvalidCursor: Si le curseur est invalide.
+    """
+    # Import local : lettings/models.py importe ce module pour ses receivers
+    from .models import Letting
+
+    terms = search_terms(query)
+    if not terms:
+        return KeysetPage([])
+
+    using = router.db_for_read(Letting)
+    if not uses_fts(using):
+        return _search_icontains(terms, page_size, after)
+
+    params = [match_expression(terms)]
+    where = ''
+    if after:
+        rank, letting_id = decode_cursor(after, _parse_rank_cursor)
+        where = 'AND (rank > %s OR (rank = %s AND rowid > %s))'
+        params += [rank, rank, letting_id]
+    sql = (f"SELECT rowid, rank FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s {where} "
+           f"ORDER BY rank, rowid LIMIT %s")
+    with connections[using].cursor() as cursor:
+        cursor.execute(sql, params + [page_size + 1])
+        rows = cursor.fetchall()
+
+    has_next = len(rows) > page_size
+    rows = rows[:page_size]
+    lettings = Letting.objects.using(using).select_related('address').in_bulk([letting_id for letting_id, _ in rows])
+    # Une ligne d'index sans letting (suppression concurrente) est ignorée
+    object_list = [lettings[letting_id] for letting_id, _ in rows if letting_id in lettings]
+    next_cursor = encode_cursor('%r:%d' % (rows[-1][1], rows[-1][0])) if has_next else None
+    return KeysetPage(object_list, next_cursor)
+
+
+def _search_icontains(terms, page_size, after):
+    """
+    Recherche de repli sans index plein texte (bases autres que SQLite).
+    """
+    from .models import Letting
+
+    queryset = Letting.objects.select_related('address')
+    for term in terms:
+        queryset = queryset.filter(
+            Q(title__icontains=term) | Q(address__street__icontains=term) | Q(address__city__icontains=term)
+            | Q(address__state__iexact=term) | Q(address__zip_code__startswith=term)
+        )
+    page = KeysetPaginator(queryset, key='id', page_size=page_size, cast=parse_id).get_page(after=after)
+    # Pas de page précédente : la navigation se fait vers l'avant depuis la recherche
+    return KeysetPage(page.object_list, page.next_cursor)
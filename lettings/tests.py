@@ -4,11 +4,21 @@ Tests pour l'application lettings.
 Ce module contient tous les tests pour les modèles, vues et URLs
 de l'application lettings.
 """
+import json
+import logging
 import pytest
+from io import StringIO
 from unittest.mock import patch
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.db.migrations.executor import MigrationExecutor
 from django.urls import reverse
 from django.test import Client
+from django.utils import timezone
+from lettings.geo import geocode, geocode_addresses, nearby_lettings
 from lettings.models import Address, Letting
+from oc_lettings_site.pagination import encode_cursor
 
 
 @pytest.fixture
@@ -113,10 +123,12 @@ class TestLettingsViews:
         response = client.get(reverse('lettings:index'))
         assert response.status_code == 200
 
-        # Vérifier que les logs ont été appelés
-        assert mock_logger.info.call_count == 2
-        mock_logger.info.assert_any_call("Accès à la liste des lettings par 127.0.0.1")
-        mock_logger.info.assert_any_call("Récupération de 1 lettings")
+        # Vérifier que les logs ont été appelés, formatage différé
+        mock_logger.endpoint.assert_called_once_with('lettings:index')
+        log = mock_logger.endpoint.return_value
+        assert log.info.call_count == 2
+        log.info.assert_any_call("Accès à la liste des lettings par %s", "127.0.0.1")
+        log.info.assert_any_call("Récupération de %s lettings", 1)
 
     @patch('lettings.views.logger')
     def test_letting_detail_view_logging(self, mock_logger, client, letting):
@@ -126,10 +138,11 @@ class TestLettingsViews:
         )
         assert response.status_code == 200
 
-        # Vérifier que les logs ont été appelés
-        assert mock_logger.info.call_count == 2
-        mock_logger.info.assert_any_call("Accès au letting ID 1 par 127.0.0.1")
-        mock_logger.info.assert_any_call("Letting 'Test Letting' récupéré avec succès")
+        # Vérifier que les logs ont été appelés, formatage différé
+        log = mock_logger.endpoint.return_value
+        assert log.info.call_count == 2
+        log.info.assert_any_call("Accès au letting ID %s par %s", letting.id, "127.0.0.1")
+        log.info.assert_any_call("Letting '%s' récupéré avec succès", 'Test Letting')
 
     @patch('lettings.views.logger')
     def test_letting_detail_view_404_logging(self, mock_logger, client):
@@ -140,7 +153,9 @@ class TestLettingsViews:
         assert response.status_code == 404
 
         # Vérifier que le log warning a été appelé
-        mock_logger.warning.assert_called_once_with("Letting avec l'ID 9999 introuvable - 404")
+        mock_logger.endpoint.return_value.warning.assert_called_once_with(
+            "Letting avec l'ID %s introuvable - 404", 9999
+        )
 
     @patch('lettings.models.Letting.objects.all')
     @patch('lettings.views.logger')
@@ -153,7 +168,10 @@ class TestLettingsViews:
             client.get(reverse('lettings:index'))
 
         # Vérifier que l'erreur a été loggée
-        mock_logger.error.assert_called_once_with("Erreur lors de la récupération des lettings: Database error")
+        log = mock_logger.endpoint.return_value
+        log.error.assert_called_once()
+        msg, *args = log.error.call_args[0]
+        assert msg % tuple(args) == "Erreur lors de la récupération des lettings: Database error"
 
     @patch('lettings.views.get_object_or_404')
     @patch('lettings.views.logger')
@@ -167,7 +185,133 @@ class TestLettingsViews:
 
         # Vérifier que l'erreur a été loggée
         expected_message = "Erreur lors de la récupération du letting 1: Database connection error"
-        mock_logger.error.assert_called_once_with(expected_message)
+        log = mock_logger.endpoint.return_value
+        log.error.assert_called_once()
+        msg, *args = log.error.call_args[0]
+        assert msg % tuple(args) == expected_message
+
+    def test_index_view_pagination(self, client, settings):
+        """Test la navigation par curseur entre les pages de lettings."""
+        settings.PAGINATION_PAGE_SIZE = 2
+        for i in range(3):
+            address = Address.objects.create(
+                number=i, street='Street', city='City', state='CA',
+                zip_code=12345, country_iso_code='USA'
+            )
+            Letting.objects.create(title=f'Letting {i}', address=address)
+
+        first = client.get(reverse('lettings:index'))
+        assert [item.title for item in first.context['lettings_list']] == ['Letting 0', 'Letting 1']
+        assert not first.context['page'].has_previous
+
+        second = client.get(reverse('lettings:index'), {'after': first.context['page'].next_cursor})
+        assert [item.title for item in second.context['lettings_list']] == ['Letting 2']
+        assert not second.context['page'].has_next
+
+        back = client.get(reverse('lettings:index'), {'before': second.context['page'].previous_cursor})
+        assert [item.title for item in back.context['lettings_list']] == ['Letting 0', 'Letting 1']
+
+    def test_index_view_invalid_cursor(self, client, letting):
+        """Test qu'un curseur invalide renvoie une 404."""
+        response = client.get(reverse('lettings:index'), {'after': '%%%'})
+        assert response.status_code == 404
+
+    def test_index_view_out_of_range_cursor(self, client, letting):
+        """Test qu'un curseur hors de la plage des INTEGER de SQLite renvoie une 404, pas une 500."""
+        cursor = encode_cursor(10 ** 23)
+        for direction in ('after', 'before'):
+            assert client.get(reverse('lettings:index'), {direction: cursor}).status_code == 404
+
+
+@pytest.mark.django_db
+class TestLettingsFragmentCache:
+    """Tests pour l'invalidation du cache de fragments des lettings."""
+
+    def test_row_invalidated_on_letting_update(self, client, letting):
+        """Test qu'une modification du titre re-rend la ligne de la liste."""
+        client.get(reverse('lettings:index'))
+        letting.title = 'Renamed Letting'
+        letting.save()
+
+        content = client.get(reverse('lettings:index')).content.decode()
+        assert 'Renamed Letting' in content
+        assert 'Test Letting' not in content
+
+    def test_card_invalidated_on_address_update(self, client, letting, address):
+        """Test qu'une modification de l'adresse re-rend la carte du letting."""
+        url = reverse('lettings:letting', kwargs={'letting_id': letting.id})
+        client.get(url)
+        address.city = 'Othertown'
+        address.save()
+
+        content = client.get(url).content.decode()
+        assert 'Othertown' in content
+        assert 'Anytown' not in content
+
+    def test_row_served_from_cache(self, client, letting):
+        """Test qu'une ligne non modifiée est servie depuis le cache."""
+        client.get(reverse('lettings:index'))
+        # update() ne déclenche pas de signal : la ligne en cache reste servie
+        Letting.objects.filter(id=letting.id).update(title='Silent Update')
+
+        content = client.get(reverse('lettings:index')).content.decode()
+        assert 'Test Letting' in content
+
+    def test_row_rerendered_after_write_from_another_process(self, client, letting):
+        """Test qu'une écriture sans signal dans ce processus (autre worker) change la clé de la ligne."""
+        client.get(reverse('lettings:index'))
+        Letting.objects.filter(id=letting.id).update(title='Other Worker', updated_at=timezone.now())
+
+        content = client.get(reverse('lettings:index')).content.decode()
+        assert 'Other Worker' in content
+        assert 'Test Letting' not in content
+
+    def test_fragments_expire(self, client, settings, letting):
+        """Test que les fragments sont mis en cache pour la durée configurée de l'alias 'fragments'."""
+        response = client.get(reverse('lettings:letting', kwargs={'letting_id': letting.id}))
+        assert response.context['FRAGMENT_CACHE_TIMEOUT'] == settings.CACHES['fragments']['TIMEOUT']
+
+
+@pytest.mark.django_db
+class TestLettingsConditionalGet:
+    """Tests pour les requêtes conditionnelles (ETag / Last-Modified)."""
+
+    def test_detail_not_modified_with_etag(self, client, letting):
+        """Test qu'un ETag à jour renvoie une 304."""
+        url = reverse('lettings:letting', kwargs={'letting_id': letting.id})
+        response = client.get(url)
+        assert response.has_header('Last-Modified')
+
+        response = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        assert response.status_code == 304
+
+    def test_detail_not_modified_since(self, client, letting):
+        """Test qu'une date If-Modified-Since à jour renvoie une 304."""
+        url = reverse('lettings:letting', kwargs={'letting_id': letting.id})
+        last_modified = client.get(url)['Last-Modified']
+
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == 304
+
+    def test_address_update_propagates_to_letting(self, client, letting, address):
+        """Test qu'une modification de l'adresse change l'ETag du letting."""
+        url = reverse('lettings:letting', kwargs={'letting_id': letting.id})
+        etag = client.get(url)['ETag']
+        address.street = 'Other Street'
+        address.save()
+
+        letting.refresh_from_db()
+        assert letting.updated_at == address.updated_at
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    def test_index_etag_changes_on_delete(self, client, letting):
+        """Test que la suppression d'un letting change l'ETag de la liste."""
+        etag = client.get(reverse('lettings:index'))['ETag']
+        letting.delete()
+
+        response = client.get(reverse('lettings:index'), HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert not response.has_header('Last-Modified')
 
 
 @pytest.mark.django_db
@@ -183,3 +327,387 @@ class TestLettingsURLs:
         """Test l'URL détail d'un letting."""
         url = reverse('lettings:letting', kwargs={'letting_id': letting.id})
         assert url == f'/lettings/{letting.id}/'
+
+
+CSV_HEADER = 'title,number,street,city,state,zip_code,country_iso_code\n'
+
+
+@pytest.mark.django_db
+class TestImportLettingsCommand:
+    """Tests pour la commande d'import en masse import_lettings."""
+
+    def test_import_csv_in_batches(self, tmp_path, address):
+        """Test que toutes les lignes sont importées, lot après lot, avec leur adresse."""
+        path = tmp_path / 'lettings.csv'
+        path.write_text(CSV_HEADER + ''.join(
+            f'Letting {i},{i},Street {i},Springfield,IL,62701,USA\n' for i in range(7)
+        ))
+        out = StringIO()
+
+        call_command('import_lettings', str(path), '--batch-size', '3', stdout=out)
+
+        assert Letting.objects.count() == 7
+        imported = Letting.objects.select_related('address').get(title='Letting 5')
+        assert imported.address.street == 'Street 5'
+        assert imported.address_id != address.id
+        assert '7 lettings importés' in out.getvalue()
+
+    def test_import_jsonl_skips_invalid_rows(self, tmp_path):
+        """Test que les lignes invalides sont signalées et ignorées."""
+        valid = {'title': 'Valide', 'number': 1, 'street': 'Main', 'city': 'Paris',
+                 'state': 'IL', 'zip_code': 75001, 'country_iso_code': 'FRA'}
+        path = tmp_path / 'lettings.jsonl'
+        path.write_text('\n'.join([
+            json.dumps(valid),
+            json.dumps({**valid, 'state': 'Illinois'}),
+            json.dumps({**valid, 'number': -4}),
+            '{pas du json',
+        ]))
+        err = StringIO()
+
+        call_command('import_lettings', str(path), stdout=StringIO(), stderr=err)
+
+        assert list(Letting.objects.values_list('title', flat=True)) == ['Valide']
+        errors = err.getvalue()
+        assert 'Ligne 2 invalide: state' in errors
+        assert 'Ligne 3 invalide: number' in errors
+        assert 'Ligne 4 invalide: JSON invalide' in errors
+
+    def test_strict_mode_aborts(self, tmp_path):
+        """Test qu'en mode strict la première ligne invalide interrompt l'import."""
+        path = tmp_path / 'lettings.csv'
+        path.write_text(CSV_HEADER + ',1,Main,Paris,IL,75001,FRA\n')
+
+        with pytest.raises(CommandError, match='Ligne 2 invalide: title'):
+            call_command('import_lettings', str(path), '--strict', stdout=StringIO())
+        assert not Letting.objects.exists()
+
+    def test_unknown_format(self, tmp_path):
+        """Test qu'une extension inconnue sans --format est refusée."""
+        path = tmp_path / 'lettings.txt'
+        path.write_text('')
+
+        with pytest.raises(CommandError, match='--format'):
+            call_command('import_lettings', str(path))
+
+
+@pytest.mark.django_db(transaction=True)
+class TestCopyLettingsMigration:
+    """Tests pour la migration de copie des lettings depuis l'ancienne application."""
+
+    OLD_STATE = [('oc_lettings_site', '0001_initial'), ('lettings', '0001_initial')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def test_copy_keeps_ids_and_resumes(self):
+        """Test que la copie conserve les identifiants et reprend après une interruption."""
+        old_apps = self.migrate(self.OLD_STATE)
+        try:
+            OldAddress = old_apps.get_model('oc_lettings_site', 'Address')
+            OldLetting = old_apps.get_model('oc_lettings_site', 'Letting')
+            NewAddress = old_apps.get_model('lettings', 'Address')
+            values = {'number': 1, 'street': 'Main', 'city': 'Paris', 'state': 'IL',
+                      'zip_code': 75001, 'country_iso_code': 'FRA'}
+            # Deux adresses identiques : l'ancienne recherche par valeurs les confondait
+            for pk in (5, 9, 12):
+                OldAddress.objects.create(id=pk, **values)
+            OldLetting.objects.create(id=3, title='A', address_id=9)
+            OldLetting.objects.create(id=4, title='B', address_id=5)
+            # Copie interrompue après le premier lot d'adresses
+            NewAddress.objects.create(id=5, **values)
+        finally:
+            self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+
+        assert list(Address.objects.order_by('id').values_list('id', flat=True)) == [5, 9, 12]
+        assert list(Letting.objects.order_by('id').values_list('id', 'title', 'address_id')) == [
+            (3, 'A', 9), (4, 'B', 5)
+        ]
+        # Index plein texte et spatial remplis par les migrations 0004 et 0005
+        assert all(latitude is not None for latitude in Address.objects.values_list('latitude', flat=True))
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT rowid FROM lettings_letting_fts ORDER BY rowid')
+            assert [row[0] for row in cursor.fetchall()] == [3, 4]
+            cursor.execute('SELECT id FROM lettings_address_rtree ORDER BY id')
+            assert [row[0] for row in cursor.fetchall()] == [5, 9, 12]
+        # Les prochaines insertions ne réutilisent pas un identifiant copié
+        assert Letting.objects.create(title='C', address=Address.objects.get(id=12)).id > 4
+
+
+@pytest.mark.django_db
+class TestLettingsSearch:
+    """Tests pour la recherche plein texte des lettings."""
+
+    def search(self, client, query, **params):
+        return client.get(reverse('lettings:search'), {'q': query, **params})
+
+    def make_letting(self, title, city):
+        address = Address.objects.create(number=1, street='Oak Avenue', city=city, state='CA',
+                                         zip_code=90210, country_iso_code='USA')
+        return Letting.objects.create(title=title, address=address)
+
+    def test_search_title_and_address_prefixes(self, client, letting):
+        """Test que la recherche porte sur le titre et l'adresse, par préfixe de mot."""
+        self.make_letting('Sunny Loft', 'Springfield')
+
+        assert 'Test Letting' in self.search(client, 'anyto main').content.decode()
+        assert 'Test Letting' in self.search(client, '1234').content.decode()
+        content = self.search(client, 'loft').content.decode()
+        assert 'Sunny Loft' in content and 'Test Letting' not in content
+
+    def test_index_follows_signals(self, client, letting, address):
+        """Test que l'index suit les modifications et suppressions (receivers)."""
+        address.city = 'Othertown'
+        address.save()
+        assert 'Test Letting' in self.search(client, 'othertown').content.decode()
+        assert 'Test Letting' not in self.search(client, 'anytown').content.decode()
+
+        letting.delete()
+        assert 'No lettings match' in self.search(client, 'othertown').content.decode()
+
+    def test_results_paginated_by_cursor(self, client, settings):
+        """Test que les résultats sont paginés par curseur sans doublon."""
+        settings.PAGINATION_PAGE_SIZE = 2
+        for i in range(5):
+            self.make_letting(f'Cabin {i}', 'Denver')
+
+        titles = []
+        response = self.search(client, 'cabin')
+        while True:
+            titles += [letting.title for letting in response.context['lettings_list']]
+            if not response.context['page'].has_next:
+                break
+            assert 'q=cabin&amp;after=' in response.content.decode()
+            response = self.search(client, 'cabin', after=response.context['page'].next_cursor)
+
+        assert sorted(titles) == [f'Cabin {i}' for i in range(5)]
+
+    def test_query_syntax_is_not_interpreted(self, client, letting):
+        """Test que les opérateurs FTS5 saisis par l'utilisateur sont traités comme du texte."""
+        for query in ['"', 'test OR', 'NEAR(test', 'title:test*', '-']:
+            assert self.search(client, query).status_code == 200
+
+    def test_invalid_cursor(self, client, letting):
+        """Test qu'un curseur invalide renvoie une 404."""
+        assert self.search(client, 'test', after='%%%').status_code == 404
+
+    def test_out_of_range_cursor(self, client, letting):
+        """Test qu'un curseur de rang hors limites (identifiant, rang non fini) renvoie une 404."""
+        for value in ('1.0:99999999999999999999999', 'inf:1', '1.0:-1'):
+            assert self.search(client, 'test', after=encode_cursor(value)).status_code == 404
+
+
+@pytest.mark.django_db
+class TestLettingsNearby:
+    """Tests pour les coordonnées des adresses et la recherche par proximité."""
+
+    def nearby(self, client, **params):
+        return client.get(reverse('lettings:nearby'), params)
+
+    def make_letting(self, title, zip_code, state):
+        address = Address.objects.create(number=1, street='Oak Avenue', city='Somewhere', state=state,
+                                         zip_code=zip_code, country_iso_code='USA')
+        return Letting.objects.create(title=title, address=address)
+
+    def test_geocode_fallbacks(self):
+        """Test le repli du code postal exact vers son préfixe puis vers l'état."""
+        assert geocode(10001, 'NY') == pytest.approx((40.7506, -73.9973), abs=1e-3)
+        assert geocode(2108, 'MA') == pytest.approx((42.3576, -71.0684), abs=1e-3)
+        assert geocode(10099, 'NY') == geocode(10001, 'NY')
+        assert geocode(59999, 'mt') == pytest.approx((46.92, -110.45), abs=1e-2)
+        assert geocode(99999, 'ZZ') == (None, None)
+
+    def test_coordinates_follow_address(self, address):
+        """Test que les coordonnées suivent le code postal de l'adresse."""
+        assert (address.latitude, address.longitude) == geocode(12345, 'CA')
+        address.zip_code = 98101
+        address.save()
+        address.refresh_from_db()
+        assert address.latitude == pytest.approx(47.61, abs=1e-2)
+
+    def test_nearest_first_within_radius(self, client):
+        """Test le tri par distance et la limite du rayon."""
+        self.make_letting('Boston Loft', 2108, 'MA')
+        self.make_letting('Manhattan Studio', 10001, 'NY')
+        self.make_letting('Seattle House', 98101, 'WA')
+
+        response = self.nearby(client, zip='10001', radius='400')
+        lettings = response.context['lettings_list']
+        assert [letting.title for letting in lettings] == ['Manhattan Studio', 'Boston Loft']
+        assert lettings[0].distance_km == pytest.approx(0, abs=0.01)
+        assert lettings[1].distance_km == pytest.approx(306, abs=5)
+        assert 'km' in response.content.decode()
+
+    def test_index_follows_signals(self, client, letting, address):
+        """Test que l'index spatial suit les modifications et suppressions d'adresses."""
+        assert not self.nearby(client, zip='98101', radius='10').context['lettings_list']
+        address.zip_code = 98101
+        address.state = 'WA'
+        address.save()
+        assert self.nearby(client, zip='98101', radius='10').context['lettings_list'] == [letting]
+
+        address.delete()
+        assert 'No lettings in this area' in self.nearby(client, zip='98101', radius='10').content.decode()
+
+    def test_results_paginated_by_cursor(self, client, settings):
+        """Test la pagination par curseur avec des distances égales."""
+        settings.PAGINATION_PAGE_SIZE = 2
+        for i in range(5):
+            self.make_letting(f'Flat {i}', 60601, 'IL')
+        self.make_letting('Springfield Cottage', 62701, 'IL')
+
+        titles = []
+        response = self.nearby(client, lat='41.88', lon='-87.62')
+        while True:
+            titles += [letting.title for letting in response.context['lettings_list']]
+            if 'next_url' not in response.context:
+                break
+            response = client.get(response.context['next_url'])
+
+        assert titles == [f'Flat {i}' for i in range(5)] + ['Springfield Cottage']
+
+    def test_invalid_parameters(self, client, letting):
+        """Test qu'un point ou un rayon invalide renvoie une 400, un curseur invalide une 404."""
+        assert self.nearby(client).status_code == 200
+        for params in [{'zip': 'abc'}, {'zip': '99999'}, {'lat': '91', 'lon': '0'}, {'lat': 'x'},
+                       {'zip': '10001', 'radius': '-1'}, {'zip': '10001', 'radius': 'nan'},
+                       {'lat': 'nan', 'lon': '0'}]:
+            assert self.nearby(client, **params).status_code == 400
+        assert self.nearby(client, zip='10001', after='%%%').status_code == 404
+
+    def test_out_of_range_cursor(self, client, letting):
+        """Test qu'un curseur de distance hors limites (identifiant, distance non finie) renvoie une 404."""
+        for value in ('0.5:99999999999999999999999', 'nan:1', '0.5:-1'):
+            assert self.nearby(client, lat='34', lon='-118', after=encode_cursor(value)).status_code == 404
+
+    @pytest.mark.parametrize('radius', [float('nan'), float('inf'), 0])
+    def test_nearby_lettings_rejects_invalid_radius(self, radius):
+        """Test qu'un rayon non fini ou nul est refusé avant toute requête sur l'index."""
+        with CaptureQueriesContext(connection) as queries, pytest.raises(ValueError):
+            nearby_lettings(40.75, -73.99, 10, radius_km=radius)
+        assert not queries
+
+    def test_import_geocodes_and_indexes(self, client, tmp_path):
+        """Test que l'import en masse renseigne et indexe les coordonnées."""
+        path = tmp_path / 'lettings.csv'
+        path.write_text(
+            'title,number,street,city,state,zip_code,country_iso_code\n'
+            'Harbor View,1,Pier Road,Seattle,WA,98101,USA\n'
+        )
+        call_command('import_lettings', str(path), stdout=StringIO())
+
+        assert Address.objects.get().latitude == pytest.approx(47.61, abs=1e-2)
+        titles = [letting.title for letting in self.nearby(client, zip='98101').context['lettings_list']]
+        assert titles == ['Harbor View']
+
+    def test_geocode_addresses_command(self, client, address, settings, tmp_path):
+        """Test le recalcul des coordonnées depuis un fichier Gazetteer (TSV)."""
+        path = tmp_path / 'gazetteer.txt'
+        path.write_text('GEOID\tALAND\tINTPTLAT\tINTPTLONG         \n12345\t1\t47.0\t-122.0\n')
+        settings.ZIP_CENTROIDS_PATH = str(path)
+        out = StringIO()
+        call_command('geocode_addresses', stdout=out)
+
+        assert '1 adresses géocodées' in out.getvalue()
+        address.refresh_from_db()
+        assert (address.latitude, address.longitude) == (47.0, -122.0)
+        assert self.nearby(client, lat='47', lon='-122', radius='1').context['lettings_list'] == []
+        Letting.objects.create(title='Gazetteer', address=address)
+        assert len(self.nearby(client, lat='47', lon='-122', radius='1').context['lettings_list']) == 1
+
+    def test_state_fallback_is_logged(self, settings, tmp_path, caplog):
+        """Test qu'une adresse absente de la table des codes postaux est signalée, une fois par lot."""
+        path = tmp_path / 'gazetteer.txt'
+        path.write_text('GEOID\tALAND\tINTPTLAT\tINTPTLONG\n98101\t1\t47.61\t-122.33\n')
+        settings.ZIP_CENTROIDS_PATH = str(path)
+        with caplog.at_level(logging.WARNING, logger='lettings.geo'):
+            assert geocode(98101, 'WA') == (47.61, -122.33)
+            assert not caplog.records
+            assert geocode(60601, 'IL') == pytest.approx((40.0, -89.2), abs=1)
+            assert len(caplog.records) == 1 and '60601' in caplog.text
+
+            caplog.clear()
+            addresses = [Address(zip_code=zip_code, state=state) for zip_code, state in
+                         [(98101, 'WA'), (60601, 'IL'), (62701, 'IL')]]
+            geocode_addresses(addresses)
+            assert [record.getMessage() for record in caplog.records] == [
+                "2 adresses sur 3 absentes de ZIP_CENTROIDS_PATH, placées au centre de leur état"
+            ]
+
+
+@pytest.mark.django_db
+class TestLettingsApi:
+    """Tests pour l'API JSON des lettings."""
+
+    def streamed_json(self, response):
+        assert response['Content-Type'] == 'application/json'
+        return json.loads(b''.join(response.streaming_content))
+
+    def test_list_streams_in_chunks(self, client, settings, letting):
+        """Test que la liste est diffusée par lots, dans l'ordre des identifiants."""
+        settings.API_CHUNK_SIZE = 2
+        for i in range(4):
+            address = Address.objects.create(number=i, street='Elm Street', city='Denver', state='CO',
+                                             zip_code=80201, country_iso_code='USA')
+            Letting.objects.create(title=f'Flat {i}', address=address)
+
+        response = client.get(reverse('lettings-api:list'))
+        assert len(list(response.streaming_content)) == 5  # ouverture, 3 lots, fermeture
+        data = self.streamed_json(client.get(reverse('lettings-api:list')))
+        assert [row['title'] for row in data['results']] == ['Test Letting'] + [f'Flat {i}' for i in range(4)]
+        assert data['results'][0]['city'] == 'Anytown'
+        assert data['results'][0]['zip_code'] == 12345
+
+        data = self.streamed_json(client.get(reverse('lettings-api:list'), {'after': letting.id + 3}))
+        assert [row['title'] for row in data['results']] == ['Flat 3']
+
+    def test_fields_limit_selected_columns(self, client, letting):
+        """Test que 'fields' restreint les colonnes de la requête SQL."""
+        with CaptureQueriesContext(connection) as queries:
+            data = self.streamed_json(client.get(reverse('lettings-api:list'), {'fields': 'title,city'}))
+        assert data['results'] == [{'title': 'Test Letting', 'city': 'Anytown'}]
+        select = [query['sql'] for query in queries if 'lettings_letting' in query['sql']][-1]
+        assert '"lettings_address"."city"' in select and 'street' not in select
+
+        response = client.get(reverse('lettings-api:list'), {'fields': 'title,password'})
+        assert response.status_code == 400
+        assert 'password' in response.json()['error']
+
+    def test_detail(self, client, letting, caplog):
+        """Test la lecture d'un letting, la 404 JSON et la 400 journalisée sur un champ inconnu."""
+        response = client.get(reverse('lettings-api:detail', args=[letting.id]), {'fields': 'id,title'})
+        assert response.json() == {'id': letting.id, 'title': 'Test Letting'}
+        response = client.get(reverse('lettings-api:detail', args=[letting.id + 1]))
+        assert response.status_code == 404
+        assert response.json() == {'error': 'Letting introuvable'}
+
+        with caplog.at_level(logging.WARNING, logger='lettings'):
+            response = client.get(reverse('lettings-api:detail', args=[letting.id]), {'fields': 'password'})
+        assert response.status_code == 400
+        assert "Lecture d'un letting invalide" in caplog.text and 'password' in caplog.text
+
+    def test_batch_in_one_query(self, client, letting, django_assert_num_queries):
+        """Test la lecture groupée par identifiants, en une requête et dans l'ordre demandé."""
+        other = Letting.objects.create(title='Other', address=Address.objects.create(
+            number=1, street='Elm Street', city='Denver', state='CO', zip_code=80201, country_iso_code='USA'))
+        ids = f'{other.id},999,{letting.id}'
+        with django_assert_num_queries(1):
+            data = client.get(reverse('lettings-api:batch'), {'ids': ids, 'fields': 'title'}).json()
+        assert data == {'results': [{'title': 'Other'}, {'title': 'Test Letting'}], 'missing': [999]}
+
+        for params in [{}, {'ids': 'a,b'}, {'ids': ','.join(str(i) for i in range(101))}]:
+            assert client.get(reverse('lettings-api:batch'), params).status_code == 400
+
+    def test_out_of_range_ids(self, client, letting):
+        """Test qu'un identifiant hors de la plage des INTEGER de SQLite renvoie une 400, avant la diffusion."""
+        huge = str(2 ** 63)
+        for url, params in [(reverse('lettings-api:list'), {'after': huge}),
+                            (reverse('lettings-api:list'), {'after': '-1'}),
+                            (reverse('lettings-api:batch'), {'ids': f'{letting.id},{huge}'})]:
+            response = client.get(url, params)
+            assert response.status_code == 400 and not response.streaming
+            assert 'error' in response.json()
+        assert client.get(reverse('lettings-api:list'), {'after': str(2 ** 63 - 1)}).status_code == 200
+        assert client.get(reverse('lettings-api:detail', args=[int(huge)])).status_code == 404
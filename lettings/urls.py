@@ -11,5 +11,7 @@ app_name = 'lettings'
 
 urlpatterns = [
     path('', views.index, name='index'),
+    path('search/', views.search, name='search'),
+    path('nearby/', views.nearby, name='nearby'),
     path('<int:letting_id>/', views.letting, name='letting'),
 ]
@@ -4,17 +4,72 @@ Module contenant les vues pour l'application lettings.
 Ce module définit les vues pour afficher la liste des locations
 et les détails d'une location spécifique.
 """
-import logging
+import math
+
+from django.conf import settings
 from django.shortcuts import render, get_object_or_404
 from django.http import Http404
+from django.urls import reverse
+from oc_lettings_site.access_log import get_access_logger
+from oc_lettings_site.conditional import conditional_page, make_etag
+from oc_lettings_site.pagination import KeysetPaginator, InvalidCursor, parse_id
+from .geo import geocode, nearby_lettings
 from .models import Letting
+from .search import search_lettings
+
+logger = get_access_logger('lettings')
+
+
+def index_validators(request):
+    """
+    Calcule l'ETag de la page de liste demandée.
+
+    Seuls l'identifiant et la date de modification des lignes de la page (plus
+    celle qui détermine la présence d'une page suivante) sont lus. L'ETag
+    change donc aussi lorsqu'un letting de la page est créé ou supprimé ;
+    aucun Last-Modified n'est émis car une suppression ne le ferait pas avancer.
+
+    Args:
+        request: L'objet HttpRequest de Django.
+
+    Returns:
+        tuple: (etag, None), ou (None, None) si le curseur est invalide.
+    """
+    paginator = KeysetPaginator(
+        Letting.objects.values('id', 'updated_at'), key='id',
+        page_size=settings.PAGINATION_PAGE_SIZE, cast=parse_id
+    )
+    try:
+        page = paginator.get_page(after=request.GET.get('after'), before=request.GET.get('before'))
+    except InvalidCursor:
+        return None, None
+    return make_etag(request.get_full_path(), page.object_list, page.next_cursor), None
+
+
+def letting_validators(request, letting_id):
+    """
+    Lit la date de modification d'un letting pour valider sa page de détail.
+
+    Args:
+        request: L'objet HttpRequest de Django.
+        letting_id: L'identifiant de la location.
 
-logger = logging.getLogger('lettings')
+    Returns:
+        tuple: (etag, last_modified), ou (None, None) si le letting n'existe pas.
+    """
+    updated_at = Letting.objects.filter(id=letting_id).values_list('updated_at', flat=True).first()
+    if updated_at is None:
+        return None, None
+    return make_etag('letting', letting_id, updated_at), updated_at
 
 
+@conditional_page(index_validators)
 def index(request):
     """
-    Affiche la liste des locations.
+    Affiche une page de la liste des locations.
+
+    La liste est paginée par curseur sur l'identifiant : les paramètres
+    'after' et 'before' de la query string désignent la page à afficher.
 
     Args:
         request: L'objet HttpRequest de Django.
@@ -22,18 +77,28 @@ def index(request):
     Returns:
         HttpResponse: La réponse HTTP avec le template rendu.
     """
-    logger.info(f"Accès à la liste des lettings par {request.META.get('REMOTE_ADDR', 'IP inconnue')}")
+    log = logger.endpoint('lettings:index')
+    log.info("Accès à la liste des lettings par %s", request.META.get('REMOTE_ADDR', 'IP inconnue'))
 
     try:
-        lettings_list = Letting.objects.all()
-        logger.info(f"Récupération de {len(lettings_list)} lettings")
-        context = {'lettings_list': lettings_list}
+        paginator = KeysetPaginator(
+            Letting.objects.all(), key='id', page_size=settings.PAGINATION_PAGE_SIZE, cast=parse_id
+        )
+        page = paginator.get_page(
+            after=request.GET.get('after'), before=request.GET.get('before')
+        )
+        log.info("Récupération de %s lettings", len(page))
+        context = {'lettings_list': page.object_list, 'page': page}
         return render(request, 'lettings/index.html', context)
+    except InvalidCursor:
+        log.warning("Curseur de pagination des lettings invalide - 404")
+        raise Http404("Page de lettings introuvable")
     except Exception as e:
-        logger.error(f"Erreur lors de la récupération des lettings: {str(e)}")
+        log.error("Erreur lors de la récupération des lettings: %s", e)
         raise
 
 
+@conditional_page(letting_validators)
 def letting(request, letting_id):
     """
     Affiche les détails d'une location spécifique.
@@ -45,21 +110,133 @@ def letting(request, letting_id):
     Returns:
         HttpResponse: La réponse HTTP avec le template rendu.
     """
-    logger.info(f"Accès au letting ID {letting_id} par {request.META.get('REMOTE_ADDR', 'IP inconnue')}")
+    log = logger.endpoint('lettings:letting')
+    log.info("Accès au letting ID %s par %s", letting_id, request.META.get('REMOTE_ADDR', 'IP inconnue'))
 
     try:
-        letting = get_object_or_404(Letting, id=letting_id)
-        logger.info(f"Letting '{letting.title}' récupéré avec succès")
+        letting = get_object_or_404(Letting.objects.select_related('address'), id=letting_id)
+        log.info("Letting '%s' récupéré avec succès", letting.title)
 
         context = {
+            'letting_id': letting.id,
+            'updated_at': letting.updated_at,
             'title': letting.title,
             'address': letting.address,
         }
         return render(request, 'lettings/letting.html', context)
 
     except Http404:
-        logger.warning(f"Letting avec l'ID {letting_id} introuvable - 404")
+        log.warning("Letting avec l'ID %s introuvable - 404", letting_id)
         raise
     except Exception as e:
-        logger.error(f"Erreur lors de la récupération du letting {letting_id}: {str(e)}")
+        log.error("Erreur lors de la récupération du letting %s: %s", letting_id, e)
         raise
+
+
+def search(request):
+    """
+    Affiche les lettings correspondant à une recherche plein texte.
+
+    La recherche porte sur le titre et l'adresse (rue, ville, état, code
+    postal) ; chaque mot saisi est recherché en préfixe. Les résultats sont
+    triés par pertinence et paginés par curseur (paramètre 'after').
+
+    Args:
+        request: L'objet HttpRequest de Django (paramètre 'q' de la query string).
+
+    Returns:
+        HttpResponse: La réponse HTTP avec le template rendu.
+    """
+    log = logger.endpoint('lettings:search')
+    query = request.GET.get('q', '').strip()
+    log.info("Recherche de lettings '%s' par %s", query, request.META.get('REMOTE_ADDR', 'IP inconnue'))
+
+    try:
+        page = search_lettings(query, settings.PAGINATION_PAGE_SIZE, after=request.GET.get('after'))
+        log.info("Recherche '%s': %s lettings sur la page", query, len(page))
+        context = {'query': query, 'lettings_list': page.object_list, 'page': page}
+        return render(request, 'lettings/search.html', context)
+    except InvalidCursor:
+        log.warning("Curseur de recherche des lettings invalide - 404")
+        raise Http404("Page de résultats introuvable")
+    except Exception as e:
+        log.error("Erreur lors de la recherche de lettings '%s': %s", query, e)
+        raise
+
+
+def _nearby_center(params):
+    """
+    Lit le point de recherche : code postal ('zip') ou coordonnées ('lat', 'lon').
+
+    Returns:
+        tuple: (latitude, longitude), ou (None, None) si aucun point n'est fourni.
+
+    Raises:
+        ValueError: Si les coordonnées sont invalides ou le code postal inconnu.
+    """
+    zip_code = params.get('zip', '').strip()
+    if zip_code:
+        if not zip_code.isdigit() or len(zip_code) > 5:
+            raise ValueError("Code postal invalide")
+        latitude, longitude = geocode(int(zip_code), None)
+        if latitude is None:
+            raise ValueError("Code postal inconnu")
+        return latitude, longitude
+    if 'lat' not in params and 'lon' not in params:
+        return None, None
+    latitude, longitude = float(params.get('lat', '')), float(params.get('lon', ''))
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise ValueError("Coordonnées hors limites")
+    return latitude, longitude
+
+
+def nearby(request):
+    """
+    Affiche les lettings les plus proches d'un code postal ou de coordonnées.
+
+    Les lettings sont triés par distance croissante et paginés par curseur
+    (paramètre 'after'), dans la limite du rayon demandé ('radius', en km,
+    borné par settings.NEARBY_MAX_RADIUS_KM).
+
+    Args:
+        request: L'objet HttpRequest de Django (paramètres 'zip' ou 'lat'/'lon', 'radius').
+
+    Returns:
+        HttpResponse: La réponse HTTP avec le template rendu, 400 si les paramètres sont invalides.
+    """
+    log = logger.endpoint('lettings:nearby')
+    params = request.GET
+    context = {'zip': params.get('zip', ''), 'radius': params.get('radius', ''), 'lettings_list': []}
+
+    try:
+        latitude, longitude = _nearby_center(params)
+        radius = min(float(params.get('radius') or settings.NEARBY_MAX_RADIUS_KM), settings.NEARBY_MAX_RADIUS_KM)
+        if not math.isfinite(radius) or radius <= 0:
+            raise ValueError("Rayon invalide")
+    except ValueError as e:
+        log.warning("Recherche de proximité invalide (%s): %s", params.urlencode(), e)
+        context['error'] = str(e)
+        return render(request, 'lettings/nearby.html', context, status=400)
+    if latitude is None:
+        return render(request, 'lettings/nearby.html', context)
+
+    log.info("Recherche de lettings à %.0f km de (%.4f, %.4f) par %s", radius, latitude, longitude,
+             request.META.get('REMOTE_ADDR', 'IP inconnue'))
+    try:
+        page = nearby_lettings(latitude, longitude, settings.PAGINATION_PAGE_SIZE, radius_km=radius,
+                               after=params.get('after'))
+    except InvalidCursor:
+        log.warning("Curseur de recherche de proximité invalide - 404")
+        raise Http404("Page de résultats introuvable")
+    except Exception as e:
+        log.error("Erreur lors de la recherche de proximité: %s", e)
+        raise
+
+    log.info("Recherche de proximité: %s lettings sur la page", len(page))
+    query = params.copy()
+    query.pop('after', None)
+    context.update({'searched': True, 'lettings_list': page.object_list, 'page': page})
+    if page.has_next:
+        query['after'] = page.next_cursor
+        context['next_url'] = f"{reverse('lettings:nearby')}?{query.urlencode()}"
+    return render(request, 'lettings/nearby.html', context)
@@ -0,0 +1,125 @@
+"""
+Façade de journalisation des accès pour les vues.
+
+Les messages sont passés au format « %s » avec leurs arguments : le formatage
+n'a lieu que si l'enregistrement est réellement émis. Les lignes INFO (et
+DEBUG) d'un endpoint peuvent être échantillonnées à 1 requête sur N ; les
+lignes WARNING et au-delà sont toujours conservées. Le nombre de lignes
+écartées est exporté par endpoint dans la métrique Prometheus
+oc_lettings_access_log_dropped_lines_total (voir metrics.py).
+
+Example:
+    >>> logger = get_access_logger('lettings')
+    >>> log = logger.endpoint('lettings:index')
+    >>> log.info("Accès à la liste des lettings par %s", request.META.get('REMOTE_ADDR'))
+"""
+import itertools
+import logging
+
+from django.conf import settings
+
+from .metrics import DROPPED_LOG_LINES
+from .server_timing import phase
+
+
+class SampledLogger:
+    """
+    Logger dont les lignes d'accès sont échantillonnées par endpoint.
+
+    Args:
+        name (str): Nom du logger Python sous-jacent (ex: 'lettings').
+        sample_rate (int): Conserve 1 requête sur sample_rate (1 = toutes).
+    """
+
+    def __init__(self, name, sample_rate=1):
+        if sample_rate < 1:
+            raise ValueError("sample_rate doit être supérieur ou égal à 1")
+        self.logger = logging.getLogger(name)
+        self.sample_rate = sample_rate
+        self._counters = {}
+
+    def endpoint(self, name):
+        """
+        Retourne le logger d'une requête sur un endpoint donné.
+
+        La décision d'échantillonnage est prise une seule fois ici : toutes les
+        lignes INFO de la requête sont conservées ou écartées ensemble.
+
+        Args:
+            name (str): Nom de l'endpoint (nom d'URL, ex: 'lettings:letting').
+
+        Returns:
+            EndpointLogger: Logger lié à la requête.
+        """
+        keep = self.logger.isEnabledFor(logging.INFO)
+        if keep and self.sample_rate > 1:
+            counter = self._counters.setdefault(name, itertools.count())
+            keep = next(counter) % self.sample_rate == 0
+        return EndpointLogger(self, name, keep)
+
+    @staticmethod
+    def record_dropped(endpoint):
+        """
+        Comptabilise une ligne écartée par l'échantillonnage.
+        """
+        DROPPED_LOG_LINES.labels(endpoint).inc()
+
+
+class EndpointLogger:
+    """
+    Logger d'une requête, créé par SampledLogger.endpoint().
+    """
+
+    def __init__(self, sampled_logger, endpoint, keep):
+        self._sampled = sampled_logger
+        self._logger = sampled_logger.logger
+        self.endpoint = endpoint
+        self.keep = keep
+
+    # Le temps d'écriture des lignes compte pour la phase 'log' de Server-Timing
+
+    def debug(self, msg, *args):
+        if self.keep:
+            with phase('log'):
+                self._logger.debug(msg, *args)
+
+    def info(self, msg, *args):
+        if self.keep:
+            with phase('log'):
+                self._logger.info(msg, *args)
+        elif self._logger.isEnabledFor(logging.INFO):
+            self._sampled.record_dropped(self.endpoint)
+
+    def warning(self, msg, *args):
+        with phase('log'):
+            self._logger.warning(msg, *args)
+
+    def error(self, msg, *args):
+        with phase('log'):
+            self._logger.error(msg, *args)
+
+    def exception(self, msg, *args):
+        with phase('log'):
+            self._logger.exception(msg, *args)
+
+
+_loggers = {}
+
+
+def get_access_logger(name):
+    """
+    Retourne la façade de journalisation partagée d'un logger.
+
+    Le taux d'échantillonnage vient de settings.ACCESS_LOG_SAMPLE_RATES
+    (par logger) ou, à défaut, de settings.ACCESS_LOG_SAMPLE_RATE.
+
+    Args:
+        name (str): Nom du logger Python (ex: 'lettings').
+
+    Returns:
+        SampledLogger: Façade unique pour ce nom.
+    """
+    if name not in _loggers:
+        rate = settings.ACCESS_LOG_SAMPLE_RATES.get(name, settings.ACCESS_LOG_SAMPLE_RATE)
+        _loggers.setdefault(name, SampledLogger(name, rate))
+    return _loggers[name]
@@ -5,6 +5,7 @@ Ce module définit la configuration Django pour l'application principale
 qui gère les paramètres globaux du projet.
 """
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class OCLettingsSiteConfig(AppConfig):
@@ -24,3 +25,26 @@ class OCLettingsSiteConfig(AppConfig):
     """
 
     name = 'oc_lettings_site'
+
+    def ready(self):
+        """
+        Finalise la configuration une fois le registre des applications chargé.
+
+        Django a déjà appliqué settings.LOGGING à ce stade : les handlers
+        d'entrée/sortie sont alors déplacés derrière la file de journalisation
+        asynchrone si LOG_QUEUE_ENABLED est actif. Les PRAGMAs SQLite sont
+        branchés sur l'ouverture de chaque connexion.
+        """
+        from django.db.backends.signals import connection_created
+        from .db import configure_sqlite_connection
+        connection_created.connect(configure_sqlite_connection, dispatch_uid='oc_lettings_site.sqlite_pragmas')
+
+        if settings.LOG_QUEUE_ENABLED:
+            from .log_queue import install_queue_logging
+            install_queue_logging(
+                settings.LOG_QUEUE_LOGGERS,
+                settings.LOG_QUEUE_HANDLERS,
+                maxsize=settings.LOG_QUEUE_MAXSIZE,
+                overflow=settings.LOG_QUEUE_OVERFLOW,
+                block_timeout=settings.LOG_QUEUE_BLOCK_TIMEOUT,
+            )
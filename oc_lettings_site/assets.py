@@ -0,0 +1,624 @@
+"""
+Fichiers statiques dérivés des templates du projet (manage.py build_assets).
+
+Les templates déterminent ce qui est réellement utilisé de la feuille de
+style du thème (static/css/styles.css) : balises, classes et identifiants
+présents dans leur HTML. Comme PurgeCSS, un sélecteur est considéré comme
+utilisé si chacun des noms qu'il contient y figure ; pseudo-classes et
+attributs ne sont pas évalués, ce qui reste prudent.
+
+Polices : seules les graisses et styles Metropolis demandés par les règles
+utilisées sont convertis, depuis les sources OTF de assets/fonts/metropolis,
+en WOFF2 réduits aux caractères latins (unicode-range : un caractère absent
+s'affiche avec la police de repli).
+
+Feuilles de style : la feuille purgée (static/css/styles.purged.css) ne
+garde que les règles utilisées par les templates ou par les scripts du
+thème, et les variables CSS qu'elles lisent. Sa partie nécessaire au premier
+affichage (templates/critical.css) est incluse dans base.html, sans les
+états d'interaction (:hover, :focus...) ni l'impression ; la feuille purgée
+est chargée ensuite sans bloquer le rendu.
+
+Icônes : les icônes référencées par les templates (<use href="#icon-user">)
+sont copiées depuis leurs sources SVG (assets/icons/feather) dans un sprite
+de symboles (templates/icons.svg) inclus dans base.html ; aucun script ne
+remplace d'éléments au chargement de la page.
+"""
+import logging
+import os
+import re
+from collections import namedtuple
+from xml.etree import ElementTree
+from pathlib import Path
+
+from django.conf import settings
+from django.template import engines
+from fontTools import subset
+
+from .lifecycle import project_templates
+
+# fontTools détaille chaque étape du sous-ensemble au niveau INFO
+logging.getLogger('fontTools').setLevel(logging.WARNING)
+
+STYLESHEET = Path(settings.BASE_DIR) / 'static' / 'css' / 'styles.css'
+PURGED_STYLESHEET = Path(settings.BASE_DIR) / 'static' / 'css' / 'styles.purged.css'
+CRITICAL_TEMPLATE = Path(settings.BASE_DIR) / 'templates' / 'critical.css'
+
+ICON_SPRITE = Path(settings.BASE_DIR) / 'templates' / 'icons.svg'
+ICON_SOURCE_DIR = Path(settings.BASE_DIR) / 'assets' / 'icons' / 'feather'
+# Attributs de la source propres au document SVG, non repris sur le <symbol>
+ICON_IGNORED_ATTRIBUTES = {'width', 'height', 'class'}
+
+FONT_FAMILY = 'Metropolis'
+FONT_SOURCE_DIR = Path(settings.BASE_DIR) / 'assets' / 'fonts' / 'metropolis'
+FONT_OUTPUT_DIR = Path(settings.BASE_DIR) / 'static' / 'assets' / 'fonts' / 'metropolis'
+# Chemin des polices relatif à la feuille de style (réécrit en nom haché par collectstatic)
+FONT_URL = '../assets/fonts/metropolis'
+FONT_FACE_NAMES = {
+    100: 'Thin', 200: 'ExtraLight', 300: 'Light', 400: 'Regular', 500: 'Medium',
+    600: 'SemiBold', 700: 'Bold', 800: 'ExtraBold', 900: 'Black',
+}
+# Plage « latin » de Google Fonts : latin-1, ponctuation typographique, euro
+LATIN_UNICODE_RANGE = (
+    'U+0000-00FF, U+0131, U+0152-0153, U+02BB-02BC, U+02C6, U+02DA, U+02DC, U+2000-206F, '
+    'U+2074, U+20AC, U+2122, U+2191, U+2193, U+2212, U+2215, U+FEFF, U+FFFD'
+)
+
+# Graisses des mots-clés ; bolder et lighter sont relatifs au texte normal (400)
+FONT_WEIGHT_KEYWORDS = {'normal': 400, 'bold': 700, 'bolder': 700, 'lighter': 100}
+# Balises en italique dans la feuille de style par défaut des navigateurs
+ITALIC_TAGS = {'address', 'cite', 'dfn', 'em', 'i', 'var'}
+# Balises toujours présentes dans une page, même absentes des templates
+DOCUMENT_TAGS = {'html', 'body'}
+# At-rules contenant d'autres règles (les autres ont un corps de déclarations)
+GROUP_AT_RULES = ('@media', '@supports', '@document', '@layer', '@container')
+
+# Sélecteurs d'états d'interaction, inutiles au premier affichage
+INTERACTION_SELECTOR = re.compile(
+    r':(?:hover|focus|focus-visible|focus-within|active|visited|disabled|checked|valid|invalid)\b'
+    r'|::?(?:-webkit-|-moz-|-ms-|selection|placeholder|file-selector-button)'
+)
+
+# Règle CSS : prelude (sélecteurs ou at-rule), body (déclarations, None pour les règles
+# de groupe et les instructions comme @charset), children (règles d'un @media, sinon None)
+Rule = namedtuple('Rule', 'prelude body children')
+# Noms utilisés par le HTML des templates ; text_tags : balises contenant directement du texte
+TemplateUsage = namedtuple('TemplateUsage', 'tags classes ids text_tags')
+FontFace = namedtuple('FontFace', 'weight style')
+
+# Noms absents des templates mais ajoutés au document par les scripts : navbar-scrolled (js/scripts.js)
+RUNTIME_USAGE = TemplateUsage(tags=set(), classes={'navbar-scrolled'}, ids=set(), text_tags=set())
+
+COMMENT = re.compile(r'/\*.*?\*/', re.S)
+LICENSE_COMMENT = re.compile(r'/\*!.*?\*/', re.S)
+WHITESPACE = re.compile(r'\s+')
+CSS_VARIABLE_NAME = re.compile(r'var\(\s*(--[\w-]+)')
+STYLESHEET_URL = re.compile(r'url\("?(\.\./[^")]+)"?\)')
+TEMPLATE_SYNTAX = re.compile(r'{%.*?%}|{{.*?}}|{#.*?#}|<!--.*?-->', re.S)
+HTML_TAG = re.compile(r'<([a-zA-Z][\w-]*)([^>]*)>')
+TEXT_TAG = re.compile(r'<([a-zA-Z][\w-]*)\b[^>]*>\s*[^<\s]')
+HTML_ATTRIBUTE = re.compile(r'''\b(class|id)\s*=\s*(?:"([^"]*)"|'([^']*)')''')
+PSEUDO = re.compile(r'::?[\w-]+(?:\((?:[^()]|\([^()]*\))*\))?')
+ATTRIBUTE_SELECTOR = re.compile(r'\[[^\]]*\]')
+CLASS_SELECTOR = re.compile(r'\.((?:[\w-]|\\.)+)')
+ID_SELECTOR = re.compile(r'#((?:[\w-]|\\.)+)')
+TAG_SELECTOR = re.compile(r'(?:^|[\s>+~])([a-zA-Z][\w-]*)')
+CSS_ESCAPE = re.compile(r'\\(.)')
+CSS_VARIABLE = re.compile(r'var\((--[\w-]+)(?:,\s*([^)]*))?\)')
+FONT_FACE_RULE = re.compile(r'@font-face\s*\{[^}]*\}\n?')
+ICON_REFERENCE = re.compile(r'<use\b[^>]*?\bhref="#icon-([\w-]+)"')
+
+
+def template_usage(backend=None):
+    """
+    Relève les balises, classes et identifiants du HTML des templates du projet.
+
+    Les balises de template ({% %}, {{ }}) sont retirées avant l'analyse : une
+    classe ajoutée par une condition ({% if %}active{% endif %}) est relevée,
+    une classe calculée ({{ css_class }}) ne l'est pas.
+
+    Args:
+        backend (DjangoTemplates): Backend de templates (défaut: engines['django']).
+
+    Returns:
+        TemplateUsage: Noms relevés dans tous les templates.
+    """
+    backend = backend or engines['django']
+    usage = TemplateUsage(set(), set(), set(), set())
+    for name in project_templates(backend):
+        html = TEMPLATE_SYNTAX.sub(' ', backend.engine.get_template(name).source)
+        for tag, attributes in HTML_TAG.findall(html):
+            usage.tags.add(tag.lower())
+            for attribute, double_quoted, single_quoted in HTML_ATTRIBUTE.findall(attributes):
+                values = (double_quoted or single_quoted).split()
+                (usage.classes if attribute == 'class' else usage.ids).update(values)
+        usage.text_tags.update(tag.lower() for tag in TEXT_TAG.findall(html))
+    return usage
+
+
+def split_top_level(text, separator):
+    """
+    Découpe text sur separator, hors chaînes et parenthèses (url(), :not()).
+
+    Returns:
+        list[str]: Parties non vides, sans espaces autour.
+    """
+    parts, start, depth, quote = [], 0, 0, None
+    for index, char in enumerate(text):
+        if quote:
+            quote = None if char == quote else quote
+        elif char in '"\'':
+            quote = char
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == separator and depth == 0:
+            parts.append(text[start:index])
+            start = index + 1
+    parts.append(text[start:])
+    return [part.strip() for part in parts if part.strip()]
+
+
+def _block_end(text, start):
+    """
+    Position de l'accolade fermant celle ouverte en start, hors chaînes.
+    """
+    depth, quote = 0, None
+    for index in range(start, len(text)):
+        char = text[index]
+        if quote:
+            quote = None if char == quote else quote
+        elif char in '"\'':
+            quote = char
+        elif char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return index
+    raise ValueError(f"Accolade non fermée à la position {start}")
+
+
+def _parse_rules(text, position):
+    rules, start = [], position
+    while position < len(text):
+        char = text[position]
+        if char == '{':
+            prelude = text[start:position].strip()
+            if prelude.startswith(GROUP_AT_RULES):
+                children, position = _parse_rules(text, position + 1)
+                rules.append(Rule(prelude, None, children))
+            else:
+                end = _block_end(text, position)
+                rules.append(Rule(prelude, text[position + 1:end].strip(), None))
+                position = end
+            start = position + 1
+        elif char == '}':
+            return rules, position
+        elif char == ';':
+            # Instruction sans bloc (@charset, @import)
+            rules.append(Rule(text[start:position].strip(), None, None))
+            start = position + 1
+        elif char in '"\'':
+            position = text.index(char, position + 1)
+        position += 1
+    return rules, position
+
+
+def parse_stylesheet(text):
+    """
+    Découpe une feuille de style en règles, sans les commentaires.
+
+    Args:
+        text (str): Contenu CSS.
+
+    Returns:
+        list[Rule]: Règles dans l'ordre du fichier.
+    """
+    return _parse_rules(COMMENT.sub('', text), 0)[0]
+
+
+def declarations(body):
+    """
+    Déclarations d'un corps de règle.
+
+    Returns:
+        list[tuple]: (propriété en minuscules, valeur sans !important).
+    """
+    result = []
+    for declaration in split_top_level(body, ';'):
+        name, _, value = declaration.partition(':')
+        value = value.strip()
+        if value.endswith('!important'):
+            value = value[:-len('!important')].strip()
+        result.append((name.strip().lower(), value))
+    return result
+
+
+def selector_used(selector, usage):
+    """
+    Indique si un sélecteur peut correspondre au HTML des templates.
+
+    Args:
+        selector (str): Sélecteur simple ou composé (sans virgule).
+        usage (TemplateUsage): Noms relevés dans les templates.
+
+    Returns:
+        bool: True si chaque classe, identifiant et balise du sélecteur est utilisé.
+    """
+    selector = ATTRIBUTE_SELECTOR.sub('', PSEUDO.sub('', selector))
+    return (all(CSS_ESCAPE.sub(r'\1', name) in usage.classes for name in CLASS_SELECTOR.findall(selector))
+            and all(CSS_ESCAPE.sub(r'\1', name) in usage.ids for name in ID_SELECTOR.findall(selector))
+            and all(tag.lower() in usage.tags | DOCUMENT_TAGS for tag in TAG_SELECTOR.findall(selector)))
+
+
+def used_style_rules(rules, usage):
+    """
+    Parcourt les règles de style utilisées, y compris dans les @media et @supports.
+
+    Yields:
+        Rule: Règle dont au moins un sélecteur est utilisé.
+    """
+    for rule in rules:
+        if rule.children is not None:
+            yield from used_style_rules(rule.children, usage)
+        elif rule.body is not None and not rule.prelude.startswith('@'):
+            if any(selector_used(selector, usage) for selector in split_top_level(rule.prelude, ',')):
+                yield rule
+
+
+def used_font_faces(rules, usage):
+    """
+    Graisses et styles de police demandés par les règles utilisées.
+
+    Les variables CSS (var(--bs-body-font-weight)) sont résolues avec les
+    valeurs déclarées par les règles utilisées (:root). Le texte normal (400)
+    est toujours inclus ; l'italique l'est pour toutes les graisses si une
+    règle le demande ou si une balise en italique par défaut contient du texte.
+
+    Args:
+        rules (list[Rule]): Règles de la feuille de style.
+        usage (TemplateUsage): Noms relevés dans les templates.
+
+    Returns:
+        list[FontFace]: Faces triées par style puis graisse.
+    """
+    used = [declarations(rule.body) for rule in used_style_rules(rules, usage)]
+    variables = {name: value for rule in used for name, value in rule if name.startswith('--')}
+
+    def resolve(value):
+        match = CSS_VARIABLE.fullmatch(value)
+        return resolve(variables.get(match.group(1), match.group(2) or '')) if match else value
+
+    weights, italic = {400}, bool(usage.text_tags & ITALIC_TAGS)
+    for rule in used:
+        for name, value in rule:
+            value = resolve(value).lower()
+            if name == 'font-weight':
+                weight = int(value) if value.isdigit() else FONT_WEIGHT_KEYWORDS.get(value)
+                if weight:
+                    weights.add(min(FONT_FACE_NAMES, key=lambda available: abs(available - weight)))
+            elif name == 'font-style' and value in ('italic', 'oblique'):
+                italic = True
+    styles = ('normal', 'italic') if italic else ('normal',)
+    return [FontFace(weight, style) for style in styles for weight in sorted(weights)]
+
+
+def font_file_name(face):
+    """
+    Nom de fichier d'une face, sans extension (ex: 'Metropolis-MediumItalic').
+    """
+    return f"{FONT_FAMILY}-{FONT_FACE_NAMES[face.weight]}{'Italic' if face.style == 'italic' else ''}"
+
+
+def unicode_range_codepoints(unicode_range):
+    """
+    Points de code d'une plage unicode-range CSS (ex: 'U+0000-00FF, U+20AC').
+
+    Returns:
+        list[int]: Points de code.
+    """
+    codepoints = []
+    for part in split_top_level(unicode_range, ','):
+        first, _, last = part[2:].partition('-')
+        codepoints.extend(range(int(first, 16), int(last or first, 16) + 1))
+    return codepoints
+
+
+def convert_font(source, destination, unicode_range=LATIN_UNICODE_RANGE):
+    """
+    Convertit une police en WOFF2 réduit aux caractères de unicode_range.
+
+    Le fichier produit ne dépend que de la source : sa date de modification
+    interne n'est pas mise à jour, pour garder le même nom haché tant que la
+    police ne change pas.
+
+    Args:
+        source (Path): Police source (OTF ou TTF).
+        destination (Path): Fichier WOFF2 à écrire.
+        unicode_range (str): Caractères conservés.
+    """
+    options = subset.Options()
+    options.flavor = 'woff2'
+    # Charstrings CFF sans sous-routines : plus gros avant compression, plus petits après Brotli
+    options.desubroutinize = True
+    font = subset.load_font(str(source), options)
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=unicode_range_codepoints(unicode_range))
+    subsetter.subset(font)
+    font.recalcTimestamp = False
+    subset.save_font(font, str(destination), options)
+    font.close()
+
+
+def font_face_rule(face, unicode_range=LATIN_UNICODE_RANGE):
+    """
+    Règle @font-face d'une face WOFF2, dans le format de styles.css.
+    """
+    return (
+        '@font-face {\n'
+        f'  font-family: "{FONT_FAMILY}";\n'
+        f'  src: url("{FONT_URL}/{font_file_name(face)}.woff2") format("woff2");\n'
+        f'  font-weight: {face.weight};\n'
+        f'  font-style: {face.style};\n'
+        '  font-display: swap;\n'
+        f'  unicode-range: {unicode_range};\n'
+        '}\n'
+    )
+
+
+def replace_font_faces(css, faces):
+    """
+    Remplace les règles @font-face de FONT_FAMILY par celles des faces données.
+
+    Les nouvelles règles prennent la place de la première règle remplacée.
+
+    Raises:
+        ValueError: Si la feuille de style ne déclare pas FONT_FAMILY.
+    """
+    matches = [match for match in FONT_FACE_RULE.finditer(css) if FONT_FAMILY in match.group()]
+    if not matches:
+        raise ValueError(f"Aucune règle @font-face {FONT_FAMILY} dans la feuille de style")
+    for match in reversed(matches[1:]):
+        css = css[:match.start()] + css[match.end():]
+    first = matches[0]
+    return css[:first.start()] + ''.join(font_face_rule(face) for face in faces) + css[first.end():]
+
+
+def build_fonts(faces, source_dir=FONT_SOURCE_DIR, output_dir=FONT_OUTPUT_DIR):
+    """
+    Convertit les faces utilisées en WOFF2 et supprime les WOFF2 devenus inutiles.
+
+    Returns:
+        list[tuple]: (nom du fichier produit, taille de la source, taille produite) par face.
+
+    Raises:
+        FileNotFoundError: Si la source d'une face manque.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    report, produced = [], set()
+    for face in faces:
+        source = Path(source_dir) / f'{font_file_name(face)}.otf'
+        destination = Path(output_dir) / f'{font_file_name(face)}.woff2'
+        convert_font(source, destination)
+        produced.add(destination.name)
+        report.append((destination.name, source.stat().st_size, destination.stat().st_size))
+    for stale in Path(output_dir).glob('*.woff2'):
+        if stale.name not in produced:
+            stale.unlink()
+    return report
+
+
+def merge_usage(*usages):
+    """
+    Réunit plusieurs relevés de noms utilisés.
+
+    Returns:
+        TemplateUsage: Union des balises, classes et identifiants.
+    """
+    return TemplateUsage(*(set().union(*fields) for fields in zip(*usages)))
+
+
+def _minify(text):
+    return WHITESPACE.sub(' ', text).strip()
+
+
+def purge_rules(rules, usage, critical=False):
+    """
+    Règles utilisées, réduites à leurs sélecteurs utilisés.
+
+    Les @font-face et @keyframes sont conservés (voir prune_unused()), les
+    autres at-rules sans bloc (@charset, @import) sont retirées.
+
+    Args:
+        rules (list[Rule]): Règles de la feuille de style.
+        usage (TemplateUsage): Noms utilisés.
+        critical (bool): Retire aussi les sélecteurs d'états d'interaction et @media print.
+
+    Returns:
+        list[Rule]: Nouvelles règles, sans groupe vide.
+    """
+    purged = []
+    for rule in rules:
+        if rule.children is not None:
+            if critical and 'print' in rule.prelude:
+                continue
+            children = purge_rules(rule.children, usage, critical)
+            if children:
+                purged.append(Rule(rule.prelude, None, children))
+        elif rule.body is None:
+            continue
+        elif rule.prelude.startswith('@'):
+            purged.append(rule)
+        else:
+            selectors = [selector for selector in split_top_level(rule.prelude, ',')
+                         if selector_used(selector, usage)
+                         and not (critical and INTERACTION_SELECTOR.search(selector))]
+            if selectors:
+                purged.append(Rule(','.join(selectors), rule.body, None))
+    return purged
+
+
+def _walk(rules):
+    for rule in rules:
+        if rule.children is not None:
+            yield from _walk(rule.children)
+        else:
+            yield rule
+
+
+def prune_unused(rules):
+    """
+    Retire les variables CSS et les @keyframes qu'aucune règle conservée n'utilise.
+
+    Une variable lue par une autre variable utilisée est utilisée.
+
+    Returns:
+        list[Rule]: Nouvelles règles.
+    """
+    styles = [rule for rule in _walk(rules) if not rule.prelude.startswith('@')]
+    variables, values = {}, []
+    for rule in styles:
+        for declaration in split_top_level(rule.body, ';'):
+            name, _, value = declaration.partition(':')
+            if name.strip().startswith('--'):
+                variables.setdefault(name.strip(), []).append(value)
+            else:
+                values.append(value)
+    used, pending = set(), [name for value in values for name in CSS_VARIABLE_NAME.findall(value)]
+    while pending:
+        name = pending.pop()
+        if name not in used:
+            used.add(name)
+            pending.extend(found for value in variables.get(name, []) for found in CSS_VARIABLE_NAME.findall(value))
+    animations = ' '.join(values)
+
+    def prune(rules):
+        pruned = []
+        for rule in rules:
+            if rule.children is not None:
+                children = prune(rule.children)
+                if children:
+                    pruned.append(Rule(rule.prelude, None, children))
+            elif rule.prelude.startswith('@keyframes'):
+                if re.search(rf'\b{re.escape(rule.prelude.split()[-1])}\b', animations):
+                    pruned.append(rule)
+            elif rule.prelude.startswith('@'):
+                pruned.append(rule)
+            else:
+                body = ';'.join(declaration for declaration in split_top_level(rule.body, ';')
+                                if not declaration.startswith('--') or declaration.partition(':')[0].strip() in used)
+                if body:
+                    pruned.append(Rule(rule.prelude, body, None))
+        return pruned
+
+    return prune(rules)
+
+
+def serialize(rules, separator='\n'):
+    """
+    Écrit des règles en CSS minifié.
+
+    Args:
+        rules (list[Rule]): Règles à écrire.
+        separator (str): Séparateur des règles (une règle de premier niveau par ligne).
+
+    Returns:
+        str: Contenu CSS.
+    """
+    lines = []
+    for rule in rules:
+        if rule.children is not None:
+            body = serialize(rule.children, separator='')
+        else:
+            body = ';'.join(f"{name.strip()}:{_minify(value)}" for name, _, value in
+                            (declaration.partition(':') for declaration in split_top_level(rule.body, ';')))
+        lines.append(f"{_minify(rule.prelude)}{{{body}}}")
+    return separator.join(lines)
+
+
+def purge_stylesheet(css, usage):
+    """
+    Feuille de style purgée et minifiée, mentions de licence (/*! */) comprises.
+
+    Args:
+        css (str): Feuille de style du thème.
+        usage (TemplateUsage): Noms utilisés par les templates.
+
+    Returns:
+        str: Contenu de static/css/styles.purged.css.
+    """
+    rules = prune_unused(purge_rules(parse_stylesheet(css), merge_usage(usage, RUNTIME_USAGE)))
+    licenses = LICENSE_COMMENT.findall(css)
+    return '\n'.join(['@charset "UTF-8";'] + licenses + [serialize(rules)]) + '\n'
+
+
+def critical_template(css, usage):
+    """
+    Template Django de la CSS critique, inclus dans une balise <style> de base.html.
+
+    Le CSS est protégé par {% verbatim %} ; ses URLs relatives (polices)
+    deviennent des balises {% static %}, résolues en noms hachés au rendu.
+
+    Args:
+        css (str): Feuille de style du thème.
+        usage (TemplateUsage): Noms utilisés par les templates.
+
+    Returns:
+        str: Contenu de templates/critical.css.
+    """
+    content = serialize(prune_unused(purge_rules(parse_stylesheet(css), usage, critical=True)))
+    stylesheet_dir = os.path.dirname(os.path.relpath(STYLESHEET, STYLESHEET.parents[1]))
+
+    def static_url(match):
+        path = os.path.normpath(os.path.join(stylesheet_dir, match.group(1))).replace(os.sep, '/')
+        return f'url("{{% endverbatim %}}{{% static \'{path}\' %}}{{% verbatim %}}")'
+
+    return '{% load static %}{% verbatim %}' + STYLESHEET_URL.sub(static_url, content) + '{% endverbatim %}\n'
+
+
+def used_icons(backend=None):
+    """
+    Relève les icônes référencées par les templates du projet (<use href="#icon-<nom>">).
+
+    Args:
+        backend (DjangoTemplates): Backend de templates (défaut: engines['django']).
+
+    Returns:
+        list[str]: Noms des icônes, triés.
+    """
+    backend = backend or engines['django']
+    names = set()
+    for name in project_templates(backend):
+        names.update(ICON_REFERENCE.findall(backend.engine.get_template(name).source))
+    return sorted(names)
+
+
+def icon_sprite(names, source_dir=ICON_SOURCE_DIR):
+    """
+    Sprite SVG des icônes, un <symbol id="icon-<nom>"> par icône.
+
+    Le viewBox et les attributs de présentation (stroke, fill...) de chaque
+    source passent sur son symbole ; le sprite est masqué et n'occupe pas de
+    place dans la page.
+
+    Args:
+        names (list[str]): Noms des icônes (fichiers <nom>.svg de source_dir).
+        source_dir (Path): Répertoire des sources SVG.
+
+    Returns:
+        str: Contenu de templates/icons.svg.
+
+    Raises:
+        FileNotFoundError: Si la source d'une icône manque.
+    """
+    sprite = ElementTree.Element('svg', {'aria-hidden': 'true', 'style': 'display: none'})
+    for name in names:
+        source = ElementTree.parse(Path(source_dir) / f'{name}.svg').getroot()
+        for element in source.iter():
+            element.tag = element.tag.rpartition('}')[2]
+        attributes = {key: value for key, value in source.attrib.items() if key not in ICON_IGNORED_ATTRIBUTES}
+        symbol = ElementTree.SubElement(sprite, 'symbol', {'id': f'icon-{name}', **attributes})
+        symbol.extend(source)
+    return ElementTree.tostring(sprite, encoding='unicode') + '\n'
@@ -0,0 +1,88 @@
+"""
+Outils d'insertion en masse partagés par les commandes d'import et de génération.
+
+bulk_create ne renseigne les clés primaires des objets insérés que sur les
+bases capables de les retourner (PostgreSQL). Sur SQLite ou MySQL, les objets
+restent sans pk et ne peuvent pas servir de clé étrangère au lot suivant
+(Letting -> Address, Profile -> User). bulk_insert attribue donc lui-même des
+identifiants consécutifs sur ces bases, à l'intérieur de la transaction en
+cours qui verrouille la table en écriture.
+"""
+from itertools import islice
+
+from django.db import connections, router, transaction
+from django.db.models import Max
+
+
+def batched(iterable, size):
+    """
+    Découpe un itérable en listes de size éléments au plus, sans le charger entièrement.
+
+    Args:
+        iterable (iterable): Source des éléments (ex: lignes d'un fichier).
+        size (int): Taille maximale d'un lot.
+
+    Yields:
+        list: Lot d'éléments consécutifs.
+    """
+    if size < 1:
+        raise ValueError("La taille de lot doit être supérieure ou égale à 1")
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def next_ids(model, count, using=None):
+    """
+    Réserve count identifiants consécutifs après le plus grand pk existant.
+
+    Doit être appelé dans une transaction, et les objets insérés dans la
+    même transaction : aucun autre écrivain ne peut alors insérer entre-temps
+    sur SQLite (verrou de base).
+
+    Args:
+        model (Model): Modèle dont la clé primaire est un entier auto-incrémenté.
+        count (int): Nombre d'identifiants à réserver.
+        using (str): Alias de base de données.
+
+    Returns:
+        range: Identifiants réservés.
+    """
+    start = (model._default_manager.using(using).aggregate(max_pk=Max('pk'))['max_pk'] or 0) + 1
+    return range(start, start + count)
+
+
+def bulk_insert(model, objs, using=None):
+    """
+    Insère des objets en masse en garantissant qu'ils ont tous un pk ensuite.
+
+    La taille des requêtes INSERT est bornée par la limite de paramètres du
+    backend (999 variables sur SQLite), quel que soit le nombre d'objets.
+
+    Args:
+        model (Model): Modèle des objets.
+        objs (list[Model]): Instances non sauvegardées.
+        using (str): Alias de base de données (défaut: base d'écriture du modèle).
+
+    Returns:
+        list[Model]: Les objets insérés, avec leur pk.
+
+    Side Effects:
+        - Aucun signal post_save n'est émis (comportement de bulk_create)
+    """
+    if not objs:
+        return objs
+    using = using or router.db_for_write(model)
+    connection = connections[using]
+
+    with transaction.atomic(using=using, savepoint=False):
+        if not connection.features.can_return_rows_from_bulk_insert:
+            missing = [obj for obj in objs if obj.pk is None]
+            for obj, pk in zip(missing, next_ids(model, len(missing), using)):
+                obj.pk = pk
+        fields = [field for field in model._meta.concrete_fields]
+        batch_size = max(connection.ops.bulk_batch_size(fields, objs), 1)
+        return model._default_manager.using(using).bulk_create(objs, batch_size=batch_size)
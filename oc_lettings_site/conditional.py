@@ -0,0 +1,74 @@
+"""
+Requêtes HTTP conditionnelles (ETag / Last-Modified / 304 Not Modified).
+
+Le décorateur conditional_page calcule les validateurs d'une page avec une
+seule requête légère (dates de modification) avant d'exécuter la vue. Si le
+client possède déjà la version courante (If-None-Match / If-Modified-Since),
+une réponse 304 est renvoyée sans requête complète ni rendu de template.
+"""
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+
+def make_etag(*parts):
+    """
+    Construit un ETag fort à partir des éléments qui déterminent le contenu.
+
+    La version du cache (settings.CACHE_VERSION) est incluse pour que les
+    ETags changent lors d'un déploiement modifiant les templates.
+
+    Args:
+        *parts: Valeurs représentant l'état de la page (dates, identifiants...).
+
+    Returns:
+        str: ETag entre guillemets, prêt pour l'en-tête HTTP.
+    """
+    digest = hashlib.md5(repr((settings.CACHE_VERSION,) + parts).encode('utf-8'))
+    return quote_etag(digest.hexdigest())
+
+
+def conditional_page(validators_func):
+    """
+    Décorateur de vue ajoutant la gestion des requêtes GET conditionnelles.
+
+    Args:
+        validators_func (callable): Fonction appelée avec les arguments de la vue,
+            retournant un tuple (etag, last_modified). last_modified est un
+            datetime ou None ; un tuple (None, None) désactive la validation
+            (par exemple pour laisser la vue produire une 404).
+
+    Returns:
+        callable: Le décorateur à appliquer à la vue.
+
+    Example:
+        >>> @conditional_page(letting_validators)
+        ... def letting(request, letting_id):
+        ...     ...
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def inner(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view_func(request, *args, **kwargs)
+
+            etag, last_modified = validators_func(request, *args, **kwargs)
+            timestamp = int(last_modified.timestamp()) if last_modified else None
+
+            response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+            if response is None:
+                response = view_func(request, *args, **kwargs)
+
+            if response.status_code in (200, 304):
+                if etag and not response.has_header('ETag'):
+                    response['ETag'] = etag
+                if last_modified and not response.has_header('Last-Modified'):
+                    response['Last-Modified'] = http_date(timestamp)
+                # Le navigateur garde la page mais la revalide à chaque visite
+                patch_cache_control(response, no_cache=True)
+            return response
+        return inner
+    return decorator
@@ -0,0 +1,65 @@
+"""
+Initialisation des connexions à la base de données.
+
+Le receiver configure_sqlite_connection applique settings.SQLITE_PRAGMAS à
+chaque nouvelle connexion SQLite. Avec CONN_MAX_AGE, une connexion sert
+plusieurs requêtes : ce coût n'est payé qu'à son ouverture.
+"""
+import re
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+# Valeur de PRAGMA acceptée : entier (éventuellement négatif) ou mot-clé
+PRAGMA_VALUE_RE = re.compile(r'^(-?\d+|[A-Za-z_]+)$')
+
+
+def pragma_statements(pragmas):
+    """
+    Construit les instructions PRAGMA, en validant les valeurs lues de l'environnement.
+
+    Args:
+        pragmas (dict): {nom du PRAGMA: valeur}, dans l'ordre d'application.
+
+    Returns:
+        list[str]: Instructions SQL.
+
+    Raises:
+        ImproperlyConfigured: Si une valeur n'est ni un entier ni un mot-clé.
+    """
+    statements = []
+    for name, value in pragmas.items():
+        if value is None:
+            continue
+        if not PRAGMA_VALUE_RE.match(str(value)) or not name.isidentifier():
+            raise ImproperlyConfigured(f"Valeur invalide pour le PRAGMA SQLite {name}: {value!r}")
+        statements.append(f'PRAGMA {name} = {value}')
+    return statements
+
+
+def configure_sqlite_connection(sender, connection, **kwargs):
+    """
+    Receiver du signal connection_created appliquant les PRAGMAs SQLite configurés.
+
+    Args:
+        sender (class): Classe DatabaseWrapper du backend.
+        connection (DatabaseWrapper): Connexion qui vient d'être ouverte.
+        **kwargs: Arguments supplémentaires du signal.
+
+    Returns:
+        None
+
+    Side Effects:
+        - Exécute les PRAGMAs de settings.SQLITE_PRAGMAS (sans effet sur les autres backends)
+        - journal_mode=wal est persistant : il est enregistré dans le fichier de base
+        - Les connexions aux réplicas (settings.DATABASE_REPLICAS) passent en
+          lecture seule (query_only) : seul sync_replica écrit dans leurs fichiers
+    """
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = dict(settings.SQLITE_PRAGMAS)
+    if connection.alias in settings.DATABASE_REPLICAS:
+        pragmas['query_only'] = 1
+    with connection.cursor() as cursor:
+        for statement in pragma_statements(pragmas):
+            cursor.execute(statement)
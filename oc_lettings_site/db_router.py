@@ -0,0 +1,86 @@
+"""
+Routage des lectures vers les réplicas de base de données.
+
+Les lectures ne sont envoyées aux réplicas (settings.DATABASE_REPLICAS) que
+dans le contexte activé par reading_from_replicas(), c'est-à-dire pendant les
+requêtes GET publiques (voir ReplicaRoutingMiddleware). Tout le reste
+(admin, commandes de management, shell, tâches) lit et écrit sur 'default'.
+
+Dès qu'une écriture a lieu dans ce contexte (receiver de signal par
+exemple), les lectures suivantes repassent sur 'default' pour que la requête
+relise ses propres écritures.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+PRIMARY_ALIAS = 'default'
+
+# Applications toujours lues sur la base principale : une session créée à
+# l'instant n'existe pas encore sur un réplica.
+PRIMARY_ONLY_APPS = {'sessions'}
+
+
+class RoutingState:
+    """
+    État de routage d'une requête.
+
+    Attributes:
+        use_replicas (bool): Les lectures peuvent aller sur un réplica.
+        wrote (bool): Une écriture a eu lieu pendant la requête.
+    """
+
+    def __init__(self, use_replicas):
+        self.use_replicas = use_replicas
+        self.wrote = False
+
+
+_state = ContextVar('replica_routing_state', default=None)
+
+
+@contextmanager
+def reading_from_replicas(enabled=True):
+    """
+    Active la lecture sur les réplicas pour le bloc (une requête).
+
+    Args:
+        enabled (bool): False force la base principale (ex: session épinglée).
+
+    Yields:
+        RoutingState: État du bloc, dont wrote indique si une écriture a eu lieu.
+    """
+    token = _state.set(RoutingState(enabled))
+    try:
+        yield _state.get()
+    finally:
+        _state.reset(token)
+
+
+class ReadReplicaRouter:
+    """
+    Routeur Django : lectures publiques sur un réplica, tout le reste sur la base principale.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        replicas = settings.DATABASE_REPLICAS
+        if (not replicas or state is None or not state.use_replicas or state.wrote
+                or model._meta.app_label in PRIMARY_ONLY_APPS):
+            return PRIMARY_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return PRIMARY_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Les réplicas sont des copies de la base principale
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Les réplicas reçoivent le schéma par copie (manage.py sync_replica)
+        return db == PRIMARY_ALIAS
@@ -0,0 +1,31 @@
+"""
+Cache des fragments de templates rendus (lignes de listes, cartes de détail).
+
+Les templates mettent en cache leurs fragments avec le tag {% cache %} sur
+l'alias FRAGMENT_CACHE_ALIAS, en les clefant par nom de fragment, identifiant
+et date de modification (updated_at) de l'objet :
+
+    {% cache FRAGMENT_CACHE_TIMEOUT letting_row letting.id letting.updated_at using='fragments' %}
+
+Une modification de l'objet change sa clé : aucun worker ne peut servir un
+fragment périmé, même avec un cache propre à chaque processus, et l'ancienne
+entrée expire après FRAGMENT_CACHE_TIMEOUT secondes (ou est évincée avant).
+La version du cache (settings.CACHE_VERSION) complète la clé, ce qui invalide
+tous les fragments d'un coup lors d'un déploiement changeant le HTML.
+"""
+from django.core.cache import caches
+
+FRAGMENT_CACHE_ALIAS = 'fragments'
+
+
+def fragment_cache(request):
+    """
+    Context processor : durée de vie des fragments, premier argument des tags {% cache %}.
+
+    Args:
+        request: L'objet HttpRequest de Django.
+
+    Returns:
+        dict: FRAGMENT_CACHE_TIMEOUT, en secondes (TIMEOUT de l'alias 'fragments').
+    """
+    return {'FRAGMENT_CACHE_TIMEOUT': caches[FRAGMENT_CACHE_ALIAS].default_timeout}
@@ -0,0 +1,155 @@
+"""
+Outils partagés par les endpoints JSON en lecture seule (lettings et profiles).
+
+Chaque endpoint déclare ses champs publics dans un dictionnaire
+{nom public: chemin ORM}. Le paramètre 'fields' de la query string restreint
+les colonnes lues : la requête est une projection values() limitée à ces
+colonnes, jointures comprises.
+
+Les listes sont diffusées avec StreamingHttpResponse sur
+QuerySet.iterator(chunk_size=...) : la mémoire reste constante quelle que soit
+la taille de la table, et chaque lot de lignes est sérialisé d'un bloc.
+"""
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+
+from . import pagination
+from .bulk import batched
+from .pagination import MAX_ID
+
+
+class ApiError(ValueError):
+    """
+    Paramètre de requête invalide, renvoyé au client en 400 avec son message.
+    """
+
+
+def error_response(message, status=400):
+    """
+    Réponse JSON d'erreur : {"error": message}.
+    """
+    return JsonResponse({'error': message}, status=status)
+
+
+def parse_fields(request, public_fields):
+    """
+    Lit le paramètre 'fields' (noms séparés par des virgules).
+
+    Args:
+        request: L'objet HttpRequest de Django.
+        public_fields (dict): {nom public: chemin ORM} de l'endpoint.
+
+    Returns:
+        list[str]: Noms publics demandés, dans l'ordre ; tous par défaut.
+
+    Raises:
+        ApiError: Si un nom est inconnu.
+    """
+    value = request.GET.get('fields', '').strip()
+    if not value:
+        return list(public_fields)
+    names = list(dict.fromkeys(name.strip() for name in value.split(',') if name.strip()))
+    unknown = [name for name in names if name not in public_fields]
+    if unknown or not names:
+        raise ApiError(f"Champs inconnus: {', '.join(unknown)} (disponibles: {', '.join(public_fields)})")
+    return names
+
+
+def parse_id(value):
+    """
+    Convertit un identifiant de la query string, borné à la plage des INTEGER de SQLite.
+
+    Au-delà, SQLite refuse le paramètre (OverflowError) : lors d'une diffusion,
+    l'erreur surviendrait après l'envoi du statut 200.
+
+    Args:
+        value (str | int): Valeur lue dans la query string.
+
+    Returns:
+        int: Identifiant entre 0 et MAX_ID.
+
+    Raises:
+        ApiError: Si la valeur n'est pas un entier de cette plage.
+    """
+    try:
+        return pagination.parse_id(value)
+    except ValueError:
+        raise ApiError(f"Identifiant invalide: {value!r} (entier entre 0 et {MAX_ID})")
+
+
+def parse_list(request, name, cast=str):
+    """
+    Lit un paramètre de liste (valeurs séparées par des virgules), borné par API_BATCH_MAX_SIZE.
+
+    Raises:
+        ApiError: Si le paramètre est absent, trop long ou une valeur invalide.
+    """
+    values = [value.strip() for value in request.GET.get(name, '').split(',') if value.strip()]
+    if not values:
+        raise ApiError(f"Paramètre '{name}' requis")
+    if len(values) > settings.API_BATCH_MAX_SIZE:
+        raise ApiError(f"Au plus {settings.API_BATCH_MAX_SIZE} valeurs dans '{name}'")
+    try:
+        return list(dict.fromkeys(cast(value) for value in values))
+    except ValueError:
+        raise ApiError(f"Valeur invalide dans '{name}'")
+
+
+def project(queryset, public_fields, names):
+    """
+    Projette un QuerySet sur les champs demandés.
+
+    Returns:
+        QuerySet: Tuples de valeurs dans l'ordre de names (values_list).
+    """
+    return queryset.values_list(*(public_fields[name] for name in names))
+
+
+_encoder = DjangoJSONEncoder(ensure_ascii=False)
+
+
+def stream_list(rows, names, chunk_size=None):
+    """
+    Diffuse une liste JSON {"results": [...]} lot par lot.
+
+    Args:
+        rows (QuerySet): Résultat de project() ; sa base doit être fixée (using)
+            par la vue, le routage des lectures n'étant plus actif pendant la diffusion.
+        names (list[str]): Noms publics des colonnes.
+        chunk_size (int | None): Lignes lues et sérialisées par lot (défaut: API_CHUNK_SIZE).
+
+    Returns:
+        StreamingHttpResponse: Réponse application/json.
+    """
+    chunk_size = chunk_size or settings.API_CHUNK_SIZE
+
+    def generate():
+        yield '{"results": ['
+        separator = ''
+        for batch in batched(rows.iterator(chunk_size=chunk_size), chunk_size):
+            # Un seul appel à l'encodeur par lot, sans les crochets de la liste
+            yield separator + _encoder.encode([dict(zip(names, row)) for row in batch])[1:-1]
+            separator = ','
+        yield ']}'
+
+    return StreamingHttpResponse(generate(), content_type='application/json')
+
+
+def batch_response(rows, names, requested):
+    """
+    Réponse d'une lecture groupée, dans l'ordre des clés demandées.
+
+    Args:
+        rows (QuerySet): Résultat de project(), projeté avec la clé en dernière colonne.
+        names (list[str]): Noms publics des colonnes (hors clé ajoutée).
+        requested (list): Clés demandées.
+
+    Returns:
+        JsonResponse: {"results": [...], "missing": [...]}.
+    """
+    found = {row[-1]: dict(zip(names, row)) for row in rows}
+    return JsonResponse({
+        'results': [found[value] for value in requested if value in found],
+        'missing': [value for value in requested if value not in found],
+    }, json_dumps_params={'ensure_ascii': False})
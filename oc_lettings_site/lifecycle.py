@@ -0,0 +1,229 @@
+"""
+Cycle de vie des workers gunicorn : dimensionnement, préchauffage et mémoire.
+
+Utilisé par les hooks de gunicorn.conf.py. Le préchauffage remplit les
+caches paresseux de Django (résolveurs d'URL, templates compilés par le
+loader en cache, connexions SQLite avec leurs PRAGMAs) avant la première
+requête, qui n'a plus à payer ces coûts ; un template invalide empêche le
+démarrage au lieu d'échouer à la première requête qui l'utilise. Exécuté
+dans le maître après --preload, il place ces objets dans des pages partagées
+avec les workers (copy-on-write) ; exécuté de nouveau dans chaque worker, il
+ne refait que ce qui manque.
+"""
+import math
+import os
+import time
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+from django.template import TemplateDoesNotExist, TemplateSyntaxError, engines
+from django.template.loader_tags import ExtendsNode, IncludeNode
+from django.urls import URLResolver, get_resolver
+
+CGROUP_CPU_MAX = '/sys/fs/cgroup/cpu.max'
+
+
+def cpu_count():
+    """
+    Nombre de processeurs utilisables, limites du conteneur comprises.
+
+    Tient compte de l'affinité du processus et du quota CPU cgroup v2
+    (docker run --cpus), que os.cpu_count() ignore.
+
+    Returns:
+        int: Au moins 1.
+    """
+    try:
+        count = len(os.sched_getaffinity(0))
+    except AttributeError:
+        count = os.cpu_count() or 1
+    try:
+        with open(CGROUP_CPU_MAX) as stream:
+            quota, period = stream.read().split()
+        if quota != 'max':
+            count = min(count, math.ceil(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass
+    return max(count, 1)
+
+
+def template_directories(backend=None):
+    """
+    Dossiers parcourus par les loaders du backend, loader en cache compris.
+
+    Args:
+        backend (DjangoTemplates): Backend de templates (défaut: engines['django']).
+
+    Returns:
+        list[str]: Dossiers, dans l'ordre de recherche des loaders.
+    """
+    backend = backend or engines['django']
+    directories = []
+    for loader in backend.engine.template_loaders:
+        # Le loader en cache délègue la lecture des fichiers à ses propres loaders
+        for inner in getattr(loader, 'loaders', [loader]):
+            if hasattr(inner, 'get_dirs'):
+                directories.extend(str(directory) for directory in inner.get_dirs())
+    return directories
+
+
+def project_templates(backend=None):
+    """
+    Noms des templates du projet (DIRS et dossiers templates des applications
+    du projet), hors templates de Django et des bibliothèques.
+
+    Args:
+        backend (DjangoTemplates): Backend de templates (défaut: engines['django']).
+
+    Returns:
+        list[str]: Noms relatifs (ex: 'lettings/index.html'), triés.
+    """
+    base_dir = os.path.realpath(settings.BASE_DIR)
+    names = set()
+    for directory in template_directories(backend):
+        directory = os.path.realpath(directory)
+        if os.path.commonpath([base_dir, directory]) != base_dir:
+            continue
+        for root, _, files in os.walk(directory):
+            for filename in files:
+                if filename.endswith('.html'):
+                    names.add(os.path.relpath(os.path.join(root, filename), directory).replace(os.sep, '/'))
+    return sorted(names)
+
+
+def template_references(template):
+    """
+    Templates étendus ou inclus par un template compilé, quand leur nom est littéral.
+
+    Django ne charge ces templates qu'au rendu : {% extends "absent.html" %}
+    compile sans erreur et n'échoue qu'à la première requête.
+
+    Args:
+        template (django.template.Template): Template compilé.
+
+    Returns:
+        set[str]: Noms des templates référencés.
+    """
+    expressions = [node.parent_name for node in template.nodelist.get_nodes_by_type(ExtendsNode)]
+    expressions += [node.template for node in template.nodelist.get_nodes_by_type(IncludeNode)]
+    return {expression.var for expression in expressions if isinstance(expression.var, str) and not expression.filters}
+
+
+def compile_templates(backend=None, names=None):
+    """
+    Compile les templates du projet et vérifie ceux qu'ils étendent ou incluent.
+
+    Avec le loader en cache (TEMPLATE_CACHE), les templates compilés restent en
+    mémoire : les requêtes suivantes ne relisent ni ne recompilent aucun
+    fichier. Toutes les erreurs sont collectées avant d'être signalées.
+
+    Args:
+        backend (DjangoTemplates): Backend de templates (défaut: engines['django']).
+        names (list[str]): Templates à compiler (défaut: project_templates()).
+
+    Returns:
+        list[str]: Noms des templates compilés.
+
+    Raises:
+        ImproperlyConfigured: Si un template est invalide ou référence un template introuvable.
+    """
+    backend = backend or engines['django']
+    names = project_templates(backend) if names is None else names
+    errors = []
+    for name in names:
+        try:
+            template = backend.engine.get_template(name)
+            for reference in sorted(template_references(template)):
+                backend.engine.get_template(reference)
+        except (TemplateDoesNotExist, TemplateSyntaxError) as e:
+            errors.append(f"{name}: {e.__class__.__name__}: {e}")
+    if errors:
+        raise ImproperlyConfigured("Templates invalides :\n" + '\n'.join(errors))
+    return names
+
+
+def warm_url_resolvers(resolver=None):
+    """
+    Construit les tables de résolution et d'inversion de toutes les URLs.
+
+    Returns:
+        int: Nombre de motifs d'URL préparés.
+    """
+    resolver = resolver or get_resolver()
+    resolver.reverse_dict  # Construit les tables d'inversion (reverse())
+    count = 0
+    for pattern in resolver.url_patterns:
+        pattern.pattern.regex  # Compile l'expression du motif (resolve())
+        count += 1
+        if isinstance(pattern, URLResolver):
+            count += warm_url_resolvers(pattern)
+    return count
+
+
+def warm_templates():
+    """
+    Compile les templates du projet dans le loader en cache.
+
+    Returns:
+        int: Nombre de templates compilés.
+
+    Raises:
+        ImproperlyConfigured: Si un template est invalide (voir compile_templates()).
+    """
+    return len(compile_templates())
+
+
+def warm_database_connections():
+    """
+    Ouvre les connexions aux bases (PRAGMAs compris) du thread courant.
+
+    Avec des workers gthread, les requêtes s'exécutent dans d'autres threads,
+    qui ouvrent leur propre connexion ; l'ouverture ici charge tout de même le
+    fichier et les pages SQLite dans le cache du système.
+
+    Returns:
+        int: Nombre de connexions ouvertes.
+    """
+    for alias in connections:
+        connections[alias].ensure_connection()
+    return len(connections.all())
+
+
+def warm_up(database=True):
+    """
+    Préchauffe le processus courant.
+
+    Args:
+        database (bool): Ouvre aussi les connexions ; à éviter dans le maître,
+            dont les connexions ne doivent pas être héritées par les workers.
+
+    Returns:
+        dict: Nombre d'éléments préparés par étape et durée totale (ms).
+    """
+    start = time.perf_counter()
+    report = {'urls': warm_url_resolvers(), 'templates': warm_templates()}
+    if database:
+        report['connections'] = warm_database_connections()
+    report['ms'] = round((time.perf_counter() - start) * 1000, 1)
+    return report
+
+
+def anonymous_memory():
+    """
+    Mémoire anonyme résidente du processus courant, en octets.
+
+    Calculée à partir de /proc/self/statm (résidente moins pages de fichiers) :
+    les pages du fichier SQLite mappé (mmap_size), que le système peut libérer
+    à tout moment, n'y figurent pas. Les pages héritées du maître y figurent :
+    c'est la croissance depuis le démarrage du worker qui compte.
+
+    Returns:
+        int | None: None si /proc n'est pas disponible.
+    """
+    try:
+        with open('/proc/self/statm') as stream:
+            resident, shared = (int(value) for value in stream.read().split()[1:3])
+    except (OSError, ValueError):
+        return None
+    return (resident - shared) * os.sysconf('SC_PAGE_SIZE')
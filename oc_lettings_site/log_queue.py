@@ -0,0 +1,225 @@
+"""
+Journalisation non bloquante par file d'attente.
+
+Les handlers d'entrée/sortie (fichier, console) sont retirés des loggers de
+l'application et remplacés par un QueueHandler : le thread de la requête ne
+fait que déposer l'enregistrement dans une file bornée. Un unique thread
+d'écoute par processus (donc par worker gunicorn) vide la file et appelle les
+handlers d'origine.
+
+Le thread d'écoute est démarré à la première écriture dans le processus
+courant et recréé automatiquement après un fork, ce qui reste correct avec
+gunicorn --preload. La file est vidée proprement à la sortie du processus.
+"""
+import atexit
+import logging
+import os
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener
+
+OVERFLOW_DROP = 'drop'
+OVERFLOW_BLOCK = 'block'
+
+
+class LogQueuePipeline:
+    """
+    File bornée et thread d'écoute partagés par tous les loggers d'un processus.
+
+    Args:
+        maxsize (int): Nombre maximal d'enregistrements en attente.
+        overflow (str): Politique lorsque la file est pleine : 'drop' abandonne
+            l'enregistrement, 'block' attend au plus block_timeout secondes.
+        block_timeout (float): Attente maximale en mode 'block'.
+
+    Attributes:
+        routes (dict): Handlers cibles par nom de logger.
+        dropped (int): Nombre d'enregistrements perdus depuis le démarrage.
+    """
+
+    def __init__(self, maxsize=10000, overflow=OVERFLOW_DROP, block_timeout=1.0):
+        if overflow not in (OVERFLOW_DROP, OVERFLOW_BLOCK):
+            raise ValueError(f"Politique de débordement inconnue: {overflow!r}")
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+        self.routes = {}
+        self.dropped = 0
+        self._reset()
+
+    def _reset(self):
+        """
+        Crée une file vide sans thread d'écoute (démarrage ou après un fork).
+        """
+        self.queue = queue.Queue(self.maxsize)
+        self._listener = None
+        self._closed = False
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+
+    def put(self, record):
+        """
+        Dépose un enregistrement dans la file selon la politique de débordement.
+
+        Après l'arrêt du thread d'écoute (sortie du processus), les
+        enregistrements sont écrits directement pour ne pas être perdus.
+
+        Args:
+            record (LogRecord): Enregistrement préparé par le QueueHandler.
+        """
+        if self._listener is None:
+            if self._closed:
+                self.dispatch(record)
+                return
+            self.start()
+        try:
+            if self.overflow == OVERFLOW_BLOCK:
+                self.queue.put(record, timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def start(self):
+        """
+        Démarre le thread d'écoute du processus courant s'il ne tourne pas déjà.
+        """
+        if self._pid != os.getpid():
+            # Processus enfant issu d'un fork : la file et le thread du parent
+            # ne sont pas utilisables ici.
+            self._reset()
+        with self._lock:
+            if self._listener is None:
+                self._listener = RoutingQueueListener(self)
+                self._listener.start()
+
+    def stop(self):
+        """
+        Vide la file puis arrête le thread d'écoute du processus courant.
+        """
+        with self._lock:
+            listener, self._listener = self._listener, None
+            self._closed = True
+        if listener is not None and self._pid == os.getpid():
+            listener.stop()
+
+    def dispatch(self, record):
+        """
+        Écrit l'enregistrement avec les handlers de la route du logger émetteur.
+
+        Args:
+            record (LogRecord): Enregistrement marqué par RoutedQueueHandler.
+        """
+        for handler in self.routes.get(getattr(record, 'log_route', None), ()):
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+
+class RoutingQueueListener(QueueListener):
+    """
+    Thread d'écoute transmettant chaque enregistrement aux handlers de son logger.
+    """
+
+    def __init__(self, pipeline):
+        super().__init__(pipeline.queue)
+        self.pipeline = pipeline
+        self._reported_drops = 0
+
+    def enqueue_sentinel(self):
+        # La file peut être pleine : on attend que le thread libère une place
+        # plutôt que de perdre le signal d'arrêt.
+        self.queue.put(self._sentinel)
+
+    def handle(self, record):
+        """
+        Transmet l'enregistrement extrait de la file, précédé d'un avertissement
+        si des enregistrements ont été perdus depuis le dernier passage.
+
+        Args:
+            record (LogRecord): Enregistrement extrait de la file.
+        """
+        dropped = self.pipeline.dropped
+        if dropped > self._reported_drops:
+            self.pipeline.dispatch(logging.makeLogRecord({
+                'name': record.name,
+                'levelno': logging.WARNING,
+                'levelname': 'WARNING',
+                'msg': f"{dropped - self._reported_drops} messages de log perdus (file pleine)",
+                'log_route': record.log_route,
+            }))
+            self._reported_drops = dropped
+        self.pipeline.dispatch(record)
+
+
+class RoutedQueueHandler(QueueHandler):
+    """
+    QueueHandler qui marque chaque enregistrement avec le nom de son logger.
+
+    Args:
+        pipeline (LogQueuePipeline): File partagée du processus.
+        route (str): Nom du logger auquel le handler est attaché.
+    """
+
+    def __init__(self, pipeline, route):
+        super().__init__(pipeline.queue)
+        self.pipeline = pipeline
+        self.route = route
+
+    def prepare(self, record):
+        record = super().prepare(record)
+        record.log_route = self.route
+        return record
+
+    def enqueue(self, record):
+        self.pipeline.put(record)
+
+
+_pipeline = None
+
+
+def install_queue_logging(logger_names, handler_names, maxsize=10000,
+                          overflow=OVERFLOW_DROP, block_timeout=1.0):
+    """
+    Remplace les handlers d'entrée/sortie des loggers par une file d'attente.
+
+    Les handlers dont le nom figure dans handler_names (noms de settings.LOGGING)
+    sont déplacés derrière la file ; les autres (ex: Sentry, qui a besoin du
+    contexte de la requête) restent synchrones. L'appel est idempotent.
+
+    Args:
+        logger_names (iterable[str]): Loggers à traiter ('root' pour la racine).
+        handler_names (iterable[str]): Noms des handlers à rendre asynchrones.
+        maxsize (int): Taille maximale de la file.
+        overflow (str): 'drop' ou 'block' lorsque la file est pleine.
+        block_timeout (float): Attente maximale en mode 'block', en secondes.
+
+    Returns:
+        LogQueuePipeline: La file partagée du processus.
+    """
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = LogQueuePipeline(maxsize, overflow, block_timeout)
+        atexit.register(_pipeline.stop)
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=_pipeline._reset)
+
+    for name in logger_names:
+        logger = logging.getLogger(None if name == 'root' else name)
+        if any(isinstance(handler, RoutedQueueHandler) for handler in logger.handlers):
+            continue
+        queued = [handler for handler in logger.handlers if handler.name in handler_names]
+        if not queued:
+            continue
+        for handler in queued:
+            logger.removeHandler(handler)
+        _pipeline.routes[name] = queued
+        logger.addHandler(RoutedQueueHandler(_pipeline, name))
+    return _pipeline
+
+
+def stop_queue_logging():
+    """
+    Vide la file et arrête le thread d'écoute (ex: hook worker_exit de gunicorn).
+    """
+    if _pipeline is not None:
+        _pipeline.stop()
@@ -0,0 +1,66 @@
+"""
+Commande Django de construction des fichiers statiques dérivés des templates.
+
+Convertit les polices Metropolis utilisées par les templates (graisses et
+styles demandés par les règles CSS qui s'appliquent à leur HTML) en WOFF2
+réduits aux caractères latins, et réécrit les règles @font-face de
+static/css/styles.css en conséquence (font-display: swap, unicode-range).
+Écrit ensuite, à partir de styles.css, la feuille purgée chargée par
+base.html (static/css/styles.purged.css) et la CSS critique incluse dans
+base.html (templates/critical.css), après le sprite des icônes référencées
+par les templates (templates/icons.svg). Voir oc_lettings_site.assets.
+
+Les fichiers produits sont versionnés : la commande se relance après une
+modification des templates ou des polices, pas au déploiement. collectstatic
+les nomme ensuite d'après leur contenu et les précompresse.
+
+Examples:
+    python manage.py build_assets
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from oc_lettings_site.assets import (
+    CRITICAL_TEMPLATE, ICON_SPRITE, PURGED_STYLESHEET, STYLESHEET, build_fonts, critical_template, font_file_name,
+    icon_sprite, parse_stylesheet, purge_stylesheet, replace_font_faces, template_usage, used_font_faces, used_icons,
+)
+
+
+class Command(BaseCommand):
+    help = ("Construit le sprite des icônes, les polices WOFF2, la feuille de style purgée et la CSS critique "
+            "à partir des templates")
+
+    def handle(self, *args, **options):
+        # Le sprite est un template inclus par base.html : écrit avant le relevé des noms utilisés
+        icons = used_icons()
+        try:
+            sprite = icon_sprite(icons)
+        except FileNotFoundError as e:
+            raise CommandError(str(e))
+        ICON_SPRITE.write_text(sprite, encoding='utf-8')
+
+        css = STYLESHEET.read_text(encoding='utf-8')
+        usage = template_usage()
+        faces = used_font_faces(parse_stylesheet(css), usage)
+        try:
+            report = build_fonts(faces)
+            css = replace_font_faces(css, faces)
+            purged, critical = purge_stylesheet(css, usage), critical_template(css, usage)
+        except (FileNotFoundError, ValueError) as e:
+            raise CommandError(str(e))
+        STYLESHEET.write_text(css, encoding='utf-8')
+        PURGED_STYLESHEET.write_text(purged, encoding='utf-8')
+        CRITICAL_TEMPLATE.write_text(critical, encoding='utf-8')
+
+        self.stdout.write(f"{ICON_SPRITE.name} : {', '.join(icons) or 'aucune icône'} "
+                          f"({len(sprite.encode()) / 1024:.1f} Kio)")
+        self.stdout.write(f"Faces utilisées : {', '.join(font_file_name(face) for face in faces)}")
+        for name, source_size, size in report:
+            self.stdout.write(f"  {name:<32} {source_size / 1024:>6.1f} Kio OTF -> {size / 1024:>5.1f} Kio")
+        total_source = sum(source_size for _, source_size, _ in report)
+        total = sum(size for _, _, size in report)
+        self.stdout.write(f"{len(report)} polices : {total_source / 1024:.1f} Kio -> {total / 1024:.1f} Kio")
+        self.stdout.write(f"{PURGED_STYLESHEET.name} : {len(css.encode()) / 1024:.1f} Kio -> "
+                          f"{len(purged.encode()) / 1024:.1f} Kio")
+        self.stdout.write(self.style.SUCCESS(
+            f"{CRITICAL_TEMPLATE.name} : {len(critical.encode()) / 1024:.1f} Kio inclus dans base.html"
+        ))
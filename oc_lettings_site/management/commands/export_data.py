@@ -0,0 +1,220 @@
+"""
+Commande Django d'export en masse des lettings ou des profils (CSV ou NDJSON).
+
+Les lignes sont lues avec une projection values_list() jointe (adresse du
+letting, utilisateur du profil) et QuerySet.iterator(chunk_size=...), puis
+écrites lot par lot : la mémoire reste constante quelle que soit la taille
+de la table, contrairement à dumpdata qui charge tous les objets.
+
+Les colonnes sont celles de l'API JSON (lettings.api.LETTING_FIELDS,
+profiles.api.PROFILE_FIELDS). Un fichier de sortie n'apparaît sous son nom
+qu'une fois l'export terminé.
+
+Examples:
+    python manage.py export_data lettings --output lettings.csv.gz
+    python manage.py export_data profiles --format ndjson --since 2026-01-01 > profiles.ndjson
+"""
+import csv
+import gzip
+import io
+import logging
+import os
+import sys
+import time
+from datetime import datetime, time as day_start
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from lettings.api import LETTING_FIELDS
+from lettings.models import Letting
+from oc_lettings_site.bulk import batched
+from profiles.api import PROFILE_FIELDS
+from profiles.models import Profile
+
+logger = logging.getLogger(__name__)
+
+# {jeu de données: (modèle, {colonne: chemin ORM})}
+DATASETS = {
+    'lettings': (Letting, LETTING_FIELDS),
+    'profiles': (Profile, PROFILE_FIELDS),
+}
+FORMATS = ('csv', 'ndjson')
+
+# Intervalle minimal entre deux lignes de progression, en secondes
+PROGRESS_INTERVAL = 1.0
+
+
+def parse_since(value):
+    """
+    Lit la date de --since (date ou date et heure ISO 8601, heure locale par défaut).
+
+    Returns:
+        datetime: Date et heure avec fuseau.
+
+    Raises:
+        CommandError: Si la valeur n'est pas une date ISO 8601.
+    """
+    try:
+        moment = parse_datetime(value)
+        if moment is None:
+            day = parse_date(value)
+            moment = datetime.combine(day, day_start()) if day else None
+    except ValueError:
+        moment = None
+    if moment is None:
+        raise CommandError(f"--since invalide: {value!r} (attendu: AAAA-MM-JJ ou AAAA-MM-JJTHH:MM:SS)")
+    return timezone.make_aware(moment) if timezone.is_naive(moment) else moment
+
+
+def csv_writer(stream, names):
+    """
+    Retourne une fonction d'écriture d'un lot de lignes en CSV (en-tête écrit d'abord).
+    """
+    writer = csv.writer(stream)
+    writer.writerow(names)
+
+    def write(rows):
+        writer.writerows(
+            [value.isoformat() if isinstance(value, datetime) else value for value in row] for row in rows
+        )
+    return write
+
+
+def ndjson_writer(stream, names):
+    """
+    Retourne une fonction d'écriture d'un lot de lignes en JSON Lines.
+    """
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+
+    def write(rows):
+        stream.write(''.join(encoder.encode(dict(zip(names, row))) + '\n' for row in rows))
+    return write
+
+
+class Command(BaseCommand):
+    """
+    Commande Django d'export des lettings ou des profils vers un fichier ou stdout.
+
+    Attributes:
+        help (str): Description de la commande affichée dans --help
+    """
+
+    help = 'Exporte les lettings (avec leur adresse) ou les profils (avec leur utilisateur) en CSV ou NDJSON'
+
+    def add_arguments(self, parser):
+        """
+        Ajouter les arguments de ligne de commande disponibles.
+
+        Args:
+            parser (ArgumentParser): Parser d'arguments Django
+        """
+        parser.add_argument('dataset', choices=sorted(DATASETS), help='Données à exporter')
+        parser.add_argument(
+            '--output', default='-',
+            help="Fichier de sortie (défaut: '-', la sortie standard ; compressé si suffixe .gz)"
+        )
+        parser.add_argument(
+            '--format', choices=FORMATS,
+            help="Format de sortie (défaut: déduit de l'extension, sinon csv)"
+        )
+        parser.add_argument('--gzip', action='store_true', help='Compresse la sortie avec gzip')
+        parser.add_argument(
+            '--since',
+            help='Exporte seulement les lignes modifiées depuis cette date (updated_at, ISO 8601)'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=2000,
+            help='Nombre de lignes lues et écrites par lot (défaut: 2000)'
+        )
+
+    def handle(self, *args, **options):
+        """
+        Point d'entrée principal de la commande Django.
+
+        Raises:
+            CommandError: Option invalide ou fichier impossible à écrire.
+
+        Side Effects:
+            - Écrit le fichier de sortie (via un fichier temporaire renommé à la fin)
+            - Affiche la progression et le débit sur stdout, ou sur stderr si
+              les données sont écrites sur la sortie standard
+        """
+        self.verbosity = options['verbosity']
+        # Les données peuvent occuper stdout : les messages vont alors sur stderr
+        self.report = self.stderr if options['output'] == '-' else self.stdout
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size doit être supérieur ou égal à 1')
+        model, fields = DATASETS[options['dataset']]
+        output = options['output']
+        compress = options['gzip'] or output.endswith('.gz')
+        file_format = options['format'] or self._guess_format(output)
+
+        queryset = model.objects.order_by('id')
+        if options['since']:
+            queryset = queryset.filter(updated_at__gte=parse_since(options['since']))
+        names = list(fields)
+        rows = queryset.values_list(*fields.values()).iterator(chunk_size=options['chunk_size'])
+
+        start = time.perf_counter()
+        if output == '-':
+            count = self._export_stdout(rows, names, file_format, compress, options['chunk_size'])
+        else:
+            count = self._export_file(output, rows, names, file_format, compress, options['chunk_size'])
+        elapsed = time.perf_counter() - start
+
+        rate = count / elapsed if elapsed else 0
+        self.report.write(
+            f"✅ {count} {options['dataset']} exportés en {elapsed:.1f}s ({rate:.0f} lignes/s)",
+            style_func=self.style.SUCCESS,
+        )
+        logger.info("Export %s terminé: %s lignes, %.0f lignes/s", options['dataset'], count, rate)
+
+    @staticmethod
+    def _guess_format(output):
+        name = output[:-3] if output.endswith('.gz') else output
+        extension = os.path.splitext(name)[1].lower().lstrip('.')
+        return 'ndjson' if extension in ('ndjson', 'jsonl') else 'csv'
+
+    def _export_stdout(self, rows, names, file_format, compress, chunk_size):
+        if not compress:
+            return self._write(sys.stdout, rows, names, file_format, chunk_size)
+        with gzip.GzipFile(fileobj=sys.stdout.buffer, mode='wb') as binary:
+            with io.TextIOWrapper(binary, encoding='utf-8', newline='') as stream:
+                return self._write(stream, rows, names, file_format, chunk_size)
+
+    def _export_file(self, output, rows, names, file_format, compress, chunk_size):
+        temporary = f'{output}.tmp'
+        try:
+            opener = gzip.open if compress else open
+            with opener(temporary, 'wt', encoding='utf-8', newline='') as stream:
+                count = self._write(stream, rows, names, file_format, chunk_size)
+            os.replace(temporary, output)
+        except OSError as e:
+            raise CommandError(f"Impossible d'écrire {output}: {e}")
+        finally:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+        return count
+
+    def _write(self, stream, rows, names, file_format, chunk_size):
+        """
+        Écrit les lignes par lots et affiche la progression.
+
+        Returns:
+            int: Nombre de lignes écrites.
+        """
+        write = (csv_writer if file_format == 'csv' else ndjson_writer)(stream, names)
+        count = 0
+        start = last_report = time.perf_counter()
+        for batch in batched(rows, chunk_size):
+            write(batch)
+            count += len(batch)
+            now = time.perf_counter()
+            if self.verbosity >= 1 and now - last_report >= PROGRESS_INTERVAL:
+                self.report.write(f"   {count} lignes exportées ({count / (now - start):.0f} lignes/s)",
+                                  style_func=self.style.HTTP_INFO)
+                last_report = now
+        return count
@@ -0,0 +1,459 @@
+"""
+Commande Django de rejeu d'un journal de requêtes sur l'application WSGI.
+
+Les requêtes sont exécutées sans réseau sur l'application de
+oc_lettings_site/wsgi.py (middlewares compris), par un pool de threads
+(comparable aux workers gthread de gunicorn) ou de processus (workers sync),
+à un débit cible. Le rapport donne le débit atteint, l'histogramme des
+latences, les taux d'erreur par endpoint et le nombre moyen de workers
+occupés (loi de Little), pour dimensionner gunicorn hors production.
+
+Sources acceptées, détectées ligne par ligne :
+    - liste d'URL, un chemin ou une URL complète par ligne (« GET » facultatif) ;
+    - journal d'accès au format combiné (gunicorn, nginx) : "GET /chemin HTTP/1.1" ;
+    - journal de l'application (logs/oc_lettings.log) : les lignes d'accès des
+      vues sont converties en URL. Les curseurs de pagination et les clés des
+      lectures groupées n'y figurent pas : ces requêtes sont rejouées sans
+      curseur ou ignorées. Avec ACCESS_LOG_SAMPLE_RATE > 1, le journal ne
+      contient qu'une partie du trafic.
+
+Avec --rps, les requêtes partent à intervalles fixes quelle que soit la
+réponse des précédentes (charge ouverte) : la latence est mesurée depuis
+l'instant prévu et inclut donc l'attente d'un worker libre. Sans --rps,
+chaque worker enchaîne les requêtes au plus vite.
+
+Examples:
+    python manage.py replay_load logs/oc_lettings.log --rps 200 --concurrency 4
+    python manage.py replay_load urls.txt --mode process --concurrency 4 --requests 20000
+    python manage.py replay_load access.log --rps 500 --output replay.json
+"""
+import json
+import logging
+import math
+import multiprocessing
+import re
+import sys
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from io import BytesIO
+from itertools import cycle, islice
+from urllib.parse import unquote_to_bytes, urlencode, urlsplit
+from wsgiref.util import setup_testing_defaults
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.urls import Resolver404, resolve, reverse
+
+logger = logging.getLogger(__name__)
+
+# Mode du pool et libellé de ses workers
+MODES = {'thread': 'threads', 'process': 'processus'}
+
+# Ligne de requête d'un journal d'accès : "GET /chemin HTTP/1.1"
+REQUEST_LINE = re.compile(r'"(?P<method>[A-Z]+) (?P<path>\S+) HTTP/[\d.]+"')
+# Ligne d'une liste d'URL : chemin ou URL complète, méthode facultative
+URL_LINE = re.compile(r'^(?:(?P<method>[A-Z]+)\s+)?(?P<path>/\S*|https?://\S+)$')
+
+# Lignes d'accès des vues (une par requête) et URL correspondante
+APP_LOG_LINES = (
+    (re.compile(r"Page d'accueil visitée par "), lambda m: reverse('home')),
+    (re.compile(r"Accès à la liste des lettings par "), lambda m: reverse('lettings:index')),
+    (re.compile(r"Accès au letting ID (\d+) par "), lambda m: reverse('lettings:letting', args=[m[1]])),
+    (re.compile(r"Recherche de lettings '(.*)' par "),
+     lambda m: f"{reverse('lettings:search')}?{urlencode({'q': m[1]})}"),
+    (re.compile(r"Recherche de lettings à (\d+) km de \((-?[\d.]+), (-?[\d.]+)\) par "),
+     lambda m: f"{reverse('lettings:nearby')}?{urlencode({'lat': m[2], 'lon': m[3], 'radius': m[1]})}"),
+    (re.compile(r"Export JSON des lettings après (\d+) par "),
+     lambda m: f"{reverse('lettings-api:list')}?after={m[1]}"),
+    (re.compile(r"Letting (\d+) lu \(API\) par "), lambda m: reverse('lettings-api:detail', args=[m[1]])),
+    (re.compile(r"Accès à la liste des profils par "), lambda m: reverse('profiles:index')),
+    (re.compile(r"Accès au profil '(.+)' par "), lambda m: reverse('profiles:profile', args=[m[1]])),
+    (re.compile(r"Export JSON des profils après (\d+) par "),
+     lambda m: f"{reverse('profiles-api:list')}?after={m[1]}"),
+    (re.compile(r"Profil '(.+)' lu \(API\) par "), lambda m: reverse('profiles-api:detail', args=[m[1]])),
+)
+
+# Bornes supérieures des classes de l'histogramme des latences, en millisecondes
+HISTOGRAM_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+HISTOGRAM_WIDTH = 40
+
+
+def parse_line(line):
+    """
+    Extrait le chemin d'une ligne de liste d'URL ou de journal.
+
+    Args:
+        line (str): Ligne de la source.
+
+    Returns:
+        str | None: Chemin, query string comprise, ou None si la ligne ne
+            décrit pas une requête GET rejouable.
+    """
+    line = line.strip()
+    match = URL_LINE.match(line) or REQUEST_LINE.search(line)
+    if match:
+        if (match['method'] or 'GET') != 'GET':
+            return None
+        parts = urlsplit(match['path'])
+        return f"{parts.path or '/'}?{parts.query}" if parts.query else parts.path or '/'
+    for pattern, build in APP_LOG_LINES:
+        match = pattern.search(line)
+        if match:
+            return build(match)
+    return None
+
+
+def read_requests(stream):
+    """
+    Lit les chemins à rejouer.
+
+    Returns:
+        tuple: (liste des chemins, nombre de lignes ignorées).
+    """
+    paths, ignored = [], 0
+    for line in stream:
+        path = parse_line(line)
+        if path is None:
+            ignored += 1 if line.strip() else 0
+        else:
+            paths.append(path)
+    return paths, ignored
+
+
+def endpoint_name(path):
+    """
+    Nom de l'URL visée par un chemin (ex: 'lettings:letting'), '(404)' si aucune.
+    """
+    try:
+        return resolve(urlsplit(path).path).view_name
+    except Resolver404:
+        return '(404)'
+
+
+_application = None
+
+
+def load_application():
+    """
+    Retourne l'application WSGI de oc_lettings_site/wsgi.py, importée une fois par processus.
+    """
+    global _application
+    if _application is None:
+        from oc_lettings_site.wsgi import application
+        _application = application
+    return _application
+
+
+def replay_one(path, scheduled=None, host='localhost'):
+    """
+    Exécute une requête GET sur l'application WSGI et mesure sa durée.
+
+    Fonction de niveau module pour être exécutée dans un processus du pool.
+
+    Args:
+        path (str): Chemin demandé, query string comprise.
+        scheduled (float | None): Instant prévu (time.monotonic()) en charge ouverte.
+        host (str): En-tête Host envoyé (doit figurer dans ALLOWED_HOSTS).
+
+    Returns:
+        tuple: (statut HTTP, 0 si exception ; durée de traitement en secondes ;
+            latence depuis l'instant prévu en secondes ; taille du corps en octets).
+    """
+    application = load_application()
+    path_info, _, query = path.partition('?')
+    environ = {
+        # Comme un serveur WSGI : chemin décodé des %XX, en octets UTF-8 vus en latin-1
+        'PATH_INFO': unquote_to_bytes(path_info).decode('iso-8859-1'), 'QUERY_STRING': query,
+        'REQUEST_METHOD': 'GET', 'HTTP_HOST': host, 'REMOTE_ADDR': '127.0.0.1',
+        'wsgi.input': BytesIO(), 'wsgi.errors': sys.stderr,
+    }
+    setup_testing_defaults(environ)
+    status = [0]
+
+    def start_response(value, headers, exc_info=None):
+        status[0] = int(value.split(' ', 1)[0])
+
+    start = time.monotonic()
+    size = 0
+    try:
+        body = application(environ, start_response)
+        try:
+            for chunk in body:
+                size += len(chunk)
+        finally:
+            if hasattr(body, 'close'):
+                body.close()
+    except Exception:
+        logger.exception("Erreur lors du rejeu de %s", path)
+        status[0] = 0
+    end = time.monotonic()
+    return status[0], end - start, end - (scheduled or start), size
+
+
+def percentile(values, fraction):
+    """
+    Percentile par rang le plus proche d'une liste triée.
+    """
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, math.ceil(fraction * len(values)) - 1))]
+
+
+def latency_summary(latencies):
+    """
+    Résumé d'une liste de latences en secondes.
+
+    Returns:
+        dict: count, mean, p50, p90, p95, p99 et max en millisecondes.
+    """
+    values = sorted(latencies)
+    summary = {'count': len(values), 'mean': sum(values) / len(values) * 1000 if values else 0.0}
+    for name, fraction in (('p50', .5), ('p90', .9), ('p95', .95), ('p99', .99), ('max', 1)):
+        summary[name] = percentile(values, fraction) * 1000
+    return {name: round(value, 3) for name, value in summary.items()}
+
+
+def histogram(latencies):
+    """
+    Répartit les latences (secondes) dans les classes HISTOGRAM_BOUNDS_MS.
+
+    Returns:
+        list: Couples (libellé de la classe, nombre de requêtes).
+    """
+    counts = Counter()
+    for latency in latencies:
+        milliseconds = latency * 1000
+        counts[next((bound for bound in HISTOGRAM_BOUNDS_MS if milliseconds <= bound), None)] += 1
+    rows = [(f"<= {bound} ms", counts[bound]) for bound in HISTOGRAM_BOUNDS_MS]
+    rows.append((f"> {HISTOGRAM_BOUNDS_MS[-1]} ms", counts[None]))
+    # Classes vides en début et en fin de distribution omises
+    used = [index for index, (_, count) in enumerate(rows) if count]
+    return rows[used[0]:used[-1] + 1] if used else []
+
+
+def status_class(status):
+    return f"{status // 100}xx" if status else 'exception'
+
+
+def summarize_results(results, endpoints, elapsed, options):
+    """
+    Construit le rapport d'un rejeu.
+
+    Args:
+        results (list): Tuples retournés par replay_one(), dans l'ordre d'envoi.
+        endpoints (list[str]): Endpoint de chaque requête.
+        elapsed (float): Durée totale du rejeu en secondes.
+        options (dict): Options de la commande (rps, concurrency, mode).
+
+    Returns:
+        dict: Rapport sérialisable en JSON.
+    """
+    total = len(results)
+    statuses = Counter(status_class(status) for status, *_ in results)
+    errors = statuses['5xx'] + statuses['exception']
+    throughput = total / elapsed if elapsed else 0.0
+    service = [service for _, service, _, _ in results]
+    per_endpoint = defaultdict(list)
+    for endpoint, result in zip(endpoints, results):
+        per_endpoint[endpoint].append(result)
+    return {
+        'mode': options['mode'],
+        'concurrency': options['concurrency'],
+        'target_rps': options['rps'],
+        'requests': total,
+        'elapsed_s': round(elapsed, 3),
+        'throughput_rps': round(throughput, 1),
+        'statuses': dict(sorted(statuses.items())),
+        'error_rate': round(errors / total, 4) if total else 0.0,
+        'client_error_rate': round(statuses['4xx'] / total, 4) if total else 0.0,
+        'bytes': sum(size for *_, size in results),
+        'latency_ms': latency_summary([latency for _, _, latency, _ in results]),
+        'service_ms': latency_summary(service),
+        # Loi de Little : nombre moyen de requêtes en cours de traitement
+        'busy_workers': round(throughput * sum(service) / total, 2) if total else 0.0,
+        'histogram': histogram([latency for _, _, latency, _ in results]),
+        'endpoints': {
+            endpoint: {
+                **latency_summary([latency for _, _, latency, _ in items]),
+                'error_rate': round(sum(1 for status, *_ in items if status == 0 or status >= 500) / len(items), 4),
+                'client_error_rate': round(sum(1 for status, *_ in items if 400 <= status < 500) / len(items), 4),
+            }
+            for endpoint, items in sorted(per_endpoint.items())
+        },
+    }
+
+
+class Command(BaseCommand):
+    """
+    Commande Django de rejeu de charge d'une liste d'URL ou d'un journal d'accès.
+
+    Attributes:
+        help (str): Description de la commande affichée dans --help
+    """
+
+    help = "Rejoue une liste d'URL ou un journal d'accès sur l'application WSGI et mesure débit et latences"
+
+    def add_arguments(self, parser):
+        """
+        Ajouter les arguments de ligne de commande disponibles.
+
+        Args:
+            parser (ArgumentParser): Parser d'arguments Django
+        """
+        parser.add_argument('source', help="Liste d'URL ou journal à rejouer ('-' pour l'entrée standard)")
+        parser.add_argument(
+            '--rps', type=float, default=0,
+            help='Débit cible en requêtes par seconde (défaut: 0, au plus vite)'
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=4,
+            help='Nombre de threads ou de processus du pool (défaut: 4)'
+        )
+        parser.add_argument(
+            '--mode', choices=MODES, default='thread',
+            help='Pool de threads (un processus, comme gunicorn gthread) ou de processus (workers sync)'
+        )
+        parser.add_argument(
+            '--requests', type=int,
+            help='Nombre de requêtes à envoyer, en rebouclant sur la source (défaut: une fois la source)'
+        )
+        parser.add_argument(
+            '--warmup', type=int, default=0,
+            help='Requêtes initiales exclues des mesures (défaut: 0)'
+        )
+        parser.add_argument(
+            '--host', default=None,
+            help='En-tête Host des requêtes (défaut: premier hôte de ALLOWED_HOSTS)'
+        )
+        parser.add_argument('--output', help='Écrit aussi le rapport en JSON dans ce fichier')
+
+    def handle(self, *args, **options):
+        """
+        Point d'entrée principal de la commande Django.
+
+        Raises:
+            CommandError: Option invalide, source illisible ou sans requête rejouable.
+
+        Side Effects:
+            - Exécute les requêtes sur l'application (et donc sur la base configurée)
+            - Affiche le rapport sur stdout, l'écrit en JSON avec --output
+        """
+        if options['concurrency'] < 1:
+            raise CommandError('--concurrency doit être supérieur ou égal à 1')
+        if options['rps'] < 0 or options['warmup'] < 0:
+            raise CommandError('--rps et --warmup doivent être positifs')
+
+        source = options['source']
+        try:
+            if source == '-':
+                paths, ignored = read_requests(sys.stdin)
+            else:
+                with open(source, encoding='utf-8', errors='replace') as stream:
+                    paths, ignored = read_requests(stream)
+        except OSError as e:
+            raise CommandError(f"Impossible de lire {source}: {e}")
+        if not paths:
+            raise CommandError(f"Aucune requête GET rejouable dans {source} ({ignored} lignes ignorées)")
+
+        total = options['requests'] or len(paths)
+        sequence = list(islice(cycle(paths), total + options['warmup']))
+        host = options['host'] or next((name for name in settings.ALLOWED_HOSTS if name not in ('', '*')),
+                                       'localhost').lstrip('.')
+        rate = f"{options['rps']:g} req/s" if options['rps'] else 'débit maximal'
+        self.stdout.write(
+            f"Rejeu de {total} requêtes ({len(paths)} lues, {ignored} lignes ignorées), "
+            f"{options['concurrency']} {MODES[options['mode']]}, {rate}"
+        )
+
+        results, elapsed = self._replay(sequence, host, options)
+        results = results[options['warmup']:]
+        report = summarize_results(results, [endpoint_name(path) for path in sequence[options['warmup']:]],
+                                   elapsed, options)
+        self._print_report(report)
+        logger.info("Rejeu de charge: %s requêtes, %.1f req/s, p95 %.1f ms, %.2f%% d'erreurs",
+                    report['requests'], report['throughput_rps'], report['latency_ms']['p95'],
+                    report['error_rate'] * 100)
+        if options['output']:
+            try:
+                with open(options['output'], 'w', encoding='utf-8') as stream:
+                    json.dump(report, stream, indent=2, ensure_ascii=False)
+            except OSError as e:
+                raise CommandError(f"Impossible d'écrire {options['output']}: {e}")
+
+    def _replay(self, sequence, host, options):
+        """
+        Envoie les requêtes au pool au débit demandé.
+
+        Les requêtes de préchauffage (--warmup) sont envoyées d'abord au plus
+        vite ; le débit et la durée sont mesurés sur les suivantes.
+
+        Returns:
+            tuple: (résultats de replay_one() dans l'ordre d'envoi, durée mesurée en secondes).
+        """
+        concurrency = options['concurrency']
+        # Application chargée avant le fork, comme gunicorn --preload
+        load_application()
+        if options['mode'] == 'process':
+            # Les processus du pool ne doivent pas hériter des connexions du parent
+            connections.close_all()
+            executor = ProcessPoolExecutor(concurrency, mp_context=multiprocessing.get_context('fork'))
+        else:
+            executor = ThreadPoolExecutor(concurrency)
+
+        with executor:
+            futures = []
+            warmup = [executor.submit(replay_one, path, None, host) for path in sequence[:options['warmup']]]
+            wait(warmup)
+            futures.extend(warmup)
+
+            interval = 1 / options['rps'] if options['rps'] else 0
+            pending = set()
+            start = time.monotonic()
+            for index, path in enumerate(sequence[options['warmup']:]):
+                if interval:
+                    scheduled = start + index * interval
+                    delay = scheduled - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+                else:
+                    # Au plus vite : une requête en attente par worker, pas davantage
+                    scheduled = None
+                    while len(pending) >= concurrency * 2:
+                        _, pending = wait(pending, return_when=FIRST_COMPLETED)
+                future = executor.submit(replay_one, path, scheduled, host)
+                pending.add(future)
+                futures.append(future)
+            wait(futures)
+            elapsed = time.monotonic() - start
+        return [future.result() for future in futures], elapsed
+
+    def _print_report(self, report):
+        """
+        Affiche le rapport : débit, statuts, latences, histogramme et détail par endpoint.
+        """
+        write = self.stdout.write
+        target = f" (cible {report['target_rps']:g} req/s)" if report['target_rps'] else ''
+        write(f"Débit: {report['throughput_rps']} req/s{target} sur {report['elapsed_s']} s, "
+              f"{report['bytes'] / 1024 / 1024:.1f} Mio reçus")
+        write(f"Statuts: {', '.join(f'{name}: {count}' for name, count in report['statuses'].items())}")
+        style = self.style.ERROR if report['error_rate'] else self.style.SUCCESS
+        write(style(f"Erreurs (5xx et exceptions): {report['error_rate']:.2%}, "
+                    f"erreurs client (4xx): {report['client_error_rate']:.2%}"))
+        for label, key in (('Latence', 'latency_ms'), ('Traitement', 'service_ms')):
+            summary = report[key]
+            write(f"{label} (ms): moyenne {summary['mean']:.1f}, p50 {summary['p50']:.1f}, p90 {summary['p90']:.1f}, "
+                  f"p95 {summary['p95']:.1f}, p99 {summary['p99']:.1f}, max {summary['max']:.1f}")
+        write(f"Workers occupés en moyenne: {report['busy_workers']} sur {report['concurrency']}")
+
+        write("\nHistogramme des latences:")
+        largest = max((count for _, count in report['histogram']), default=0)
+        for label, count in report['histogram']:
+            bar = '#' * math.ceil(count / largest * HISTOGRAM_WIDTH) if count else ''
+            write(f"  {label:>12} {count:>8} {bar}")
+
+        write(f"\n{'Endpoint':<24} {'Requêtes':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'5xx':>7} {'4xx':>7}")
+        for endpoint, summary in report['endpoints'].items():
+            write(f"{endpoint:<24} {summary['count']:>9} {summary['p50']:>8.1f} {summary['p95']:>8.1f} "
+                  f"{summary['p99']:>8.1f} {summary['error_rate']:>7.1%} {summary['client_error_rate']:>7.1%}")
@@ -5,14 +5,111 @@ Commande Django pour initialiser les données de production automatiquement.
 Crée un superuser et des données de démonstration si elles n'existent pas.
 """
 import logging
-from django.core.management.base import BaseCommand
+import random
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.admin.models import LogEntry
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import User
+from django.db import transaction
 from lettings.models import Letting, Address
+from lettings.geo import geocode, rebuild_spatial_index
+from lettings.search import rebuild_index
+from oc_lettings_site.bulk import bulk_insert
 from profiles.models import Profile
 
 
 logger = logging.getLogger(__name__)
 
+# Dispersion des adresses synthétiques autour du centroïde de leur code postal, en degrés
+ADDRESS_SCATTER = 0.15
+
+# Vocabulaire du jeu de données synthétique (--scale)
+FIRST_NAMES = [
+    'James', 'Mary', 'John', 'Patricia', 'Robert', 'Jennifer', 'Michael', 'Linda', 'William',
+    'Elizabeth', 'David', 'Barbara', 'Richard', 'Susan', 'Joseph', 'Jessica', 'Thomas', 'Sarah',
+    'Charles', 'Karen', 'Camille', 'Louis', 'Léa', 'Hugo', 'Chloé', 'Lucas', 'Emma', 'Jules',
+]
+LAST_NAMES = [
+    'Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis', 'Rodriguez',
+    'Martinez', 'Wilson', 'Anderson', 'Taylor', 'Thomas', 'Moore', 'Martin', 'Jackson', 'White',
+    'Bernard', 'Dubois', 'Durand', 'Lefebvre', 'Moreau', 'Laurent', 'Simon', 'Michel',
+]
+# (ville, code d'état, premier code postal)
+CITIES = [
+    ('New York', 'NY', 10001), ('Los Angeles', 'CA', 90001), ('Chicago', 'IL', 60601),
+    ('Houston', 'TX', 77001), ('Phoenix', 'AZ', 85001), ('Philadelphia', 'PA', 19019),
+    ('San Antonio', 'TX', 78201), ('San Diego', 'CA', 92101), ('Dallas', 'TX', 75201),
+    ('Seattle', 'WA', 98101), ('Denver', 'CO', 80201), ('Boston', 'MA', 2108),
+    ('Miami', 'FL', 33101), ('Atlanta', 'GA', 30301), ('Portland', 'OR', 97201),
+    ('Nashville', 'TN', 37201), ('Detroit', 'MI', 48201), ('Minneapolis', 'MN', 55401),
+]
+STREET_NAMES = [
+    'Main', 'Oak', 'Pine', 'Maple', 'Cedar', 'Elm', 'Washington', 'Lake', 'Hill', 'Park',
+    'Sunset', 'River', 'Church', 'Highland', 'Forest', 'Jefferson', 'Lincoln', 'Madison',
+]
+STREET_SUFFIXES = ['Street', 'Avenue', 'Road', 'Boulevard', 'Lane', 'Drive', 'Court', 'Way']
+TITLE_ADJECTIVES = [
+    'Cozy', 'Modern', 'Sunny', 'Spacious', 'Charming', 'Quiet', 'Bright', 'Elegant', 'Rustic',
+    'Renovated', 'Luxury', 'Historic', 'Minimalist', 'Family',
+]
+TITLE_KINDS = ['Apartment', 'Loft', 'Studio', 'House', 'Cabin', 'Townhouse', 'Condo', 'Villa', 'Duplex']
+TITLE_FEATURES = [
+    'near Downtown', 'with Garden', 'with View', 'by the Park', 'in City Center', 'with Terrace',
+    'near the Lake', 'with Pool', 'close to Campus',
+]
+FAVORITE_CITIES = [city for city, _, _ in CITIES] + ['Paris', 'London', 'Tokyo', 'Berlin', 'Rome', '']
+
+
+def generate_users(rng, count, password_hash):
+    """
+    Génère des utilisateurs synthétiques déterministes (non sauvegardés).
+
+    Args:
+        rng (random.Random): Générateur initialisé avec la graine.
+        count (int): Nombre d'utilisateurs.
+        password_hash (str): Hash de mot de passe partagé, calculé une seule fois.
+
+    Yields:
+        User: Utilisateur au nom d'utilisateur unique (suffixe numérique).
+    """
+    for i in range(1, count + 1):
+        first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        username = f'{first_name}.{last_name}{i}'.lower()
+        yield User(username=username, first_name=first_name, last_name=last_name,
+                   email=f'{username}@example.com', password=password_hash)
+
+
+def generate_addresses(rng, count):
+    """
+    Génère des adresses synthétiques déterministes (non sauvegardées).
+
+    Les coordonnées sont celles du code postal, dispersées de ADDRESS_SCATTER
+    degrés au plus : des adresses réelles ne partagent pas toutes le même point.
+
+    Yields:
+        Address: Adresse dans une des villes de CITIES.
+    """
+    for _ in range(count):
+        city, state, zip_code = rng.choice(CITIES)
+        zip_code += rng.randint(0, 98)
+        latitude, longitude = geocode(zip_code, state)
+        yield Address(
+            number=rng.randint(1, 9999),
+            street=f'{rng.choice(STREET_NAMES)} {rng.choice(STREET_SUFFIXES)}',
+            city=city, state=state, zip_code=zip_code,
+            country_iso_code='USA',
+            latitude=latitude + rng.uniform(-ADDRESS_SCATTER, ADDRESS_SCATTER),
+            longitude=longitude + rng.uniform(-ADDRESS_SCATTER, ADDRESS_SCATTER),
+        )
+
+
+def generate_title(rng, city):
+    """
+    Génère un titre d'annonce réaliste pour une ville.
+    """
+    return f'{rng.choice(TITLE_ADJECTIVES)} {rng.choice(TITLE_KINDS)} {rng.choice(TITLE_FEATURES)}, {city}'
+
 
 class Command(BaseCommand):
     """
@@ -31,6 +128,7 @@ class Command(BaseCommand):
     Examples:
         python manage.py setup_production
         python manage.py setup_production --force
+        python manage.py setup_production --scale 250000 --seed 42 --force
     """
 
     help = 'Setup automatique du superuser et des données de démonstration pour la production'
@@ -44,12 +142,32 @@ class Command(BaseCommand):
 
         Note:
             --force : Force la recréation des données même si elles existent
+            --scale : Génère N profils et N lettings synthétiques au lieu des 4 de démonstration
+            --seed : Graine du générateur (même graine = même jeu de données)
+            --batch-size : Nombre de lignes insérées par transaction en mode --scale
         """
         parser.add_argument(
             '--force',
             action='store_true',
             help='Force la recréation des données même si elles existent'
         )
+        parser.add_argument(
+            '--scale',
+            type=int,
+            help='Génère N utilisateurs/profils et N adresses/lettings synthétiques'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Graine du générateur de données synthétiques (défaut: 42)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Lignes insérées par transaction en mode --scale (défaut: 5000)'
+        )
 
     def handle(self, *args, **options):
         """
@@ -63,6 +181,9 @@ class Command(BaseCommand):
             *args: Arguments positionnels (non utilisés)
             **options: Options de la commande
                 - force (bool): Si True, force la recréation des données existantes
+                - scale (int): Si renseigné, nombre de profils et de lettings synthétiques
+                - seed (int): Graine du générateur synthétique
+                - batch_size (int): Taille des lots d'insertion synthétique
 
         Raises:
             Exception: En cas d'erreur lors du setup, loggée et re-lancée
@@ -81,8 +202,13 @@ class Command(BaseCommand):
             # Créer le superuser
             self._create_superuser(options.get('force', False))
 
-            # Créer les données de démonstration
-            self._create_demo_data(options.get('force', False))
+            # Créer les données de démonstration (ou le jeu synthétique)
+            if options.get('scale'):
+                self._create_scaled_data(
+                    options['scale'], options['seed'], options['batch_size'], options.get('force', False)
+                )
+            else:
+                self._create_demo_data(options.get('force', False))
 
             self.stdout.write(self.style.SUCCESS('✅ Setup production terminé avec succès !'))
 
@@ -280,3 +406,132 @@ class Command(BaseCommand):
         )
 
         logger.info("Données de démonstration créées avec succès")
+
+    def _create_scaled_data(self, scale, seed, batch_size, force=False):
+        """
+        Générer un jeu de données synthétique de taille production.
+
+        Crée scale utilisateurs avec leur profil et scale adresses avec leur
+        letting, par lots insérés avec bulk_create dans une transaction chacun.
+        Les données ne dépendent que de la graine : deux exécutions avec la même
+        graine sur une base vide produisent des bases identiques.
+
+        Args:
+            scale (int): Nombre d'utilisateurs/profils et d'adresses/lettings.
+            seed (int): Graine du générateur pseudo-aléatoire.
+            batch_size (int): Nombre de lignes par lot et par transaction.
+            force (bool): Si True, supprime les données existantes avant création.
+
+        Returns:
+            None
+
+        Raises:
+            CommandError: Si scale ou batch_size n'est pas strictement positif.
+
+        Side Effects:
+            - Crée 4 × scale enregistrements en base
+            - Reconstruit les index de recherche plein texte et par proximité
+              (bulk_create n'émet pas de signaux)
+            - Affiche la progression (lignes/seconde) sur stdout
+
+        Note:
+            Tous les utilisateurs partagent le mot de passe 'demo123', haché une
+            seule fois : le hachage PBKDF2 par utilisateur coûterait des heures.
+        """
+        if scale < 1 or batch_size < 1:
+            raise CommandError('--scale et --batch-size doivent être supérieurs ou égaux à 1')
+
+        if not force and (Letting.objects.exists() or Profile.objects.exists()):
+            self.stdout.write('ℹ️  Données déjà présentes (utiliser --force pour les remplacer)')
+            return
+
+        if force:
+            self._delete_existing_data()
+            self.stdout.write('🔄 Suppression des données existantes')
+
+        rng = random.Random(seed)
+        password_hash = make_password('demo123')
+        start = time.perf_counter()
+
+        users = generate_users(rng, scale, password_hash)
+        self._insert_in_batches('profils', scale, batch_size, lambda count: self._insert_profiles(
+            rng, [next(users) for _ in range(count)]
+        ))
+        addresses = generate_addresses(rng, scale)
+        self._insert_in_batches('lettings', scale, batch_size, lambda count: self._insert_lettings(
+            rng, [next(addresses) for _ in range(count)]
+        ))
+
+        rebuild_index()
+        rebuild_spatial_index()
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'🎉 Jeu de données synthétique créé en {elapsed:.1f}s (graine {seed}):\n'
+            f'   - {scale} utilisateurs et profils\n'
+            f'   - {scale} adresses et lettings'
+        ))
+        logger.info("Jeu de données synthétique créé: %s profils, %s lettings, graine %s", scale, scale, seed)
+
+    @staticmethod
+    def _delete_existing_data():
+        """
+        Supprimer lettings, adresses, profils et utilisateurs non superusers, une requête DELETE par table.
+
+        QuerySet.delete() chargerait chaque ligne pour émettre ses signaux
+        post_delete (un log et une mise à jour d'index par ligne). _raw_delete
+        n'émet aucun signal et ne suit pas les clés étrangères : les tables
+        liées aux utilisateurs sont vidées explicitement, et les index de
+        recherche sont reconstruits une seule fois après la génération.
+        """
+        users = User.objects.filter(is_superuser=False).values('pk')
+        with transaction.atomic():
+            for queryset in (
+                Letting.objects.all(),
+                Address.objects.all(),
+                Profile.objects.all(),
+                User.groups.through.objects.filter(user_id__in=users),
+                User.user_permissions.through.objects.filter(user_id__in=users),
+                LogEntry.objects.filter(user_id__in=users),
+                User.objects.filter(is_superuser=False),
+            ):
+                queryset._raw_delete(queryset.db)
+
+    def _insert_in_batches(self, label, total, batch_size, insert_batch):
+        """
+        Appeler insert_batch par lots jusqu'à total lignes, en affichant la progression.
+
+        Args:
+            label (str): Nom des objets créés, pour l'affichage.
+            total (int): Nombre total de lignes à créer.
+            batch_size (int): Taille maximale d'un lot.
+            insert_batch (callable): Fonction créant un lot de count lignes.
+        """
+        start = time.perf_counter()
+        done = 0
+        while done < total:
+            count = min(batch_size, total - done)
+            with transaction.atomic():
+                insert_batch(count)
+            done += count
+            rate = done / (time.perf_counter() - start)
+            self.stdout.write(f'   {label}: {done}/{total} ({done * 100 // total}%, {rate:.0f} lignes/s)')
+
+    @staticmethod
+    def _insert_profiles(rng, users):
+        """
+        Insérer un lot d'utilisateurs et leurs profils.
+        """
+        bulk_insert(User, users)
+        bulk_insert(Profile, [
+            Profile(user_id=user.pk, favorite_city=rng.choice(FAVORITE_CITIES)) for user in users
+        ])
+
+    @staticmethod
+    def _insert_lettings(rng, addresses):
+        """
+        Insérer un lot d'adresses et leurs lettings.
+        """
+        bulk_insert(Address, addresses)
+        bulk_insert(Letting, [
+            Letting(title=generate_title(rng, address.city), address_id=address.pk) for address in addresses
+        ])
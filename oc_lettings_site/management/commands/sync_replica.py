@@ -0,0 +1,106 @@
+"""
+Commande Django de copie de la base SQLite principale vers ses réplicas en lecture.
+
+Utilise l'API de sauvegarde en ligne de SQLite : la copie est cohérente même
+pendant que l'application écrit dans la base principale, et les lecteurs d'un
+réplica voient l'ancienne ou la nouvelle version, jamais un mélange.
+
+Les fragments de templates en cache sont clefés par la date de modification
+de leur objet (voir oc_lettings_site/fragment_cache.py) : un fragment rendu
+depuis un réplica en retard correspond à l'ancienne version de l'objet, et la
+copie suivante n'a rien à invalider.
+
+Examples:
+    python manage.py sync_replica
+    python manage.py sync_replica --interval 2
+    python manage.py sync_replica --alias replica1
+"""
+import logging
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Commande Django de synchronisation des réplicas SQLite (settings.DATABASE_REPLICAS).
+
+    Attributes:
+        help (str): Description de la commande affichée dans --help
+    """
+
+    help = 'Copie la base SQLite principale vers les réplicas en lecture'
+
+    def add_arguments(self, parser):
+        """
+        Ajouter les arguments de ligne de commande disponibles.
+
+        Args:
+            parser (ArgumentParser): Parser d'arguments Django
+        """
+        parser.add_argument(
+            '--alias', action='append',
+            help='Réplica à synchroniser (répétable, défaut: tous)'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=0,
+            help='Resynchronise en continu toutes les N secondes (défaut: une seule fois)'
+        )
+
+    def handle(self, *args, **options):
+        """
+        Point d'entrée principal de la commande Django.
+
+        Raises:
+            CommandError: Si aucun réplica n'est configuré, si un alias est inconnu
+                ou si la base n'est pas SQLite.
+
+        Side Effects:
+            - Remplace le contenu des fichiers des réplicas
+        """
+        aliases = options['alias'] or settings.DATABASE_REPLICAS
+        if not aliases:
+            raise CommandError("Aucun réplica configuré (DATABASE_REPLICA_PATHS)")
+        unknown = set(aliases) - set(settings.DATABASE_REPLICAS)
+        if unknown:
+            raise CommandError(f"Réplicas inconnus: {', '.join(sorted(unknown))}")
+        for alias in [DEFAULT_DB_ALIAS] + list(aliases):
+            if settings.DATABASES[alias]['ENGINE'] != 'django.db.backends.sqlite3':
+                raise CommandError(f"La base {alias} n'est pas SQLite : utiliser la réplication du serveur")
+
+        while True:
+            for alias in aliases:
+                elapsed = self.sync(settings.DATABASES[DEFAULT_DB_ALIAS]['NAME'], settings.DATABASES[alias]['NAME'])
+                if options['verbosity'] >= 1:
+                    self.stdout.write(f'✅ {alias} synchronisé en {elapsed * 1000:.0f} ms')
+                logger.debug("Réplica %s synchronisé en %.3fs", alias, elapsed)
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
+
+    @staticmethod
+    def sync(source_path, replica_path):
+        """
+        Copie la base source dans le fichier du réplica.
+
+        Args:
+            source_path (str): Fichier de la base principale.
+            replica_path (str): Fichier du réplica (créé s'il n'existe pas).
+
+        Returns:
+            float: Durée de la copie en secondes.
+        """
+        start = time.perf_counter()
+        source = sqlite3.connect(source_path)
+        replica = sqlite3.connect(replica_path)
+        try:
+            source.backup(replica)
+        finally:
+            replica.close()
+            source.close()
+        return time.perf_counter() - start
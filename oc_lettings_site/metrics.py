@@ -0,0 +1,69 @@
+"""
+Métriques Prometheus des requêtes HTTP, agrégées entre les workers gunicorn.
+
+Avec la variable d'environnement PROMETHEUS_MULTIPROC_DIR (définie et vidée
+par gunicorn.conf.py avant le chargement de l'application), prometheus_client
+écrit les valeurs de chaque processus dans ses propres fichiers mappés en
+mémoire de ce répertoire : un worker n'écrit que dans ses fichiers et la vue
+/metrics les relit tous sans verrou partagé avec les requêtes en cours. Sans
+cette variable (runserver, tests), les métriques restent dans le processus.
+
+Les libellés 'endpoint' sont des noms d'URL (ex: 'lettings:letting'), jamais
+des chemins, pour garder un nombre de séries borné.
+"""
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess,
+)
+
+# Bornes des histogrammes de durée (secondes) et de nombre de requêtes SQL
+LATENCY_BUCKETS = (.001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# Méthodes HTTP conservées telles quelles dans les libellés, les autres deviennent 'other'
+KNOWN_METHODS = {'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'}
+
+REQUESTS = Counter(
+    'oc_lettings_http_requests', 'Requêtes HTTP traitées', ['endpoint', 'method', 'status'],
+)
+LATENCY = Histogram(
+    'oc_lettings_http_request_duration_seconds', 'Durée de traitement des requêtes HTTP', ['endpoint'],
+    buckets=LATENCY_BUCKETS,
+)
+QUERIES = Histogram(
+    'oc_lettings_http_request_db_queries', 'Requêtes SQL exécutées par requête HTTP', ['endpoint'],
+    buckets=QUERY_BUCKETS,
+)
+ERRORS = Counter(
+    'oc_lettings_http_request_errors', 'Réponses 5xx, par exception levée par la vue', ['endpoint', 'exception'],
+)
+DROPPED_LOG_LINES = Counter(
+    'oc_lettings_access_log_dropped_lines', "Lignes INFO d'accès écartées par l'échantillonnage", ['endpoint'],
+)
+IN_PROGRESS = Gauge(
+    'oc_lettings_http_requests_in_progress', 'Requêtes HTTP en cours de traitement',
+    multiprocess_mode='livesum',
+)
+
+
+def multiprocess_dir():
+    """
+    Répertoire des fichiers de métriques partagés entre processus, ou None.
+    """
+    return os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+
+
+def render_metrics():
+    """
+    Sérialise les métriques au format texte Prometheus.
+
+    Returns:
+        tuple: (corps (bytes), type de contenu).
+    """
+    if multiprocess_dir():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
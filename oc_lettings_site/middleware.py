@@ -0,0 +1,175 @@
+"""
+Middlewares de l'application oc_lettings_site.
+"""
+import itertools
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.urls import reverse
+
+from oc_lettings_site.db_router import reading_from_replicas
+from oc_lettings_site.metrics import ERRORS, IN_PROGRESS, KNOWN_METHODS, LATENCY, QUERIES, REQUESTS
+from oc_lettings_site.server_timing import PHASES, timing_request
+
+timing_logger = logging.getLogger('oc_lettings_site.server_timing')
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Envoie les lectures des pages publiques vers les réplicas de base de données.
+
+    Les requêtes GET/HEAD hors administration lisent sur un réplica. Après une
+    écriture (ou toute requête non sûre), un cookie épingle le navigateur sur
+    la base principale pendant settings.REPLICA_PIN_SECONDS : il relit ainsi
+    ses propres écritures même si les réplicas ont du retard.
+
+    Sans réplica configuré (settings.DATABASE_REPLICAS vide), le middleware
+    n'a aucun effet.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.admin_prefix = reverse('admin:index')
+
+    def __call__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+
+        enabled = (
+            request.method in SAFE_METHODS
+            and not request.path.startswith(self.admin_prefix)
+            and not self.is_pinned(request)
+        )
+        with reading_from_replicas(enabled) as state:
+            response = self.get_response(request)
+
+        if state.wrote or request.method not in SAFE_METHODS:
+            pin_seconds = settings.REPLICA_PIN_SECONDS
+            response.set_cookie(
+                settings.REPLICA_PIN_COOKIE, str(int(time.time()) + pin_seconds),
+                max_age=pin_seconds, httponly=True, samesite='Lax',
+            )
+        return response
+
+    @staticmethod
+    def is_pinned(request):
+        """
+        Indique si la requête porte un cookie d'épinglage encore valide.
+        """
+        try:
+            return int(request.COOKIES.get(settings.REPLICA_PIN_COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
+
+
+class ServerTimingMiddleware:
+    """
+    Mesure les phases d'une requête sur 1 sur settings.SERVER_TIMING_SAMPLE_RATE.
+
+    Les requêtes retenues reçoivent un en-tête Server-Timing (affiché par les
+    outils de développement des navigateurs, si settings.SERVER_TIMING_HEADER)
+    et produisent une ligne de log de synthèse clé=valeur sur le logger
+    'oc_lettings_site.server_timing'. Les phases sont décrites dans
+    oc_lettings_site/server_timing.py ; le corps d'une StreamingHttpResponse,
+    produit après le middleware, n'est pas mesuré.
+
+    Placé en tête de settings.MIDDLEWARE pour inclure les autres middlewares.
+    Avec SERVER_TIMING_SAMPLE_RATE=0, le middleware est retiré de la chaîne.
+    """
+
+    def __init__(self, get_response):
+        if settings.SERVER_TIMING_SAMPLE_RATE < 1:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = settings.SERVER_TIMING_SAMPLE_RATE
+        self.counter = itertools.count()
+
+    def __call__(self, request):
+        if next(self.counter) % self.sample_rate:
+            return self.get_response(request)
+
+        with timing_request() as timings, ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(timings.execute_wrapper))
+            request.server_timing = timings
+            response = self.get_response(request)
+            total = timings.finish()
+
+        self.report(request, response, timings, total)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        timings = getattr(request, 'server_timing', None)
+        if timings is not None:
+            timings.enter('view')
+
+    @staticmethod
+    def report(request, response, timings, total):
+        """
+        Ajoute l'en-tête Server-Timing et écrit la ligne de log de synthèse.
+        """
+        durations = {name: seconds * 1000 for name, seconds in timings.durations.items()}
+        if settings.SERVER_TIMING_HEADER:
+            entries = [f"{name};dur={milliseconds:.2f}" for name, milliseconds in durations.items()]
+            entries[PHASES.index('db')] += f';desc="SQL x{timings.queries}"'
+            response['Server-Timing'] = ', '.join(entries + [f"total;dur={total * 1000:.2f}"])
+        match = request.resolver_match
+        timing_logger.info(
+            "server_timing endpoint=%s method=%s status=%s total_ms=%.2f %s queries=%d",
+            match.view_name if match else '-', request.method, response.status_code, total * 1000,
+            ' '.join(f"{name}_ms={milliseconds:.2f}" for name, milliseconds in durations.items()), timings.queries,
+            extra={'server_timing': {**durations, 'total': total * 1000, 'queries': timings.queries}},
+        )
+
+
+class MetricsMiddleware:
+    """
+    Alimente les métriques Prometheus de chaque requête (voir oc_lettings_site/metrics.py).
+
+    Compte les requêtes par endpoint, méthode et statut, leur durée, leurs
+    requêtes SQL (execute_wrapper sur toutes les bases) et les réponses 5xx
+    avec l'exception levée par la vue. Placé en tête de settings.MIDDLEWARE
+    pour inclure les autres middlewares ; METRICS_ENABLED=False le retire.
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = [0]
+
+        def count_query(execute, sql, params, many, context):
+            queries[0] += 1
+            return execute(sql, params, many, context)
+
+        start = time.perf_counter()
+        IN_PROGRESS.inc()
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(count_query))
+                response = self.get_response(request)
+        finally:
+            IN_PROGRESS.dec()
+        duration = time.perf_counter() - start
+
+        match = request.resolver_match
+        endpoint = match.view_name if match else 'unmatched'
+        method = request.method if request.method in KNOWN_METHODS else 'other'
+        REQUESTS.labels(endpoint, method, str(response.status_code)).inc()
+        LATENCY.labels(endpoint).observe(duration)
+        QUERIES.labels(endpoint).observe(queries[0])
+        if response.status_code >= 500:
+            ERRORS.labels(endpoint, getattr(request, 'metrics_exception', 'none')).inc()
+        return response
+
+    def process_exception(self, request, exception):
+        request.metrics_exception = type(exception).__name__
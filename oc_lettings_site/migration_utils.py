@@ -0,0 +1,76 @@
+"""
+Outils pour les migrations de données (RunPython) sur de gros volumes.
+
+copy_in_chunks copie une table vers une autre par lots, en conservant les
+clés primaires. Les clés étrangères vers des lignes déjà copiées restent donc
+valables telles quelles : aucune requête de correspondance par ligne.
+
+Chaque lot est validé dans sa propre transaction. Une copie interrompue
+reprend après la plus grande clé déjà présente dans la table cible, à
+condition que la migration soit déclarée non atomique (atomic = False) :
+sinon tous les lots sont annulés avec la migration.
+"""
+from django.core.management.color import no_style
+from django.db import connections, transaction
+from django.db.models import Max
+
+from oc_lettings_site.bulk import bulk_insert
+
+
+def copy_in_chunks(source_queryset, target_model, build, using='default', chunk_size=2000):
+    """
+    Copie les lignes de source_queryset vers target_model par lots, en conservant les pk.
+
+    Args:
+        source_queryset (QuerySet): Lignes à copier (modèle historique de l'ancienne table).
+        target_model (Model): Modèle historique de la nouvelle table.
+        build (callable): Construit l'instance cible (sans pk) à partir d'une ligne source.
+        using (str): Alias de base de données (schema_editor.connection.alias).
+        chunk_size (int): Nombre de lignes lues et insérées par transaction.
+
+    Returns:
+        int: Nombre de lignes copiées par cet appel (hors lignes d'une exécution précédente).
+
+    Side Effects:
+        - Réinitialise la séquence de clé primaire de la table cible (PostgreSQL,
+          Oracle) pour que les prochaines insertions ne réutilisent pas un pk copié
+    """
+    target = target_model._default_manager.using(using)
+    source = source_queryset.using(using).order_by('pk')
+    # Point de reprise : les lots précédents ont été validés un par un
+    last_pk = target.aggregate(max_pk=Max('pk'))['max_pk']
+
+    copied = 0
+    while True:
+        remaining = source if last_pk is None else source.filter(pk__gt=last_pk)
+        rows = list(remaining[:chunk_size])
+        if not rows:
+            break
+        objs = []
+        for row in rows:
+            obj = build(row)
+            obj.pk = row.pk
+            objs.append(obj)
+        with transaction.atomic(using=using):
+            bulk_insert(target_model, objs, using=using)
+        copied += len(objs)
+        last_pk = rows[-1].pk
+
+    reset_sequence(target_model, using)
+    return copied
+
+
+def reset_sequence(model, using='default'):
+    """
+    Aligne la séquence de clé primaire d'une table sur son plus grand pk.
+
+    Args:
+        model (Model): Modèle dont la table a reçu des pk explicites.
+        using (str): Alias de base de données.
+    """
+    connection = connections[using]
+    statements = connection.ops.sequence_reset_sql(no_style(), [model])
+    if statements:
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
@@ -0,0 +1,190 @@
+"""
+Pagination par curseur (keyset) pour les listes de l'application.
+
+Contrairement à la pagination par numéro de page (LIMIT/OFFSET), la pagination
+par curseur filtre sur la clé de tri du dernier élément affiché. Chaque page
+coûte donc O(taille de page) grâce à l'index de la clé, quelle que soit la
+profondeur de navigation.
+"""
+import base64
+import binascii
+
+# Plus grand entier stocké par une colonne INTEGER de SQLite (64 bits signés)
+MAX_ID = 2 ** 63 - 1
+
+
+class InvalidCursor(ValueError):
+    """
+    Exception levée lorsqu'un curseur reçu en paramètre ne peut pas être décodé.
+    """
+
+
+def parse_id(value):
+    """
+    Convertit un identifiant reçu de l'extérieur, borné à la plage des INTEGER de SQLite.
+
+    Au-delà, SQLite refuse le paramètre de la requête (OverflowError) au lieu
+    de ne trouver aucune ligne.
+
+    Args:
+        value (str | int): Valeur à convertir.
+
+    Returns:
+        int: Identifiant entre 0 et MAX_ID.
+
+    Raises:
+        ValueError: Si la valeur n'est pas un entier de cette plage.
+    """
+    number = int(value)
+    if not 0 <= number <= MAX_ID:
+        raise ValueError(f"Identifiant hors limites: {value!r} (entre 0 et {MAX_ID})")
+    return number
+
+
+def encode_cursor(value):
+    """
+    Encode une valeur de clé de tri en curseur opaque utilisable dans une URL.
+
+    Args:
+        value: Valeur de la clé de tri du dernier (ou premier) élément de la page.
+
+    Returns:
+        str: Curseur encodé en base64 « URL-safe », sans remplissage.
+    """
+    encoded = base64.urlsafe_b64encode(str(value).encode('utf-8'))
+    return encoded.decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, cast=str):
+    """
+    Décode un curseur produit par encode_cursor.
+
+    Args:
+        cursor (str): Curseur reçu dans la query string.
+        cast (callable): Conversion appliquée à la valeur décodée (ex: int).
+
+    Returns:
+        La valeur de la clé de tri convertie par cast.
+
+    Raises:
+        InvalidCursor: Si le curseur est mal formé ou la conversion échoue.
+    """
+    padding = '=' * (-len(cursor) % 4)
+    try:
+        raw = base64.urlsafe_b64decode((cursor + padding).encode('ascii'))
+        return cast(raw.decode('utf-8'))
+    except (binascii.Error, UnicodeError, ValueError, TypeError) as e:
+        raise InvalidCursor(f"Curseur invalide: {cursor!r}") from e
+
+
+class KeysetPage:
+    """
+    Page de résultats produite par KeysetPaginator.
+
+    Attributes:
+        object_list (list): Éléments de la page, dans l'ordre croissant de la clé.
+        next_cursor (str | None): Curseur de la page suivante, None si dernière page.
+        previous_cursor (str | None): Curseur de la page précédente, None si première page.
+    """
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class KeysetPaginator:
+    """
+    Paginateur par curseur sur une clé de tri unique et indexée.
+
+    La clé doit être unique (ex: 'id' ou 'user__username') pour garantir un
+    ordre stable : deux éléments ne peuvent pas partager la même position.
+
+    Args:
+        queryset (QuerySet): Requête de base, sans tri imposé.
+        key (str): Lookup Django de la clé de tri (ex: 'user__username').
+        page_size (int): Nombre d'éléments par page.
+        cast (callable): Conversion de la valeur décodée d'un curseur.
+
+    Example:
+        >>> paginator = KeysetPaginator(Letting.objects.all(), key='id', page_size=20, cast=parse_id)
+        >>> page = paginator.get_page(after=request.GET.get('after'))
+    """
+
+    def __init__(self, queryset, key, page_size, cast=str):
+        if page_size < 1:
+            raise ValueError("page_size doit être supérieur ou égal à 1")
+        self.queryset = queryset
+        self.key = key
+        self.page_size = page_size
+        self.cast = cast
+
+    def get_page(self, after=None, before=None):
+        """
+        Retourne la page située après (ou avant) le curseur donné.
+
+        Une ligne supplémentaire est lue pour savoir s'il existe une page au-delà,
+        ce qui évite tout COUNT(*) sur la table.
+
+        Args:
+            after (str | None): Curseur de fin de la page précédente.
+            before (str | None): Curseur de début de la page suivante.
+
+        Returns:
+            KeysetPage: La page demandée (première page si aucun curseur).
+
+        Raises:
+            InvalidCursor: Si un curseur fourni est invalide.
+        """
+        if before:
+            value = decode_cursor(before, self.cast)
+            rows = list(
+                self.queryset.filter(**{f'{self.key}__lt': value})
+                .order_by(f'-{self.key}')[:self.page_size + 1]
+            )
+            has_more = len(rows) > self.page_size
+            rows = rows[:self.page_size][::-1]
+            return self._build_page(rows, has_next=True, has_previous=has_more)
+
+        queryset = self.queryset
+        if after:
+            value = decode_cursor(after, self.cast)
+            queryset = queryset.filter(**{f'{self.key}__gt': value})
+        rows = list(queryset.order_by(self.key)[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        return self._build_page(rows, has_next=has_more, has_previous=bool(after))
+
+    def _build_page(self, rows, has_next, has_previous):
+        """
+        Construit la KeysetPage et ses curseurs à partir des lignes lues.
+        """
+        if not rows:
+            return KeysetPage([])
+        next_cursor = encode_cursor(self._key_value(rows[-1])) if has_next else None
+        previous_cursor = encode_cursor(self._key_value(rows[0])) if has_previous else None
+        return KeysetPage(rows, next_cursor, previous_cursor)
+
+    def _key_value(self, obj):
+        """
+        Extrait la valeur de la clé de tri d'une instance ou d'un dict values().
+        """
+        if isinstance(obj, dict):
+            return obj[self.key]
+        for attr in self.key.split('__'):
+            obj = getattr(obj, attr)
+        return obj
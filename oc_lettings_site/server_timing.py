@@ -0,0 +1,138 @@
+"""
+Mesure du temps passé par une requête dans chaque phase de son traitement.
+
+Le temps d'une requête instrumentée (voir ServerTimingMiddleware) est réparti
+entre des phases exclusives qui s'emboîtent : une requête SQL exécutée
+pendant le rendu d'un template compte pour 'db', pas pour 'tpl'. La somme des
+phases est égale à la durée totale.
+
+Phases :
+    - mw : middlewares et résolution d'URL, hors phases ci-dessous ;
+    - view : code de la vue (et traitement de la réponse par les middlewares
+      suivants), hors phases ci-dessous ;
+    - db : requêtes SQL, toutes bases confondues (execute_wrapper) ;
+    - tpl : rendu des templates (backend TimedDjangoTemplates) ;
+    - log : écriture des lignes d'accès des vues (oc_lettings_site.access_log).
+
+En dehors d'une requête instrumentée, phase() ne fait rien.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.template.backends.django import DjangoTemplates, Template
+
+PHASES = ('mw', 'view', 'db', 'tpl', 'log')
+
+_current = ContextVar('server_timing', default=None)
+
+
+class RequestTimings:
+    """
+    Chronomètre des phases d'une requête.
+
+    Le temps écoulé est toujours attribué à la phase en haut de la pile.
+
+    Attributes:
+        durations (dict): Secondes passées dans chaque phase.
+        queries (int): Nombre de requêtes SQL exécutées.
+    """
+
+    def __init__(self):
+        self.durations = dict.fromkeys(PHASES, 0.0)
+        self.queries = 0
+        self._stack = ['mw']
+        self._start = self._mark = time.perf_counter()
+
+    def enter(self, name):
+        now = time.perf_counter()
+        self.durations[self._stack[-1]] += now - self._mark
+        self._stack.append(name)
+        self._mark = now
+
+    def exit(self):
+        now = time.perf_counter()
+        self.durations[self._stack.pop()] += now - self._mark
+        self._mark = now
+
+    def finish(self):
+        """
+        Referme les phases encore ouvertes (vue interrompue par une exception).
+
+        Returns:
+            float: Durée totale en secondes.
+        """
+        while len(self._stack) > 1:
+            self.exit()
+        self.exit()
+        return self._mark - self._start
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        """
+        Wrapper de connection.execute_wrapper() : compte et chronomètre la requête SQL.
+        """
+        self.queries += 1
+        self.enter('db')
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.exit()
+
+
+@contextmanager
+def timing_request():
+    """
+    Instrumente le bloc (une requête).
+
+    Yields:
+        RequestTimings: Chronomètre de la requête, à refermer avec finish().
+    """
+    token = _current.set(RequestTimings())
+    try:
+        yield _current.get()
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def phase(name):
+    """
+    Attribue le temps du bloc à une phase de la requête instrumentée en cours.
+
+    Args:
+        name (str): Nom de la phase (voir PHASES).
+    """
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    timings.enter(name)
+    try:
+        yield
+    finally:
+        timings.exit()
+
+
+class TimedTemplate(Template):
+    """
+    Template du backend Django dont le rendu compte pour la phase 'tpl'.
+    """
+
+    def render(self, context=None, request=None):
+        with phase('tpl'):
+            return super().render(context, request)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """
+    Backend de templates Django mesurant la durée des rendus.
+
+    Les templates inclus ({% include %}, {% extends %}) sont rendus à l'intérieur
+    du template principal et comptent donc aussi pour 'tpl'.
+    """
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name).template, self)
@@ -33,7 +33,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'oc_lettings_site.middleware.MetricsMiddleware',
+    'oc_lettings_site.middleware.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'oc_lettings_site.middleware.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -44,17 +47,30 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'oc_lettings_site.urls'
 
+# Templates compilés une seule fois par processus et gardés en mémoire (loader en cache),
+# tous compilés au démarrage des workers par gunicorn.conf.py (oc_lettings_site.lifecycle).
+# Actif par défaut hors DEBUG ; sinon chaque rendu relit et recompile les fichiers modifiés.
+TEMPLATE_CACHE = os.getenv('TEMPLATE_CACHE', str(not DEBUG)).lower() == 'true'
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates mesurant la durée des rendus (phase 'tpl' de Server-Timing)
+        'BACKEND': 'oc_lettings_site.server_timing.TimedDjangoTemplates',
+        'NAME': 'django',
         'DIRS': [os.path.join(BASE_DIR, 'templates')],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': [('django.template.loaders.cached.Loader', TEMPLATE_LOADERS)] if TEMPLATE_CACHE
+            else TEMPLATE_LOADERS,
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'oc_lettings_site.fragment_cache.fragment_cache',
             ],
         },
     },
@@ -69,10 +85,38 @@ WSGI_APPLICATION = 'oc_lettings_site.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': os.path.join(BASE_DIR, 'oc-lettings-site.sqlite3'),
+        'NAME': os.getenv('DATABASE_PATH', os.path.join(BASE_DIR, 'oc-lettings-site.sqlite3')),
+        # Durée de vie des connexions en secondes (0 = une connexion par requête)
+        'CONN_MAX_AGE': int(os.getenv('DATABASE_CONN_MAX_AGE', 600)),
     }
 }
 
+# Réplicas en lecture : fichiers SQLite séparés par des virgules, copiés depuis la
+# base principale par « manage.py sync_replica ». Les lectures des pages publiques
+# y sont réparties (oc_lettings_site/db_router.py) ; les tests utilisent 'default'.
+DATABASE_REPLICAS = []
+for _index, _path in enumerate(filter(None, os.getenv('DATABASE_REPLICA_PATHS', '').split(',')), start=1):
+    DATABASES[f'replica{_index}'] = {**DATABASES['default'], 'NAME': _path.strip(), 'TEST': {'MIRROR': 'default'}}
+    DATABASE_REPLICAS.append(f'replica{_index}')
+
+DATABASE_ROUTERS = ['oc_lettings_site.db_router.ReadReplicaRouter']
+
+# Durée pendant laquelle un navigateur qui vient d'écrire lit sur la base principale
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', 5))
+REPLICA_PIN_COOKIE = 'replica_pin'
+
+# PRAGMAs appliqués à chaque nouvelle connexion SQLite (voir oc_lettings_site/db.py).
+# Le mode WAL permet aux lectures des workers de ne pas attendre les écritures ;
+# synchronous=NORMAL est sûr en WAL (seule la dernière transaction peut être perdue
+# en cas de coupure de courant). cache_size négatif = taille en Kio.
+SQLITE_PRAGMAS = {
+    'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT', 5000)),
+    'journal_mode': os.getenv('SQLITE_JOURNAL_MODE', 'wal'),
+    'synchronous': os.getenv('SQLITE_SYNCHRONOUS', 'normal'),
+    'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+    'cache_size': int(os.getenv('SQLITE_CACHE_SIZE', -64 * 1024)),
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.0/ref/settings/#auth-password-validators
@@ -110,7 +154,7 @@ USE_TZ = True
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/3.0/howto/static-files/
 
-STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
+STATIC_ROOT = os.getenv('STATIC_ROOT', os.path.join(BASE_DIR, 'staticfiles'))
 
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [BASE_DIR / "static"]
@@ -118,7 +162,52 @@ STATICFILES_DIRS = [BASE_DIR / "static"]
 # Configuration pour la production
 if not DEBUG:
     # Ajouter WhiteNoise pour servir les fichiers statiques en production
-    MIDDLEWARE.insert(1, 'whitenoise.middleware.WhiteNoiseMiddleware')
+    MIDDLEWARE.insert(MIDDLEWARE.index('django.middleware.security.SecurityMiddleware') + 1,
+                      'whitenoise.middleware.WhiteNoiseMiddleware')
+    # collectstatic nomme chaque fichier d'après son contenu (styles.<hash>.css, URLs des
+    # CSS réécrites) et écrit ses versions gzip et Brotli ; WhiteNoise sert les noms hachés
+    # avec un cache immuable d'un an et la version compressée acceptée par le navigateur.
+    # {% static %} exige alors un collectstatic lancé avec DEBUG=False.
+    STATICFILES_STORAGE = 'oc_lettings_site.storage.StaticFilesStorage'
+
+# Cache
+# https://docs.djangoproject.com/en/3.0/topics/cache/
+#
+# L'alias 'fragments' stocke les fragments de templates rendus (voir
+# oc_lettings_site/fragment_cache.py). Leur clé contient la date de modification
+# de l'objet : le cache mémoire local, propre à chaque worker, ne sert jamais
+# de fragment périmé. Un backend partagé (FRAGMENT_CACHE_BACKEND) évite seulement
+# de rendre chaque fragment une fois par worker.
+CACHE_VERSION = int(os.getenv('CACHE_VERSION', 1))
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'fragments': {
+        'BACKEND': os.getenv('FRAGMENT_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('FRAGMENT_CACHE_LOCATION', 'oc-lettings-fragments'),
+        'TIMEOUT': int(os.getenv('FRAGMENT_CACHE_TIMEOUT', 3600)),
+        'VERSION': CACHE_VERSION,
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('FRAGMENT_CACHE_MAX_ENTRIES', 10000)),
+        },
+    },
+}
+
+# Pagination par curseur des listes lettings et profiles
+PAGINATION_PAGE_SIZE = int(os.getenv('PAGINATION_PAGE_SIZE', 20))
+
+# API JSON : lignes lues et sérialisées par lot dans les listes diffusées,
+# et nombre maximal de clés d'une lecture groupée (?ids=... / ?usernames=...)
+API_CHUNK_SIZE = int(os.getenv('API_CHUNK_SIZE', 2000))
+API_BATCH_MAX_SIZE = int(os.getenv('API_BATCH_MAX_SIZE', 100))
+
+# Table des centroïdes de codes postaux utilisée pour les coordonnées des adresses
+# (CSV zip,latitude,longitude ou fichier ZCTA Gazetteer du Census)
+ZIP_CENTROIDS_PATH = os.getenv('ZIP_CENTROIDS_PATH', str(BASE_DIR / 'lettings' / 'data' / 'zip_centroids.csv'))
+# Rayon maximal accepté par la recherche de lettings à proximité, en kilomètres
+NEARBY_MAX_RADIUS_KM = float(os.getenv('NEARBY_MAX_RADIUS_KM', 500))
 
 # Port pour Docker/Production
 PORT = int(os.getenv('PORT', 8000))
@@ -186,3 +275,42 @@ LOGGING = {
         },
     },
 }
+
+# Échantillonnage des lignes INFO d'accès des vues (voir oc_lettings_site/access_log.py)
+# ACCESS_LOG_SAMPLE_RATE=10 conserve 1 requête sur 10 ; ACCESS_LOG_SAMPLE_RATES
+# surcharge le taux par logger, ex: "lettings=20,profiles=5". Les lignes
+# WARNING et au-delà sont toujours conservées.
+ACCESS_LOG_SAMPLE_RATE = int(os.getenv('ACCESS_LOG_SAMPLE_RATE', 1))
+ACCESS_LOG_SAMPLE_RATES = {
+    name.strip(): int(rate)
+    for name, rate in (
+        item.split('=') for item in os.getenv('ACCESS_LOG_SAMPLE_RATES', '').split(',') if item
+    )
+}
+
+# Instrumentation des requêtes (voir oc_lettings_site/server_timing.py) : en-tête
+# Server-Timing et ligne de log de synthèse (phases mw, view, db, tpl, log) pour
+# 1 requête sur SERVER_TIMING_SAMPLE_RATE ; 0 désactive le middleware.
+# SERVER_TIMING_HEADER=False garde la ligne de log sans exposer l'en-tête.
+SERVER_TIMING_SAMPLE_RATE = int(os.getenv('SERVER_TIMING_SAMPLE_RATE', 1 if DEBUG else 10))
+SERVER_TIMING_HEADER = os.getenv('SERVER_TIMING_HEADER', 'True').lower() == 'true'
+
+# Métriques Prometheus (voir oc_lettings_site/metrics.py), exposées sur /metrics.
+# Avec plusieurs workers gunicorn, PROMETHEUS_MULTIPROC_DIR (défini par
+# gunicorn.conf.py) agrège les workers. Si METRICS_TOKEN est défini, /metrics
+# exige l'en-tête « Authorization: Bearer <METRICS_TOKEN> ».
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True').lower() == 'true'
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# Journalisation asynchrone (voir oc_lettings_site/log_queue.py)
+# Les handlers listés dans LOG_QUEUE_HANDLERS sont déplacés derrière une file
+# bornée vidée par un thread dédié par worker. Le handler Sentry reste
+# synchrone pour conserver le contexte de la requête.
+LOG_QUEUE_ENABLED = os.getenv('LOG_QUEUE_ENABLED', 'True').lower() == 'true'
+LOG_QUEUE_LOGGERS = ['root', 'django', 'oc_lettings_site', 'lettings', 'profiles']
+LOG_QUEUE_HANDLERS = ['console', 'file']
+LOG_QUEUE_MAXSIZE = int(os.getenv('LOG_QUEUE_MAXSIZE', 10000))
+# 'drop' : abandonne les logs quand la file est pleine (latence garantie)
+# 'block' : attend au plus LOG_QUEUE_BLOCK_TIMEOUT secondes (aucune perte)
+LOG_QUEUE_OVERFLOW = os.getenv('LOG_QUEUE_OVERFLOW', 'drop')
+LOG_QUEUE_BLOCK_TIMEOUT = float(os.getenv('LOG_QUEUE_BLOCK_TIMEOUT', 1.0))
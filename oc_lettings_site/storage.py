@@ -0,0 +1,31 @@
+"""
+Stockage des fichiers statiques collectés (settings.STATICFILES_STORAGE hors DEBUG).
+"""
+import logging
+
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+logger = logging.getLogger(__name__)
+
+
+class StaticFilesStorage(CompressedManifestStaticFilesStorage):
+    """
+    Noms hachés d'après le contenu, versions gzip et Brotli (WhiteNoise).
+
+    Le thème (css/styles.css) référence des images qu'il ne fournit pas
+    (arrière-plans, maquettes d'appareils) dans des règles que les templates
+    n'utilisent pas. Le stockage de WhiteNoise interrompt collectstatic sur
+    une telle référence ; celui-ci la laisse inchangée et la signale.
+    """
+
+    def url_converter(self, name, hashed_files, template=None):
+        converter = super().url_converter(name, hashed_files, template)
+
+        def convert(matchobj):
+            try:
+                return converter(matchobj)
+            except ValueError:
+                logger.warning("Fichier introuvable, référence conservée dans %s : %s", name, matchobj.group(0))
+                return matchobj.group(0)
+
+        return convert
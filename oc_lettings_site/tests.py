@@ -4,10 +4,53 @@ Tests pour l'application oc_lettings_site.
 Ce module contient tous les tests pour les vues principales
 de l'application oc_lettings_site.
 """
+import csv
+import gzip
+import json
+import logging
+import os
+import re
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from io import StringIO
 import pytest
 from unittest.mock import patch
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.contrib.auth.models import Group, User
+from django.contrib.sessions.models import Session
+from django.http import HttpResponse
 from django.urls import reverse
-from django.test import Client
+from django.template import engines
+from django.test import Client, RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from lettings.models import Address, Letting
+from profiles.models import Profile
+from oc_lettings_site.access_log import SampledLogger
+from oc_lettings_site.assets import (
+    CRITICAL_TEMPLATE, FONT_SOURCE_DIR, ICON_SPRITE, PURGED_STYLESHEET, STYLESHEET, FontFace, TemplateUsage,
+    convert_font, critical_template, icon_sprite, parse_stylesheet, prune_unused, purge_rules, purge_stylesheet,
+    selector_used, serialize, template_usage, used_font_faces, used_icons,
+)
+from oc_lettings_site.db import pragma_statements
+from oc_lettings_site.db_router import ReadReplicaRouter, reading_from_replicas
+from oc_lettings_site.management.commands.replay_load import parse_line
+from oc_lettings_site.management.commands.sync_replica import Command as SyncReplicaCommand
+from oc_lettings_site.middleware import MetricsMiddleware, ReplicaRoutingMiddleware
+from oc_lettings_site.lifecycle import compile_templates, cpu_count, project_templates, warm_templates, warm_up
+from oc_lettings_site.log_queue import LogQueuePipeline, RoutedQueueHandler
+from oc_lettings_site.pagination import (
+    MAX_ID, InvalidCursor, KeysetPaginator, decode_cursor, encode_cursor, parse_id
+)
+from prometheus_client import REGISTRY, CollectorRegistry
+from prometheus_client.multiprocess import MultiProcessCollector
+from service.sentry_service import RouteTracesSampler, parse_rates
 
 
 @pytest.fixture
@@ -101,7 +144,10 @@ class TestMainViews:
         assert response.status_code == 200
 
         # Vérifier que le log a été appelé
-        mock_logger.info.assert_called_once_with("Page d'accueil visitée par 127.0.0.1")
+        mock_logger.endpoint.assert_called_once_with('home')
+        mock_logger.endpoint.return_value.info.assert_called_once_with(
+            "Page d'accueil visitée par %s", "127.0.0.1"
+        )
 
     @patch('oc_lettings_site.views.render')
     @patch('oc_lettings_site.views.logger')
@@ -115,7 +161,10 @@ class TestMainViews:
 
         # Vérifier que l'erreur a été loggée
         expected_message = "Erreur lors du rendu de la page d'accueil: Template error"
-        mock_logger.error.assert_called_once_with(expected_message)
+        log = mock_logger.endpoint.return_value
+        log.error.assert_called_once()
+        msg, *args = log.error.call_args[0]
+        assert msg % tuple(args) == expected_message
 
 
 class TestMainURLs:
@@ -125,3 +174,736 @@ class TestMainURLs:
         """Test l'URL home."""
         url = reverse('home')
         assert url == '/'
+
+
+class TestKeysetPagination:
+    """Tests pour les utilitaires de pagination par curseur."""
+
+    def test_cursor_roundtrip(self):
+        """Test qu'un curseur encodé se décode vers la valeur d'origine."""
+        assert decode_cursor(encode_cursor(42), int) == 42
+        assert decode_cursor(encode_cursor('jane_smith')) == 'jane_smith'
+
+    def test_invalid_cursor(self):
+        """Test qu'un curseur mal formé lève InvalidCursor."""
+        with pytest.raises(InvalidCursor):
+            decode_cursor(encode_cursor('abc'), int)
+
+    def test_cursor_id_within_sqlite_range(self):
+        """Test qu'un identifiant hors de la plage des INTEGER de SQLite est un curseur invalide."""
+        assert decode_cursor(encode_cursor(MAX_ID), parse_id) == MAX_ID
+        for value in (MAX_ID + 1, -1):
+            with pytest.raises(InvalidCursor):
+                decode_cursor(encode_cursor(value), parse_id)
+
+    def test_page_size_must_be_positive(self):
+        """Test qu'une taille de page nulle est refusée."""
+        with pytest.raises(ValueError):
+            KeysetPaginator(queryset=None, key='id', page_size=0)
+
+
+class CollectingHandler(logging.Handler):
+    """Handler de test mémorisant les messages reçus, éventuellement bloquant."""
+
+    def __init__(self, gate=None):
+        super().__init__()
+        self.messages = []
+        self.gate = gate
+
+    def emit(self, record):
+        if self.gate is not None:
+            self.gate.wait(timeout=5)
+        self.messages.append(record.getMessage())
+
+
+class TestLogQueue:
+    """Tests pour la journalisation asynchrone par file d'attente."""
+
+    def make_logger(self, pipeline, name):
+        logger = logging.getLogger(f'tests.log_queue.{name}')
+        logger.propagate = False
+        logger.handlers = [RoutedQueueHandler(pipeline, name)]
+        return logger
+
+    def test_records_routed_and_flushed_on_stop(self):
+        """Test que chaque logger écrit dans ses propres handlers, vidés à l'arrêt."""
+        pipeline = LogQueuePipeline(maxsize=100)
+        first, second = CollectingHandler(), CollectingHandler()
+        pipeline.routes = {'first': [first], 'second': [second]}
+
+        self.make_logger(pipeline, 'first').info("message %s", 1)
+        self.make_logger(pipeline, 'second').info("message %s", 2)
+        pipeline.stop()
+
+        assert first.messages == ['message 1']
+        assert second.messages == ['message 2']
+
+    def test_drop_policy_counts_and_reports_lost_records(self):
+        """Test qu'une file pleine abandonne les logs et le signale ensuite."""
+        gate = threading.Event()
+        handler = CollectingHandler(gate)
+        pipeline = LogQueuePipeline(maxsize=1, overflow='drop')
+        pipeline.routes = {'drop': [handler]}
+        logger = self.make_logger(pipeline, 'drop')
+
+        for i in range(10):
+            logger.info("message %s", i)
+        assert pipeline.dropped > 0
+        gate.set()
+        pipeline.stop()
+
+        assert any('messages de log perdus' in message for message in handler.messages)
+
+    def test_unknown_overflow_policy(self):
+        """Test qu'une politique de débordement inconnue est refusée."""
+        with pytest.raises(ValueError):
+            LogQueuePipeline(overflow='ignore')
+
+
+class TestSampledLogger:
+    """Tests pour la façade de journalisation échantillonnée."""
+
+    def make_logger(self, sample_rate, level=logging.INFO):
+        sampled = SampledLogger('tests.access_log', sample_rate)
+        sampled.logger.setLevel(level)
+        return sampled
+
+    @staticmethod
+    def dropped(endpoint):
+        return REGISTRY.get_sample_value('oc_lettings_access_log_dropped_lines_total', {'endpoint': endpoint}) or 0
+
+    def test_info_sampled_one_in_n(self):
+        """Test que seule une requête sur N émet ses lignes INFO et que les autres sont comptées."""
+        sampled = self.make_logger(sample_rate=3)
+        before = self.dropped('lettings:index')
+        with patch.object(sampled.logger, 'info') as mock_info:
+            for _ in range(6):
+                sampled.endpoint('lettings:index').info("Accès par %s", '127.0.0.1')
+
+        assert mock_info.call_count == 2
+        assert self.dropped('lettings:index') == before + 4
+
+    def test_warning_never_sampled(self):
+        """Test que les lignes WARNING sont toujours émises."""
+        sampled = self.make_logger(sample_rate=100)
+        with patch.object(sampled.logger, 'warning') as mock_warning:
+            for _ in range(3):
+                sampled.endpoint('lettings:letting').warning("Letting %s introuvable", 1)
+
+        assert mock_warning.call_count == 3
+
+    def test_filtered_level_not_counted_as_dropped(self):
+        """Test qu'une ligne filtrée par le niveau n'est ni émise ni comptée."""
+        sampled = self.make_logger(sample_rate=1, level=logging.WARNING)
+        before = self.dropped('home')
+        with patch.object(sampled.logger, 'info') as mock_info:
+            sampled.endpoint('home').info("Page d'accueil visitée par %s", '127.0.0.1')
+
+        mock_info.assert_not_called()
+        assert self.dropped('home') == before
+
+
+class TestRouteTracesSampler:
+    """Tests pour l'échantillonnage des traces Sentry par route."""
+
+    def make_sampler(self, **kwargs):
+        options = {
+            'default_rate': 0.1,
+            'route_rates': {'lettings:index': 0.01},
+            'ignored_prefixes': ['/static/', '/favicon.ico'],
+            'ignored_rate': 0.0,
+        }
+        options.update(kwargs)
+        return RouteTracesSampler(**options)
+
+    def make_transaction(self, path, status='ok', duration_ms=10, status_code='200'):
+        start = datetime(2024, 1, 1)
+        return {
+            'request': {'url': f'http://testserver{path}'},
+            'contexts': {'trace': {'status': status}},
+            'tags': {'http.status_code': status_code},
+            'start_timestamp': start,
+            'timestamp': start + timedelta(milliseconds=duration_ms),
+        }
+
+    def test_parse_rates(self):
+        """Test du parsing des taux par nom d'URL."""
+        assert parse_rates('lettings:index=0.01, home=0.5,') == {'lettings:index': 0.01, 'home': 0.5}
+        assert parse_rates('') == {}
+
+    def test_rate_by_url_name(self):
+        """Test que le taux dépend du nom d'URL résolu depuis le chemin."""
+        sampler = self.make_sampler()
+
+        assert sampler({'wsgi_environ': {'PATH_INFO': '/lettings/'}}) == 0.01
+        assert sampler({'wsgi_environ': {'PATH_INFO': '/profiles/'}}) == 0.1
+        assert sampler({'wsgi_environ': {'PATH_INFO': '/inexistant/'}}) == 0.1
+
+    def test_ignored_prefixes(self):
+        """Test que les fichiers statiques reçoivent le taux ignoré, même avec candidate_rate."""
+        sampler = self.make_sampler(candidate_rate=0.5)
+
+        assert sampler({'wsgi_environ': {'PATH_INFO': '/static/css/styles.css'}}) == 0.0
+
+    def test_parent_decision_honoured(self):
+        """Test que la décision d'une trace amont est respectée."""
+        sampler = self.make_sampler()
+
+        assert sampler({'parent_sampled': True, 'wsgi_environ': {'PATH_INFO': '/lettings/'}}) == 1.0
+        assert sampler({'parent_sampled': False, 'wsgi_environ': {'PATH_INFO': '/'}}) == 0.0
+
+    def test_candidate_rate_keeps_errors_and_slow(self):
+        """Test que les transactions en erreur ou lentes sont toujours conservées."""
+        sampler = self.make_sampler(default_rate=0.0, route_rates={}, candidate_rate=0.5, slow_ms=500)
+
+        assert sampler({'wsgi_environ': {'PATH_INFO': '/lettings/'}}) == 0.5
+        error = self.make_transaction('/lettings/', status='internal_error', status_code='500')
+        slow = self.make_transaction('/lettings/', duration_ms=800)
+        fast = self.make_transaction('/lettings/')
+        assert sampler.before_send_transaction(error, {}) is error
+        assert sampler.before_send_transaction(slow, {}) is slow
+        assert sampler.before_send_transaction(fast, {}) is None
+
+    def test_without_candidate_rate_keeps_everything(self):
+        """Test que sans candidate_rate, toutes les transactions tracées sont envoyées."""
+        sampler = self.make_sampler()
+        event = self.make_transaction('/lettings/')
+
+        assert sampler.before_send_transaction(event, {}) is event
+
+
+@pytest.mark.django_db
+class TestSetupProductionScale:
+    """Tests pour la génération d'un jeu de données synthétique (setup_production --scale)."""
+
+    def generate(self, *extra):
+        call_command('setup_production', '--scale', '12', '--batch-size', '5', *extra, stdout=StringIO())
+        return (
+            list(Letting.objects.order_by('id').values_list('title', 'address__city')),
+            list(Profile.objects.order_by('id').values_list('user__username', 'favorite_city')),
+        )
+
+    def test_scale_creates_related_rows_in_batches(self):
+        """Test que N profils et N lettings sont créés, chacun lié à son utilisateur/adresse."""
+        lettings, profiles = self.generate()
+
+        assert len(lettings) == 12 and len(profiles) == 12
+        assert all(title.endswith(city) for title, city in lettings)
+        assert len({username for username, _ in profiles}) == 12
+
+    def test_same_seed_same_data(self):
+        """Test que la même graine reproduit le même jeu de données."""
+        first = self.generate('--seed', '7')
+        second = self.generate('--seed', '7', '--force')
+
+        assert first == second
+
+    def test_force_deletes_in_bulk(self):
+        """Test que --force vide les tables en une requête DELETE chacune, sans toucher aux superusers."""
+        self.generate()
+        admin = User.objects.create_superuser('root', 'root@example.com', 'secret')
+        User.objects.exclude(pk=admin.pk).first().groups.add(Group.objects.create(name='staff'))
+
+        with CaptureQueriesContext(connection) as queries:
+            self.generate('--force')
+
+        deletes = [query['sql'] for query in queries.captured_queries if query['sql'].startswith('DELETE')]
+        for table in ('lettings_letting', 'lettings_address', 'profiles_profile'):
+            assert [sql for sql in deletes if f'"{table}"' in sql] == [f'DELETE FROM "{table}"']
+        assert User.objects.filter(pk=admin.pk).exists()
+        assert User.objects.count() == 14 and Letting.objects.count() == 12
+        assert not User.groups.through.objects.exists()
+
+
+@pytest.mark.django_db
+class TestExportData:
+    """Tests pour la commande d'export en masse (export_data)."""
+
+    @pytest.fixture
+    def profiles(self):
+        for name in ('alice', 'bob', 'carol'):
+            Profile.objects.create(user=User.objects.create_user(username=name, email=f'{name}@example.com'),
+                                   favorite_city='Lyon')
+        return Profile.objects.order_by('id')
+
+    def test_gzip_csv_file_in_chunks(self, tmp_path, profiles):
+        """Test l'export CSV compressé par lots, sans fichier temporaire restant."""
+        output = tmp_path / 'profiles.csv.gz'
+        out = StringIO()
+        call_command('export_data', 'profiles', '--output', str(output), '--chunk-size', '2', stdout=out)
+
+        with gzip.open(output, 'rt', encoding='utf-8', newline='') as stream:
+            rows = list(csv.DictReader(stream))
+        assert [row['username'] for row in rows] == ['alice', 'bob', 'carol']
+        assert rows[0]['email'] == 'alice@example.com' and 'password' not in rows[0]
+        assert '3 profiles exportés' in out.getvalue()
+        assert [path.name for path in tmp_path.iterdir()] == ['profiles.csv.gz']
+
+    def test_ndjson_stdout_since(self, capsys, profiles):
+        """Test l'export NDJSON sur stdout limité aux lignes modifiées depuis --since."""
+        Profile.objects.filter(user__username='alice').update(updated_at=timezone.now() - timedelta(days=3))
+        since = (timezone.now() - timedelta(days=1)).isoformat()
+        call_command('export_data', 'profiles', '--format', 'ndjson', '--since', since)
+
+        captured = capsys.readouterr()
+        lines = [json.loads(line) for line in captured.out.splitlines()]
+        assert [line['username'] for line in lines] == ['bob', 'carol']
+        assert '2 profiles exportés' in captured.err
+
+    def test_invalid_since(self):
+        """Test qu'une date --since invalide est refusée."""
+        with pytest.raises(CommandError, match='--since invalide'):
+            call_command('export_data', 'lettings', '--since', 'hier')
+
+
+class TestReplayLoad:
+    """Tests pour la commande de rejeu de charge (replay_load)."""
+
+    @pytest.mark.parametrize('line, path', [
+        ('/lettings/?after=3', '/lettings/?after=3'),
+        ('GET https://example.com/profiles/alice/', '/profiles/alice/'),
+        ('127.0.0.1 - - [18/Oct/2026:12:00:00 +0000] "GET /api/lettings/1/ HTTP/1.1" 200 310', '/api/lettings/1/'),
+        ("INFO 2026-10-18 12:46:53,056 views 17088 1399 Accès au letting ID 7 par 127.0.0.1", '/lettings/7/'),
+        ("INFO 2026-10-18 12:46:53,056 views 17088 1399 Recherche de lettings 'loft paris' par 10.0.0.1",
+         '/lettings/search/?q=loft+paris'),
+        ("INFO 2026-10-18 12:46:53,056 api 17088 1399 Profil 'bob' lu (API) par IP inconnue", '/api/profiles/bob/'),
+        ('POST /admin/login/', None),
+        ("INFO 2026-10-18 12:46:53,056 models 17088 1399 Nouveau letting créé: Loft", None),
+    ])
+    def test_parse_line(self, line, path):
+        """Test la conversion des listes d'URL et des journaux en chemins rejouables."""
+        assert parse_line(line) == path
+
+    @pytest.mark.django_db(transaction=True)
+    def test_replay_report(self, tmp_path):
+        """Test le rejeu en threads et le rapport JSON (débit, statuts, endpoints)."""
+        source = tmp_path / 'urls.txt'
+        source.write_text('/\n/profiles/\n/introuvable/\nPOST /admin/login/\n', encoding='utf-8')
+        output = tmp_path / 'replay.json'
+        out = StringIO()
+        call_command('replay_load', str(source), '--requests', '6', '--concurrency', '2',
+                     '--output', str(output), stdout=out)
+
+        report = json.loads(output.read_text(encoding='utf-8'))
+        assert report['requests'] == 6
+        assert report['statuses'] == {'2xx': 4, '4xx': 2}
+        assert report['error_rate'] == 0 and report['client_error_rate'] == pytest.approx(2 / 6, abs=1e-4)
+        assert set(report['endpoints']) == {'home', 'profiles:index', '(404)'}
+        assert sum(count for _, count in report['histogram']) == 6
+        assert 'Rejeu de 6 requêtes (3 lues, 1 lignes ignorées)' in out.getvalue()
+
+    def test_source_without_requests(self, tmp_path):
+        """Test qu'une source sans requête GET rejouable est refusée."""
+        source = tmp_path / 'empty.log'
+        source.write_text('INFO rien à rejouer\n', encoding='utf-8')
+        with pytest.raises(CommandError, match='Aucune requête GET rejouable'):
+            call_command('replay_load', str(source))
+
+
+class TestSqlitePragmas:
+    """Tests pour l'initialisation des connexions SQLite."""
+
+    def test_pragma_statements(self):
+        """Test de la génération des PRAGMAs dans l'ordre de configuration."""
+        statements = pragma_statements({'journal_mode': 'wal', 'cache_size': -2000, 'mmap_size': None})
+
+        assert statements == ['PRAGMA journal_mode = wal', 'PRAGMA cache_size = -2000']
+
+    def test_invalid_value_rejected(self):
+        """Test qu'une valeur d'environnement non reconnue est refusée."""
+        with pytest.raises(ImproperlyConfigured):
+            pragma_statements({'journal_mode': 'wal; DROP TABLE lettings_letting'})
+
+    @pytest.mark.django_db
+    def test_pragmas_applied_on_connection(self, settings):
+        """Test que les PRAGMAs configurés sont actifs sur la connexion ouverte."""
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            busy_timeout = cursor.fetchone()[0]
+            cursor.execute('PRAGMA cache_size')
+            cache_size = cursor.fetchone()[0]
+
+        assert busy_timeout == settings.SQLITE_PRAGMAS['busy_timeout']
+        assert cache_size == settings.SQLITE_PRAGMAS['cache_size']
+
+
+class TestReadReplicaRouting:
+    """Tests pour le routage des lectures vers les réplicas."""
+
+    @pytest.fixture(autouse=True)
+    def replica(self, settings):
+        settings.DATABASE_REPLICAS = ['replica1']
+
+    router = ReadReplicaRouter()
+
+    def test_reads_outside_requests_use_primary(self):
+        """Test que les lectures hors requête publique (commandes, shell) vont sur 'default'."""
+        assert self.router.db_for_read(Letting) == 'default'
+
+    def test_reads_in_public_request_use_replica(self):
+        """Test que les lectures d'une requête publique vont sur un réplica, sauf les sessions."""
+        with reading_from_replicas():
+            assert self.router.db_for_read(Letting) == 'replica1'
+            assert self.router.db_for_read(Session) == 'default'
+
+    def test_reads_after_write_use_primary(self):
+        """Test qu'une requête relit ses propres écritures sur la base principale."""
+        with reading_from_replicas() as state:
+            assert self.router.db_for_write(Letting) == 'default'
+            assert state.wrote
+            assert self.router.db_for_read(Letting) == 'default'
+
+    def test_migrations_only_on_primary(self):
+        """Test que les réplicas ne sont jamais migrés directement."""
+        assert self.router.allow_migrate('default', 'lettings')
+        assert not self.router.allow_migrate('replica1', 'lettings')
+
+
+class TestReplicaRoutingMiddleware:
+    """Tests pour le middleware d'épinglage sur la base principale."""
+
+    @pytest.fixture(autouse=True)
+    def replica(self, settings):
+        settings.DATABASE_REPLICAS = ['replica1']
+
+    def call_middleware(self, request, write=False):
+        seen = {}
+
+        def view(request):
+            seen['read_from'] = ReadReplicaRouter().db_for_read(Letting)
+            if write:
+                ReadReplicaRouter().db_for_write(Letting)
+            return HttpResponse()
+
+        response = ReplicaRoutingMiddleware(view)(request)
+        return seen['read_from'], response
+
+    def test_write_pins_browser_to_primary(self, settings):
+        """Test qu'après une écriture, le navigateur lit sur la base principale."""
+        factory = RequestFactory()
+        read_from, response = self.call_middleware(factory.get('/lettings/'), write=True)
+        assert read_from == 'replica1'
+        pin = response.cookies[settings.REPLICA_PIN_COOKIE]
+
+        read_from, _ = self.call_middleware(factory.get('/lettings/', HTTP_COOKIE=f'{pin.key}={pin.value}'))
+        assert read_from == 'default'
+
+    def test_expired_pin_and_admin(self, settings):
+        """Test qu'un épinglage expiré est ignoré et que l'admin lit toujours sur la base principale."""
+        factory = RequestFactory()
+        expired = f'{settings.REPLICA_PIN_COOKIE}={int(time.time()) - 1}'
+
+        assert self.call_middleware(factory.get('/profiles/', HTTP_COOKIE=expired))[0] == 'replica1'
+        assert self.call_middleware(factory.get(reverse('admin:index')))[0] == 'default'
+
+
+def test_sync_replica_copies_database(tmp_path):
+    """Test que sync_replica copie la base principale dans le fichier du réplica."""
+    source = sqlite3.connect(tmp_path / 'primary.sqlite3')
+    source.execute('CREATE TABLE t (v TEXT)')
+    source.execute("INSERT INTO t VALUES ('copié')")
+    source.commit()
+    source.close()
+
+    SyncReplicaCommand.sync(str(tmp_path / 'primary.sqlite3'), str(tmp_path / 'replica.sqlite3'))
+
+    replica = sqlite3.connect(tmp_path / 'replica.sqlite3')
+    assert replica.execute('SELECT v FROM t').fetchall() == [('copié',)]
+    replica.close()
+
+
+class TestServerTiming:
+    """Tests pour l'instrumentation des requêtes (ServerTimingMiddleware)."""
+
+    @staticmethod
+    def phases(response):
+        return {entry.split(';')[0]: entry for entry in response['Server-Timing'].split(', ')}
+
+    @pytest.mark.django_db
+    def test_header_and_summary_log(self, settings):
+        """Test l'en-tête Server-Timing et la ligne de synthèse d'une page avec SQL et template."""
+        settings.SERVER_TIMING_SAMPLE_RATE = 1
+        letting = Letting.objects.create(title='Loft', address=Address.objects.create(
+            number=1, street='Main St', city='Springfield', state='IL', zip_code=62701, country_iso_code='USA'))
+        with patch('oc_lettings_site.middleware.timing_logger') as timing_logger:
+            response = Client().get(reverse('lettings:letting', args=[letting.id]))
+
+        phases = self.phases(response)
+        assert set(phases) == {'mw', 'view', 'db', 'tpl', 'log', 'total'}
+        summary = timing_logger.info.call_args.kwargs['extra']['server_timing']
+        assert phases['db'].endswith(f'desc="SQL x{summary["queries"]}"') and summary['queries'] >= 1
+        assert summary['tpl'] > 0 and summary['log'] > 0
+        assert sum(summary[name] for name in ('mw', 'view', 'db', 'tpl', 'log')) == pytest.approx(summary['total'])
+        assert timing_logger.info.call_args.args[1:4] == ('lettings:letting', 'GET', 200)
+
+    @pytest.mark.django_db
+    def test_sampling(self, settings):
+        """Test que seule 1 requête sur SERVER_TIMING_SAMPLE_RATE est instrumentée."""
+        settings.SERVER_TIMING_SAMPLE_RATE = 3
+        client = Client()
+        headers = ['Server-Timing' in client.get(reverse('home')) for _ in range(6)]
+        assert headers == [True, False, False, True, False, False]
+
+    @pytest.mark.django_db
+    def test_disabled(self, settings):
+        """Test que SERVER_TIMING_SAMPLE_RATE=0 retire le middleware et que l'en-tête peut être masqué."""
+        settings.SERVER_TIMING_SAMPLE_RATE = 0
+        assert 'Server-Timing' not in Client().get(reverse('home'))
+        settings.SERVER_TIMING_SAMPLE_RATE = 1
+        settings.SERVER_TIMING_HEADER = False
+        with patch('oc_lettings_site.middleware.timing_logger') as timing_logger:
+            assert 'Server-Timing' not in Client().get(reverse('home'))
+        assert timing_logger.info.called
+
+
+class TestMetrics:
+    """Tests pour les métriques Prometheus (MetricsMiddleware et /metrics)."""
+
+    @staticmethod
+    def requests_count(endpoint, status='200'):
+        return REGISTRY.get_sample_value(
+            'oc_lettings_http_requests_total', {'endpoint': endpoint, 'method': 'GET', 'status': status}
+        ) or 0
+
+    @pytest.mark.django_db
+    def test_request_counted_and_exposed(self, client):
+        """Test qu'une requête est comptée par nom d'URL et exposée au format Prometheus."""
+        before = self.requests_count('home')
+        client.get(reverse('home'))
+        assert self.requests_count('home') == before + 1
+
+        response = client.get(reverse('metrics'))
+        assert response['Content-Type'].startswith('text/plain')
+        body = response.content.decode()
+        assert 'oc_lettings_http_request_duration_seconds_bucket{endpoint="home",le="0.005"}' in body
+        assert 'oc_lettings_http_request_db_queries_count{endpoint="home"}' in body
+
+    def test_server_error_counted_with_exception(self, rf):
+        """Test qu'une réponse 5xx est comptée avec l'exception levée par la vue."""
+        def get_response(request):
+            middleware.process_exception(request, ValueError('boom'))
+            return HttpResponse(status=500)
+
+        middleware = MetricsMiddleware(get_response)
+        labels = {'endpoint': 'unmatched', 'exception': 'ValueError'}
+        before = REGISTRY.get_sample_value('oc_lettings_http_request_errors_total', labels) or 0
+        middleware(rf.get('/introuvable/'))
+        assert REGISTRY.get_sample_value('oc_lettings_http_request_errors_total', labels) == before + 1
+
+    def test_token_required(self, client, settings):
+        """Test que /metrics exige le jeton METRICS_TOKEN lorsqu'il est défini."""
+        settings.METRICS_TOKEN = 's3cret'
+        assert client.get(reverse('metrics')).status_code == 401
+        assert client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer s3cret').status_code == 200
+
+    def test_aggregated_across_processes(self, tmp_path):
+        """Test l'agrégation des compteurs écrits par plusieurs processus dans PROMETHEUS_MULTIPROC_DIR."""
+        script = ("from oc_lettings_site.metrics import REQUESTS; "
+                  "REQUESTS.labels('home', 'GET', '200').inc(2)")
+        env = {**os.environ, 'PROMETHEUS_MULTIPROC_DIR': str(tmp_path)}
+        for _ in range(2):
+            subprocess.run([sys.executable, '-c', script], env=env, check=True,
+                           cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+        registry = CollectorRegistry()
+        MultiProcessCollector(registry, path=str(tmp_path))
+        labels = {'endpoint': 'home', 'method': 'GET', 'status': '200'}
+        assert registry.get_sample_value('oc_lettings_http_requests_total', labels) == 4
+
+
+class TestLifecycle:
+    """Tests pour le cycle de vie des workers gunicorn (oc_lettings_site/lifecycle.py)."""
+
+    def test_project_templates(self):
+        """Test que seuls les templates du projet sont préchauffés, pas ceux de l'administration."""
+        names = project_templates()
+        assert {'base.html', 'lettings/index.html', 'profiles/profile.html'} <= set(names)
+        assert not any(name.startswith('admin/') for name in names)
+
+    @pytest.mark.django_db
+    def test_warm_up(self):
+        """Test que le préchauffage prépare URLs, templates et connexions."""
+        report = warm_up()
+        assert report['urls'] > 10 and report['templates'] == len(project_templates())
+        assert report['connections'] == 1 and connection.connection is not None
+
+    def test_compile_templates_reports_all_errors(self, settings, tmp_path):
+        """Test que la compilation signale chaque template invalide ou référençant un template absent."""
+        (tmp_path / 'broken.html').write_text('{% if %}')
+        (tmp_path / 'orphan.html').write_text('{% extends "missing.html" %}')
+        (tmp_path / 'page.html').write_text('{% include "part.html" %}')
+        (tmp_path / 'part.html').write_text('ok')
+        settings.TEMPLATES = [{**settings.TEMPLATES[0], 'DIRS': [str(tmp_path)]}]
+        assert compile_templates(names=['page.html']) == ['page.html']
+        with pytest.raises(ImproperlyConfigured) as error:
+            compile_templates(names=['broken.html', 'orphan.html', 'page.html'])
+        assert 'broken.html: TemplateSyntaxError' in str(error.value)
+        assert 'orphan.html: TemplateDoesNotExist: missing.html' in str(error.value)
+        assert 'page.html' not in str(error.value)
+
+    def test_cached_templates_are_not_read_again(self, settings):
+        """Test qu'avec TEMPLATE_CACHE, les templates compilés au démarrage ne sont plus relus."""
+        options = {**settings.TEMPLATES[0]['OPTIONS'],
+                   'loaders': [('django.template.loaders.cached.Loader', settings.TEMPLATE_LOADERS)]}
+        settings.TEMPLATES = [{**settings.TEMPLATES[0], 'OPTIONS': options}]
+        assert warm_templates() == len(project_templates())
+        with patch('django.template.loaders.filesystem.Loader.get_contents', side_effect=AssertionError):
+            html = engines['django'].get_template('lettings/index.html').render({'lettings_list': []})
+        assert 'No lettings are available.' in html
+
+    def test_cpu_count_respects_cgroup_quota(self, tmp_path):
+        """Test que le quota CPU du conteneur (cgroup v2) limite le nombre de CPU."""
+        cpu_max = tmp_path / 'cpu.max'
+        cpu_max.write_text('150000 100000\n')
+        with patch('oc_lettings_site.lifecycle.CGROUP_CPU_MAX', str(cpu_max)), \
+                patch('os.sched_getaffinity', return_value=set(range(8))):
+            assert cpu_count() == 2
+        cpu_max.write_text('max 100000\n')
+        with patch('oc_lettings_site.lifecycle.CGROUP_CPU_MAX', str(cpu_max)), \
+                patch('os.sched_getaffinity', return_value=set(range(8))):
+            assert cpu_count() == 8
+
+
+class TestAssets:
+    """Tests pour la construction des fichiers statiques (oc_lettings_site/assets.py, storage.py)."""
+
+    USAGE = TemplateUsage(tags={'a', 'strong'}, classes={'btn', 'fw-500'}, ids={'main'}, text_tags={'a'})
+
+    @pytest.mark.parametrize('selector,used', [
+        ('.btn', True),
+        ('a.btn:hover > strong::before', True),
+        ('html body #main [type="button"]', True),
+        ('.btn:not(.disabled)', True),
+        ('.btn .icon', False),
+        ('ul.btn', False),
+        ('#sidebar', False),
+    ])
+    def test_selector_used(self, selector, used):
+        """Test qu'un sélecteur est utilisé si chacune de ses classes, balises et identifiants l'est."""
+        assert selector_used(selector, self.USAGE) is used
+
+    def test_used_font_faces(self):
+        """Test que seules les graisses des règles utilisées, variables résolues, sont retenues."""
+        css = """
+            :root { --body-weight: 300; }
+            body { font-weight: var(--body-weight); }
+            strong { font-weight: bolder; }
+            .unused, .other { font-weight: 900; font-style: italic; }
+            @media (min-width: 992px) { .fw-500 { font-weight: 500 !important; } }
+            @font-face { font-family: "Metropolis"; font-weight: 800; }
+        """
+        faces = used_font_faces(parse_stylesheet(css), self.USAGE)
+        assert faces == [FontFace(weight, 'normal') for weight in (300, 400, 500, 700)]
+
+    def test_template_usage(self):
+        """Test que les classes et identifiants des templates du projet sont relevés."""
+        usage = template_usage()
+        assert {'list-group-item', 'btn-primary', 'container'} <= usage.classes
+        assert 'layoutDefault' in usage.ids and 'strong' in usage.text_tags
+        # Les icônes SVG ne contiennent pas de texte
+        assert 'svg' in usage.tags and 'svg' not in usage.text_tags
+
+    def test_convert_font(self, tmp_path):
+        """Test que la conversion produit un WOFF2 plus léger, identique d'une exécution à l'autre."""
+        source = FONT_SOURCE_DIR / 'Metropolis-Regular.otf'
+        first, second = tmp_path / 'first.woff2', tmp_path / 'second.woff2'
+        convert_font(source, first)
+        convert_font(source, second)
+        assert first.read_bytes()[:4] == b'wOF2'
+        assert first.stat().st_size < source.stat().st_size / 2
+        assert first.read_bytes() == second.read_bytes()
+
+    def test_stylesheet_fonts_exist(self):
+        """Test que chaque police de static/css/styles.css est un WOFF2 livré (manage.py build_assets)."""
+        urls = re.findall(r'url\("([^"]+\.woff2)"\)', STYLESHEET.read_text(encoding='utf-8'))
+        assert urls and all((STYLESHEET.parent / url).resolve().is_file() for url in urls)
+
+    def test_purge_rules(self):
+        """Test que la purge garde les sélecteurs utilisés et que la CSS critique retire les états."""
+        css = """
+            .btn, .nav-link { color: red; }
+            .unused { color: blue; }
+            .btn:hover { color: green; }
+            @media (min-width: 992px) { .unused { margin: 0; } .fw-500 { font-weight: 500; } }
+            @media print { .btn { display: none; } }
+        """
+        rules = parse_stylesheet(css)
+        assert serialize(purge_rules(rules, self.USAGE)).splitlines() == [
+            '.btn{color:red}', '.btn:hover{color:green}',
+            '@media (min-width: 992px){.fw-500{font-weight:500}}', '@media print{.btn{display:none}}',
+        ]
+        assert serialize(purge_rules(rules, self.USAGE, critical=True)).splitlines() == [
+            '.btn{color:red}', '@media (min-width: 992px){.fw-500{font-weight:500}}',
+        ]
+
+    def test_prune_unused(self):
+        """Test que seules les variables lues (directement ou par une variable lue) et animations utilisées restent."""
+        css = """
+            :root { --color: var(--base); --base: red; --unused: blue; }
+            .btn { color: var(--color); animation: spin 1s; }
+            @keyframes spin { from { transform: rotate(0deg); } to { transform: rotate(360deg); } }
+            @keyframes fade { from { opacity: 0; } }
+        """
+        css = serialize(prune_unused(parse_stylesheet(css)))
+        assert '--color:var(--base)' in css and '--base:red' in css and '--unused' not in css
+        assert '@keyframes spin' in css and '@keyframes fade' not in css
+
+    def test_critical_template(self):
+        """Test que la CSS critique se rend avec les URLs des polices résolues par {% static %}."""
+        css = '@font-face { font-family: "Metropolis"; src: url("../assets/fonts/a.woff2"); }\n.btn { color: red; }'
+        html = engines['django'].from_string(critical_template(css, self.USAGE)).render()
+        assert html.strip() == '@font-face{font-family:"Metropolis";src:url("/static/assets/fonts/a.woff2")}\n' \
+                               '.btn{color:red}'
+
+    def test_built_stylesheets_are_up_to_date(self):
+        """Test que la feuille purgée et la CSS critique correspondent aux templates (manage.py build_assets)."""
+        css, usage = STYLESHEET.read_text(encoding='utf-8'), template_usage()
+        assert PURGED_STYLESHEET.read_text(encoding='utf-8') == purge_stylesheet(css, usage)
+        assert CRITICAL_TEMPLATE.read_text(encoding='utf-8') == critical_template(css, usage)
+
+    def test_icon_sprite(self, tmp_path):
+        """Test que chaque icône devient un symbole avec le viewBox et la présentation de sa source."""
+        (tmp_path / 'star.svg').write_text(
+            '<svg xmlns="http://www.w3.org/2000/svg" width="24" height="24" viewBox="0 0 24 24" stroke="red">'
+            '<circle r="4"></circle></svg>'
+        )
+        assert icon_sprite(['star'], tmp_path) == (
+            '<svg aria-hidden="true" style="display: none"><symbol id="icon-star" viewBox="0 0 24 24" stroke="red">'
+            '<circle r="4" /></symbol></svg>\n'
+        )
+        with pytest.raises(FileNotFoundError):
+            icon_sprite(['missing'], tmp_path)
+
+    def test_icon_sprite_is_up_to_date(self):
+        """Test que le sprite contient exactement les icônes des templates (manage.py build_assets)."""
+        assert 'user' in used_icons()
+        assert ICON_SPRITE.read_text(encoding='utf-8') == icon_sprite(used_icons())
+
+    @pytest.mark.django_db
+    def test_pages_load_no_third_party_resources(self, client):
+        """Test que les pages incluent le sprite et ne chargent que des scripts locaux différés."""
+        user = User.objects.create_user(username='iconuser')
+        Profile.objects.create(user=user, favorite_city='Paris')
+        html = client.get(reverse('profiles:profile', args=['iconuser'])).content.decode()
+        assert '<symbol id="icon-user"' in html and '<use href="#icon-user">' in html
+        assert 'data-feather' not in html and not re.search(r'(?:src|href)="(?:https?:)?//', html)
+        scripts = re.findall(r'<script\b[^>]*>', html)
+        assert scripts and all(' defer ' in script and 'src="/static/' in script for script in scripts)
+
+    def test_pages_inline_critical_css(self, client):
+        """Test que les pages incluent la CSS critique et chargent la feuille purgée sans bloquer le rendu."""
+        html = client.get(reverse('home')).content.decode()
+        assert '<style>' in html and '@font-face{font-family:"Metropolis"' in html
+        assert 'styles.purged.css" as="style"' in html and 'css/styles.css' not in html
+
+    def test_collectstatic_hashes_and_compresses(self, settings, tmp_path):
+        """Test que collectstatic produit des noms hachés et leurs versions gzip et Brotli."""
+        settings.STATICFILES_STORAGE = 'oc_lettings_site.storage.StaticFilesStorage'
+        settings.STATIC_ROOT = str(tmp_path)
+        call_command('collectstatic', interactive=False, verbosity=0)
+        manifest = json.loads((tmp_path / 'staticfiles.json').read_text())
+        hashed = manifest['paths']['css/styles.css']
+        assert re.fullmatch(r'css/styles\.[0-9a-f]{12}\.css', hashed)
+        assert (tmp_path / f'{hashed}.gz').is_file() and (tmp_path / f'{hashed}.br').is_file()
+        css = (tmp_path / hashed).read_text(encoding='utf-8')
+        assert re.search(r'Metropolis-Regular\.[0-9a-f]{12}\.woff2', css)
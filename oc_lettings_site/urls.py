@@ -11,6 +11,9 @@ from . import views
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', views.home, name='home'),  # Page d'accueil
+    path('metrics', views.metrics, name='metrics'),  # Métriques Prometheus
     path('lettings/', include('lettings.urls', namespace='lettings')),
     path('profiles/', include('profiles.urls', namespace='profiles')),
+    path('api/lettings/', include('lettings.api_urls', namespace='lettings-api')),
+    path('api/profiles/', include('profiles.api_urls', namespace='profiles-api')),
 ]
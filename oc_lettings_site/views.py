@@ -3,10 +3,15 @@ Module contenant les vues principales de l'application oc_lettings_site.
 
 Ce module définit la vue principale pour la page d'accueil du site.
 """
-import logging
+from django.conf import settings
+from django.http import HttpResponse
 from django.shortcuts import render
+from django.utils.crypto import constant_time_compare
 
-logger = logging.getLogger('oc_lettings_site')
+from .access_log import get_access_logger
+from .metrics import render_metrics
+
+logger = get_access_logger('oc_lettings_site')
 
 
 def home(request):
@@ -29,7 +34,7 @@ def home(request):
                   (erreurs de template, problèmes de contexte, etc.)
 
     Side Effects:
-        - Enregistre un log INFO avec l'adresse IP du visiteur
+        - Enregistre un log INFO (échantillonné) avec l'adresse IP du visiteur
         - En cas d'erreur : enregistre un log ERROR avant de re-lancer l'exception
 
     Template:
@@ -42,10 +47,30 @@ def home(request):
         GET / HTTP/1.1
         -> Affiche la page d'accueil avec liens vers /lettings/ et /profiles/
     """
-    logger.info(f"Page d'accueil visitée par {request.META.get('REMOTE_ADDR', 'IP inconnue')}")
+    log = logger.endpoint('home')
+    log.info("Page d'accueil visitée par %s", request.META.get('REMOTE_ADDR', 'IP inconnue'))
 
     try:
         return render(request, 'oc_lettings_site/index.html')
     except Exception as e:
-        logger.error(f"Erreur lors du rendu de la page d'accueil: {str(e)}")
+        log.error("Erreur lors du rendu de la page d'accueil: %s", e)
         raise
+
+
+def metrics(request):
+    """
+    Expose les métriques Prometheus de tous les workers (format texte).
+
+    Args:
+        request (HttpRequest): Requête du collecteur Prometheus.
+
+    Returns:
+        HttpResponse: Métriques au format d'exposition Prometheus, ou 401 si
+            settings.METRICS_TOKEN est défini et que le jeton fourni ne correspond pas.
+    """
+    if settings.METRICS_TOKEN and not constant_time_compare(
+        request.headers.get('Authorization', ''), f'Bearer {settings.METRICS_TOKEN}'
+    ):
+        return HttpResponse('Jeton invalide', status=401, content_type='text/plain')
+    body, content_type = render_metrics()
+    return HttpResponse(body, content_type=content_type)
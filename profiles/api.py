@@ -0,0 +1,101 @@
+"""
+Endpoints JSON en lecture seule des profils (liste, détail, lecture groupée).
+
+Chaque profil est exposé à plat avec les champs publics de son utilisateur
+(jamais le mot de passe ni les droits). Le paramètre 'fields' restreint les
+colonnes lues (ex: ?fields=username,favorite_city).
+
+Examples:
+    GET /api/profiles/?fields=username,email&after=1000
+    GET /api/profiles/alice/
+    GET /api/profiles/batch/?usernames=alice,bob
+"""
+from django.db import router
+from django.http import JsonResponse
+
+from oc_lettings_site.access_log import get_access_logger
+from oc_lettings_site.json_api import (
+    ApiError, batch_response, error_response, parse_fields, parse_id, parse_list, project, stream_list,
+)
+from .models import Profile
+
+logger = get_access_logger('profiles')
+
+# {nom public: chemin ORM}
+PROFILE_FIELDS = {
+    'id': 'id',
+    'username': 'user__username',
+    'first_name': 'user__first_name',
+    'last_name': 'user__last_name',
+    'email': 'user__email',
+    'favorite_city': 'favorite_city',
+    'updated_at': 'updated_at',
+}
+
+
+def _profiles():
+    # Base fixée pendant la requête : la diffusion a lieu hors du routage des lectures
+    return Profile.objects.using(router.db_for_read(Profile))
+
+
+def profile_list(request):
+    """
+    Diffuse tous les profils par identifiant croissant.
+
+    Args:
+        request: L'objet HttpRequest de Django (paramètres 'fields' et 'after',
+            identifiant après lequel reprendre).
+
+    Returns:
+        StreamingHttpResponse: {"results": [...]}, ou 400 si un paramètre est invalide.
+    """
+    log = logger.endpoint('profiles-api:list')
+    try:
+        names = parse_fields(request, PROFILE_FIELDS)
+        after = parse_id(request.GET.get('after', 0))
+    except ApiError as e:
+        log.warning("Requête de liste des profils invalide: %s", e)
+        return error_response(str(e))
+    log.info("Export JSON des profils après %s par %s", after, request.META.get('REMOTE_ADDR', 'IP inconnue'))
+    rows = project(_profiles().filter(id__gt=after).order_by('id'), PROFILE_FIELDS, names)
+    return stream_list(rows, names)
+
+
+def profile_detail(request, username):
+    """
+    Retourne un profil.
+
+    Returns:
+        JsonResponse: Champs demandés du profil, ou 404 s'il n'existe pas.
+    """
+    log = logger.endpoint('profiles-api:detail')
+    try:
+        names = parse_fields(request, PROFILE_FIELDS)
+    except ApiError as e:
+        log.warning("Lecture d'un profil invalide: %s", e)
+        return error_response(str(e))
+    row = project(_profiles().filter(user__username=username), PROFILE_FIELDS, names).first()
+    if row is None:
+        log.warning("Profil '%s' introuvable (API) - 404", username)
+        return error_response("Profil introuvable", status=404)
+    log.info("Profil '%s' lu (API) par %s", username, request.META.get('REMOTE_ADDR', 'IP inconnue'))
+    return JsonResponse(dict(zip(names, row)), json_dumps_params={'ensure_ascii': False})
+
+
+def profile_batch(request):
+    """
+    Retourne plusieurs profils en une requête SQL (paramètre 'usernames').
+
+    Returns:
+        JsonResponse: {"results": [...], "missing": [...]} dans l'ordre des noms demandés.
+    """
+    log = logger.endpoint('profiles-api:batch')
+    try:
+        names = parse_fields(request, PROFILE_FIELDS)
+        usernames = parse_list(request, 'usernames')
+    except ApiError as e:
+        log.warning("Lecture groupée de profils invalide: %s", e)
+        return error_response(str(e))
+    log.info("Lecture groupée de %s profils par %s", len(usernames), request.META.get('REMOTE_ADDR', 'IP inconnue'))
+    rows = project(_profiles().filter(user__username__in=usernames), PROFILE_FIELDS, names + ['username'])
+    return batch_response(rows, names, usernames)
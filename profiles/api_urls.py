@@ -0,0 +1,13 @@
+"""
+Configuration des URLs de l'API JSON des profils (montée sous /api/profiles/).
+"""
+from django.urls import path
+from . import api
+
+app_name = 'profiles-api'
+
+urlpatterns = [
+    path('', api.profile_list, name='list'),
+    path('batch/', api.profile_batch, name='batch'),
+    path('<str:username>/', api.profile_detail, name='detail'),
+]
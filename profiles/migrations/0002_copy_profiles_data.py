@@ -1,41 +1,54 @@
 from django.db import migrations
 
+from oc_lettings_site.migration_utils import copy_in_chunks
+
+
 def copy_profiles_data(apps, schema_editor):
     """
     Copie les données du modèle Profile de l'ancienne application vers la nouvelle.
+
+    Les profils dont l'utilisateur n'existe plus sont écartés par une seule
+    sous-requête. La copie se fait par lots validés séparément et reprend là
+    où elle s'est arrêtée si elle est relancée.
     """
     try:
         OldProfile = apps.get_model('oc_lettings_site', 'Profile')
     except LookupError:
         # L'ancien modèle n'existe pas, on passe
         return
-    
+
     NewProfile = apps.get_model('profiles', 'Profile')
     User = apps.get_model('auth', 'User')
 
-    # Copier chaque profil existant
-    for old_profile in OldProfile.objects.all():
-        # On récupère l'utilisateur lié au profil
-        try:
-            user = User.objects.get(pk=old_profile.user_id)
-        except User.DoesNotExist:
-            continue
-        # Création du nouveau profil
-        new_profile = NewProfile.objects.create(
-            user=user,
+    copy_in_chunks(
+        OldProfile.objects.filter(user_id__in=User.objects.values('pk')),
+        NewProfile,
+        lambda old_profile: NewProfile(
+            user_id=old_profile.user_id,
             favorite_city=old_profile.favorite_city
-        )
-        new_profile.save()
+        ),
+        using=schema_editor.connection.alias,
+    )
+
 
 class Migration(migrations.Migration):
     """
     Migration personnalisée pour copier les données Profile.
+
+    Non atomique : chaque lot copié est validé, ce qui permet la reprise.
     """
+    atomic = False
+
+    # Les anciennes tables doivent encore exister au moment de la copie
+    run_before = [
+        ('oc_lettings_site', '0002_delete_old_models'),
+    ]
+
     dependencies = [
         ('profiles', '0001_initial'),
         ('oc_lettings_site', '0001_initial'),
     ]
 
     operations = [
-        migrations.RunPython(copy_profiles_data),
-    ]
\ No newline at end of file
+        migrations.RunPython(copy_profiles_data, migrations.RunPython.noop),
+    ]
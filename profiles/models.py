@@ -6,6 +6,7 @@ les profils utilisateur.
 """
 import logging
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import User
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
@@ -17,6 +18,7 @@ class Profile(models.Model):
     """
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     favorite_city = models.CharField(max_length=64, blank=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         """
@@ -126,6 +128,9 @@ def user_saved(sender, instance, created, **kwargs):
     Side Effects:
         - Enregistre un log INFO avec le nom d'utilisateur
         - Log différencié selon création ou modification de compte
+        - Met à jour la date de modification (updated_at) du profil lié,
+          utilisée par les validateurs HTTP des pages profiles et par la clé
+          de ses fragments en cache (nom, prénom, email)
 
     Connected To:
         post_save signal du modèle User de Django auth via @receiver decorator
@@ -142,3 +147,4 @@ def user_saved(sender, instance, created, **kwargs):
         logger.info(f"Nouvel utilisateur créé: {instance.username}")
     else:
         logger.info(f"Utilisateur mis à jour: {instance.username}")
+        Profile.objects.filter(user_id=instance.pk).update(updated_at=timezone.now())
@@ -0,0 +1,100 @@
+"""
+Tests de non-régression sur le nombre de requêtes SQL des vues profiles.
+
+Ces tests figent le nombre de requêtes par page pour des jeux de données de
+taille croissante : une régression N+1 (accès à profile.user non joint)
+ferait croître ce nombre avec la taille de la page ou de la table.
+
+Un rendu complet coûte deux requêtes : la lecture des validateurs HTTP
+(dates de modification) puis celle des données. Une revalidation réussie
+(304) ne coûte que la première.
+"""
+import pytest
+from django.contrib.auth.models import User
+from django.test import Client
+from django.urls import reverse
+from profiles.models import Profile
+
+DATASET_SIZES = [10, 1000, 10000]
+PAGE_SIZE = 5
+
+
+@pytest.fixture
+def client():
+    """Fixture pour le client de test Django."""
+    return Client()
+
+
+@pytest.fixture(autouse=True)
+def page_size(settings):
+    """Fixe une taille de page inférieure au plus petit jeu de données."""
+    settings.PAGINATION_PAGE_SIZE = PAGE_SIZE
+
+
+def create_profiles(count):
+    """
+    Crée en masse count utilisateurs et leurs profils.
+
+    Args:
+        count (int): Nombre de profils à créer.
+
+    Returns:
+        list[str]: Noms d'utilisateurs créés, triés.
+    """
+    usernames = [f'user{i:05d}' for i in range(count)]
+    User.objects.bulk_create(
+        [User(username=username, first_name='First', last_name='Last') for username in usernames]
+    )
+    users = User.objects.filter(username__in=usernames).only('id')
+    Profile.objects.bulk_create(
+        [Profile(user=user, favorite_city='Paris') for user in users.iterator()]
+    )
+    return usernames
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('size', DATASET_SIZES)
+class TestProfilesQueryCount:
+    """Nombre de requêtes SQL des vues profiles selon la taille des données."""
+
+    def test_index_first_page(self, client, django_assert_num_queries, size):
+        """La première page de la liste coûte deux requêtes."""
+        create_profiles(size)
+        with django_assert_num_queries(2):
+            response = client.get(reverse('profiles:index'))
+        assert response.status_code == 200
+
+    def test_index_next_page(self, client, django_assert_num_queries, size):
+        """Une page suivante coûte deux requêtes, même loin dans la liste."""
+        create_profiles(size)
+        cursor = client.get(reverse('profiles:index')).context['page'].next_cursor
+        with django_assert_num_queries(2):
+            response = client.get(reverse('profiles:index'), {'after': cursor})
+        assert response.status_code == 200
+
+    def test_profile_detail(self, client, django_assert_num_queries, size):
+        """Le détail d'un profil coûte deux requêtes sur l'index du nom."""
+        usernames = create_profiles(size)
+        with django_assert_num_queries(2):
+            response = client.get(
+                reverse('profiles:profile', kwargs={'username': usernames[-1]})
+            )
+        assert response.status_code == 200
+        assert usernames[-1] in response.content.decode()
+
+    def test_index_not_modified(self, client, django_assert_num_queries, size):
+        """Une revalidation de la liste ne coûte qu'une requête."""
+        create_profiles(size)
+        etag = client.get(reverse('profiles:index'))['ETag']
+        with django_assert_num_queries(1):
+            response = client.get(reverse('profiles:index'), HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+    def test_profile_detail_not_modified(self, client, django_assert_num_queries, size):
+        """Une revalidation du détail d'un profil ne coûte qu'une requête."""
+        usernames = create_profiles(size)
+        url = reverse('profiles:profile', kwargs={'username': usernames[-1]})
+        etag = client.get(url)['ETag']
+        with django_assert_num_queries(1):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
@@ -4,10 +4,14 @@ Tests pour l'application profiles.
 Ce module contient tous les tests pour les modèles, vues et URLs
 de l'application profiles.
 """
+import json
+import logging
 import pytest
+from django.core.serializers.json import DjangoJSONEncoder
 from unittest.mock import patch
 from django.urls import reverse
 from django.test import Client
+from django.utils import timezone
 from django.contrib.auth.models import User
 from profiles.models import Profile
 
@@ -105,10 +109,12 @@ class TestProfilesViews:
         response = client.get(reverse('profiles:index'))
         assert response.status_code == 200
 
-        # Vérifier que les logs ont été appelés
-        assert mock_logger.info.call_count == 2
-        mock_logger.info.assert_any_call("Accès à la liste des profils par 127.0.0.1")
-        mock_logger.info.assert_any_call("Récupération de 1 profils")
+        # Vérifier que les logs ont été appelés, formatage différé
+        mock_logger.endpoint.assert_called_once_with('profiles:index')
+        log = mock_logger.endpoint.return_value
+        assert log.info.call_count == 2
+        log.info.assert_any_call("Accès à la liste des profils par %s", "127.0.0.1")
+        log.info.assert_any_call("Récupération de %s profils", 1)
 
     @patch('profiles.views.logger')
     def test_profile_detail_view_logging(self, mock_logger, client, profile):
@@ -120,11 +126,10 @@ class TestProfilesViews:
         assert response.status_code == 200
 
         # Vérifier que les logs ont été appelés
-        assert mock_logger.info.call_count == 2
-        expected_log = f"Accès au profil '{user.username}' par 127.0.0.1"
-        mock_logger.info.assert_any_call(expected_log)
-        expected_success = f"Profil de {user.username} récupéré avec succès"
-        mock_logger.info.assert_any_call(expected_success)
+        log = mock_logger.endpoint.return_value
+        assert log.info.call_count == 2
+        log.info.assert_any_call("Accès au profil '%s' par %s", user.username, "127.0.0.1")
+        log.info.assert_any_call("Profil de %s récupéré avec succès", user.username)
 
     @patch('profiles.views.logger')
     def test_profile_detail_view_404_logging(self, mock_logger, client):
@@ -135,8 +140,79 @@ class TestProfilesViews:
         assert response.status_code == 404
 
         # Vérifier que le log warning a été appelé
-        expected_warning = "Profil 'nonexistent' introuvable - 404"
-        mock_logger.warning.assert_called_once_with(expected_warning)
+        mock_logger.endpoint.return_value.warning.assert_called_once_with(
+            "Profil '%s' introuvable - 404", 'nonexistent'
+        )
+
+    def test_index_view_pagination(self, client, settings):
+        """Test la pagination par curseur triée sur le nom d'utilisateur."""
+        settings.PAGINATION_PAGE_SIZE = 2
+        for username in ['charlie', 'alice', 'bob']:
+            Profile.objects.create(user=User.objects.create_user(username=username))
+
+        first = client.get(reverse('profiles:index'))
+        assert [str(p) for p in first.context['profiles_list']] == ['alice', 'bob']
+
+        second = client.get(reverse('profiles:index'), {'after': first.context['page'].next_cursor})
+        assert [str(p) for p in second.context['profiles_list']] == ['charlie']
+        assert second.context['page'].has_previous
+        assert not second.context['page'].has_next
+
+
+@pytest.mark.django_db
+class TestProfilesFragmentCache:
+    """Tests pour l'invalidation du cache de fragments des profils."""
+
+    def test_card_invalidated_on_user_update(self, client, profile, user):
+        """Test qu'une modification de l'utilisateur re-rend la carte du profil."""
+        url = reverse('profiles:profile', kwargs={'username': user.username})
+        client.get(url)
+        user.first_name = 'Johnny'
+        user.save()
+
+        assert 'Johnny' in client.get(url).content.decode()
+
+    def test_card_invalidated_on_profile_update(self, client, profile, user):
+        """Test qu'une modification du profil re-rend sa carte."""
+        url = reverse('profiles:profile', kwargs={'username': user.username})
+        client.get(url)
+        profile.favorite_city = 'Lyon'
+        profile.save()
+
+        content = client.get(url).content.decode()
+        assert 'Lyon' in content
+        assert 'Paris' not in content
+
+    def test_card_rerendered_after_write_from_another_process(self, client, profile, user):
+        """Test qu'une écriture sans signal dans ce processus (autre worker) change la clé de la carte."""
+        url = reverse('profiles:profile', kwargs={'username': user.username})
+        client.get(url)
+        Profile.objects.filter(id=profile.id).update(favorite_city='Lyon', updated_at=timezone.now())
+
+        content = client.get(url).content.decode()
+        assert 'Lyon' in content
+        assert 'Paris' not in content
+
+
+@pytest.mark.django_db
+class TestProfilesConditionalGet:
+    """Tests pour les requêtes conditionnelles des pages profiles."""
+
+    def test_detail_not_modified(self, client, profile, user):
+        """Test qu'un ETag à jour renvoie une 304."""
+        url = reverse('profiles:profile', kwargs={'username': user.username})
+        etag = client.get(url)['ETag']
+
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    def test_user_update_propagates_to_profile(self, client, profile, user):
+        """Test qu'une modification de l'utilisateur change l'ETag du profil."""
+        url = reverse('profiles:profile', kwargs={'username': user.username})
+        etag = client.get(url)['ETag']
+        user.email = 'new@example.com'
+        user.save()
+
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
 
 
 @pytest.mark.django_db
@@ -152,3 +228,48 @@ class TestProfilesURLs:
         """Test l'URL détail d'un profile."""
         url = reverse('profiles:profile', kwargs={'username': user.username})
         assert url == f'/profiles/{user.username}/'
+
+
+@pytest.mark.django_db
+class TestProfilesApi:
+    """Tests pour l'API JSON des profils."""
+
+    def test_list_streams_profiles(self, client, profile):
+        """Test la liste diffusée, sans données sensibles de l'utilisateur."""
+        response = client.get(reverse('profiles-api:list'))
+        data = json.loads(b''.join(response.streaming_content))
+        assert data == {'results': [{
+            'id': profile.id, 'username': 'testuser', 'first_name': 'John', 'last_name': 'Doe',
+            'email': 'test@example.com', 'favorite_city': 'Paris',
+            'updated_at': DjangoJSONEncoder().default(profile.updated_at),
+        }]}
+        assert 'password' not in json.dumps(data)
+
+    def test_detail_and_fields(self, client, profile, caplog):
+        """Test la lecture d'un profil restreinte aux champs demandés, et la 400 journalisée sur un champ inconnu."""
+        response = client.get(reverse('profiles-api:detail', args=['testuser']), {'fields': 'favorite_city'})
+        assert response.json() == {'favorite_city': 'Paris'}
+        assert client.get(reverse('profiles-api:detail', args=['nobody'])).status_code == 404
+
+        with caplog.at_level(logging.WARNING, logger='profiles'):
+            response = client.get(reverse('profiles-api:detail', args=['testuser']), {'fields': 'password'})
+        assert response.status_code == 400
+        assert "Lecture d'un profil invalide" in caplog.text and 'password' in caplog.text
+
+    def test_list_out_of_range_after(self, client, profile):
+        """Test qu'un curseur 'after' hors de la plage des INTEGER de SQLite renvoie une 400 non diffusée."""
+        response = client.get(reverse('profiles-api:list'), {'after': '99999999999999999999'})
+        assert response.status_code == 400 and not response.streaming
+        assert client.get(reverse('profiles-api:detail', args=['testuser']), {'fields': 'x'}).status_code == 400
+
+    def test_batch_by_usernames(self, client, profile, django_assert_num_queries):
+        """Test la lecture groupée par noms d'utilisateur en une requête."""
+        Profile.objects.create(user=User.objects.create_user(username='alice'), favorite_city='Rome')
+        with django_assert_num_queries(1):
+            data = client.get(reverse('profiles-api:batch'),
+                              {'usernames': 'alice,nobody,testuser', 'fields': 'username,favorite_city'}).json()
+        assert data == {
+            'results': [{'username': 'alice', 'favorite_city': 'Rome'},
+                        {'username': 'testuser', 'favorite_city': 'Paris'}],
+            'missing': ['nobody'],
+        }
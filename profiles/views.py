@@ -4,17 +4,80 @@ Module contenant les vues pour l'application profiles.
 Ce module définit les vues pour afficher la liste des profils
 et les détails d'un profil spécifique.
 """
-import logging
+from django.conf import settings
 from django.shortcuts import render, get_object_or_404
 from django.http import Http404
+from oc_lettings_site.access_log import get_access_logger
+from oc_lettings_site.conditional import conditional_page, make_etag
+from oc_lettings_site.pagination import KeysetPaginator, InvalidCursor
 from .models import Profile
 
-logger = logging.getLogger('profiles')
+logger = get_access_logger('profiles')
 
+# Colonnes lues par les templates : la jointure sur auth_user est faite dans la
+# même requête SQL, sans charger le mot de passe ni les autres champs inutiles.
+INDEX_FIELDS = ('id', 'updated_at', 'user__id', 'user__username')
+DETAIL_FIELDS = (
+    'id', 'favorite_city', 'updated_at', 'user__id', 'user__username',
+    'user__first_name', 'user__last_name', 'user__email',
+)
 
+
+def index_validators(request):
+    """
+    Calcule l'ETag de la page de liste demandée.
+
+    Seuls le nom d'utilisateur et la date de modification des profils de la
+    page (plus celui qui détermine la présence d'une page suivante) sont lus.
+    Aucun Last-Modified n'est émis car une suppression ne le ferait pas avancer.
+
+    Args:
+        request: L'objet HttpRequest de Django.
+
+    Returns:
+        tuple: (etag, None), ou (None, None) si le curseur est invalide.
+    """
+    paginator = KeysetPaginator(
+        Profile.objects.values('user__username', 'updated_at'), key='user__username',
+        page_size=settings.PAGINATION_PAGE_SIZE
+    )
+    try:
+        page = paginator.get_page(after=request.GET.get('after'), before=request.GET.get('before'))
+    except InvalidCursor:
+        return None, None
+    return make_etag(request.get_full_path(), page.object_list, page.next_cursor), None
+
+
+def profile_validators(request, username):
+    """
+    Lit la date de modification d'un profil pour valider sa page de détail.
+
+    La date du profil avance aussi lorsque l'utilisateur lié est modifié
+    (voir le receiver user_saved).
+
+    Args:
+        request: L'objet HttpRequest de Django.
+        username: Le nom d'utilisateur du profil.
+
+    Returns:
+        tuple: (etag, last_modified), ou (None, None) si le profil n'existe pas.
+    """
+    updated_at = (
+        Profile.objects.filter(user__username=username)
+        .values_list('updated_at', flat=True).first()
+    )
+    if updated_at is None:
+        return None, None
+    return make_etag('profile', username, updated_at), updated_at
+
+
+@conditional_page(index_validators)
 def index(request):
     """
-    Affiche la liste des profils.
+    Affiche une page de la liste des profils.
+
+    La liste est paginée par curseur sur le nom d'utilisateur : les paramètres
+    'after' et 'before' de la query string désignent la page à afficher.
 
     Args:
         request: L'objet HttpRequest de Django.
@@ -22,18 +85,29 @@ def index(request):
     Returns:
         HttpResponse: La réponse HTTP avec le template rendu.
     """
-    logger.info(f"Accès à la liste des profils par {request.META.get('REMOTE_ADDR', 'IP inconnue')}")
+    log = logger.endpoint('profiles:index')
+    log.info("Accès à la liste des profils par %s", request.META.get('REMOTE_ADDR', 'IP inconnue'))
 
     try:
-        profiles_list = Profile.objects.all()
-        logger.info(f"Récupération de {len(profiles_list)} profils")
-        context = {'profiles_list': profiles_list}
+        queryset = Profile.objects.all().select_related('user').only(*INDEX_FIELDS)
+        paginator = KeysetPaginator(
+            queryset, key='user__username', page_size=settings.PAGINATION_PAGE_SIZE
+        )
+        page = paginator.get_page(
+            after=request.GET.get('after'), before=request.GET.get('before')
+        )
+        log.info("Récupération de %s profils", len(page))
+        context = {'profiles_list': page.object_list, 'page': page}
         return render(request, 'profiles/index.html', context)
+    except InvalidCursor:
+        log.warning("Curseur de pagination des profils invalide - 404")
+        raise Http404("Page de profils introuvable")
     except Exception as e:
-        logger.error(f"Erreur lors de la récupération des profils: {str(e)}")
+        log.error("Erreur lors de la récupération des profils: %s", e)
         raise
 
 
+@conditional_page(profile_validators)
 def profile(request, username):
     """
     Affiche les détails d'un profil spécifique.
@@ -45,18 +119,21 @@ def profile(request, username):
     Returns:
         HttpResponse: La réponse HTTP avec le template rendu.
     """
-    logger.info(f"Accès au profil '{username}' par {request.META.get('REMOTE_ADDR', 'IP inconnue')}")
+    log = logger.endpoint('profiles:profile')
+    log.info("Accès au profil '%s' par %s", username, request.META.get('REMOTE_ADDR', 'IP inconnue'))
 
     try:
-        profile = get_object_or_404(Profile, user__username=username)
-        logger.info(f"Profil de {username} récupéré avec succès")
+        profile = get_object_or_404(
+            Profile.objects.select_related('user').only(*DETAIL_FIELDS), user__username=username
+        )
+        log.info("Profil de %s récupéré avec succès", username)
 
         context = {'profile': profile}
         return render(request, 'profiles/profile.html', context)
 
     except Http404:
-        logger.warning(f"Profil '{username}' introuvable - 404")
+        log.warning("Profil '%s' introuvable - 404", username)
         raise
     except Exception as e:
-        logger.error(f"Erreur lors de la récupération du profil {username}: {str(e)}")
+        log.error("Erreur lors de la récupération du profil %s: %s", username, e)
         raise
@@ -2,11 +2,178 @@
 Configuration du service Sentry pour le monitoring et la gestion d'erreurs.
 """
 import os
+import random
+import sys
+from datetime import datetime
+from functools import lru_cache
+from urllib.parse import urlsplit
+
 import sentry_sdk
 from sentry_sdk.integrations.django import DjangoIntegration
 from sentry_sdk.integrations.logging import LoggingIntegration
 
 
+# Statuts de transaction considérés comme des erreurs serveur
+ERROR_STATUSES = {'internal_error', 'unknown_error', 'unavailable', 'data_loss'}
+
+
+def parse_rates(value):
+    """
+    Parse une liste de taux « nom=taux » séparés par des virgules.
+
+    Args:
+        value (str): Ex: "lettings:index=0.01,profiles:profile=0.2".
+
+    Returns:
+        dict: {nom: taux (float)}.
+
+    Raises:
+        ValueError: Si une entrée n'est pas au format nom=taux.
+    """
+    rates = {}
+    for item in filter(None, (part.strip() for part in value.split(','))):
+        name, rate = item.rsplit('=', 1)
+        rates[name.strip()] = float(rate)
+    return rates
+
+
+def _to_datetime(value):
+    """
+    Convertit un horodatage d'événement Sentry (datetime, float ou ISO) en datetime.
+    """
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, (int, float)):
+        return datetime.utcfromtimestamp(value)
+    return datetime.fromisoformat(str(value).replace('Z', '+00:00')).replace(tzinfo=None)
+
+
+class RouteTracesSampler:
+    """
+    Échantillonneur de traces Sentry par nom d'URL Django.
+
+    La décision est prise au début de la transaction (traces_sampler) à partir
+    du chemin de la requête, résolu en nom d'URL (ex: 'lettings:index'). Les
+    routes statiques et de santé (ignored_prefixes) reçoivent ignored_rate.
+
+    Les requêtes lentes et en erreur ne sont connues qu'à la fin : si
+    candidate_rate est supérieur au taux de la route, une part candidate_rate
+    des transactions est tracée, puis before_send_transaction ne conserve que
+    les transactions en erreur, celles plus lentes que slow_ms, et une part
+    rate / candidate_rate des autres. Le taux effectif reste donc celui de la
+    route, mais les requêtes lentes et en erreur sont vues au taux candidate_rate.
+
+    Args:
+        default_rate (float): Taux des routes sans taux spécifique.
+        route_rates (dict): Taux par nom d'URL.
+        ignored_prefixes (iterable[str]): Préfixes de chemins à (quasi) ignorer.
+        ignored_rate (float): Taux appliqué aux chemins ignorés.
+        candidate_rate (float): Taux minimal de tracé pour détecter lenteurs et erreurs.
+        slow_ms (float): Seuil de durée (ms) au-delà duquel une transaction est gardée.
+    """
+
+    def __init__(self, default_rate, route_rates=None, ignored_prefixes=(),
+                 ignored_rate=0.0, candidate_rate=0.0, slow_ms=1000.0):
+        self.default_rate = default_rate
+        self.route_rates = route_rates or {}
+        self.ignored_prefixes = tuple(ignored_prefixes)
+        self.ignored_rate = ignored_rate
+        self.candidate_rate = candidate_rate
+        self.slow_ms = slow_ms
+        # Les chemins sont en nombre borné (ids inclus) : la résolution d'URL
+        # n'est faite qu'une fois par chemin récent.
+        self.rate_for_path = lru_cache(maxsize=1024)(self._rate_for_path)
+
+    def _rate_for_path(self, path):
+        """
+        Retourne le taux de la route correspondant au chemin donné.
+        """
+        if path.startswith(self.ignored_prefixes):
+            return self.ignored_rate
+        from django.urls import Resolver404, resolve
+        try:
+            view_name = resolve(path).view_name
+        except Resolver404:
+            return self.default_rate
+        return self.route_rates.get(view_name, self.default_rate)
+
+    def __call__(self, sampling_context):
+        """
+        Décide du taux d'échantillonnage d'une transaction (option traces_sampler).
+
+        Args:
+            sampling_context (dict): Contexte fourni par Sentry, dont
+                'parent_sampled' et 'wsgi_environ' ou 'asgi_scope'.
+
+        Returns:
+            float: Probabilité de tracer la transaction.
+        """
+        parent_sampled = sampling_context.get('parent_sampled')
+        if parent_sampled is not None:
+            # Respecte la décision d'un service amont (trace distribuée)
+            return float(parent_sampled)
+
+        if 'wsgi_environ' in sampling_context:
+            path = sampling_context['wsgi_environ'].get('PATH_INFO', '')
+        elif 'asgi_scope' in sampling_context:
+            path = sampling_context['asgi_scope'].get('path', '')
+        else:
+            return self.default_rate
+
+        rate = self.rate_for_path(path)
+        if path.startswith(self.ignored_prefixes):
+            return rate
+        return max(rate, self.candidate_rate)
+
+    def before_send_transaction(self, event, hint):
+        """
+        Écarte les transactions rapides et sans erreur tracées en surplus.
+
+        Args:
+            event (dict): Transaction Sentry prête à être envoyée.
+            hint (dict): Informations complémentaires (non utilisées).
+
+        Returns:
+            dict | None: L'événement à envoyer, ou None pour l'écarter.
+        """
+        path = urlsplit(event.get('request', {}).get('url', '')).path
+        rate = self.rate_for_path(path) if path else self.default_rate
+        if self.candidate_rate <= rate or path.startswith(self.ignored_prefixes):
+            return event
+
+        status = event.get('contexts', {}).get('trace', {}).get('status')
+        status_code = str(event.get('tags', {}).get('http.status_code', ''))
+        if status in ERROR_STATUSES or status_code.startswith('5'):
+            return event
+
+        try:
+            duration = _to_datetime(event['timestamp']) - _to_datetime(event['start_timestamp'])
+            if duration.total_seconds() * 1000 >= self.slow_ms:
+                return event
+        except (KeyError, TypeError, ValueError):
+            return event
+
+        return event if random.random() < rate / self.candidate_rate else None
+
+
+def build_traces_sampler():
+    """
+    Construit le RouteTracesSampler à partir des variables d'environnement.
+
+    Returns:
+        RouteTracesSampler: Échantillonneur configuré.
+    """
+    ignored = os.getenv('SENTRY_TRACES_IGNORED_PREFIXES', '/static/,/favicon.ico,/health')
+    return RouteTracesSampler(
+        default_rate=float(os.getenv('SENTRY_TRACES_SAMPLE_RATE', '0.1')),
+        route_rates=parse_rates(os.getenv('SENTRY_TRACES_ROUTE_RATES', '')),
+        ignored_prefixes=[prefix for prefix in ignored.split(',') if prefix],
+        ignored_rate=float(os.getenv('SENTRY_TRACES_IGNORED_RATE', '0.0')),
+        candidate_rate=float(os.getenv('SENTRY_TRACES_CANDIDATE_RATE', '0.0')),
+        slow_ms=float(os.getenv('SENTRY_TRACES_SLOW_MS', '1000')),
+    )
+
+
 def configure_sentry():
     """
     Configure et initialise Sentry SDK pour le monitoring et la gestion d'erreurs.
@@ -25,7 +192,19 @@ def configure_sentry():
                                  Valeurs: WARNING, ERROR, CRITICAL
                                  Défaut: ERROR
         SENTRY_TRACES_SAMPLE_RATE (str): Taux d'échantillonnage des traces (0.0-1.0)
+                                        des routes sans taux spécifique
                                         Défaut: 0.1 (10% des transactions)
+        SENTRY_TRACES_ROUTE_RATES (str): Taux par nom d'URL, séparés par des virgules
+                                        Exemple: "lettings:index=0.01,home=0.05"
+        SENTRY_TRACES_IGNORED_PREFIXES (str): Préfixes de chemins statiques et de santé
+                                             Défaut: /static/,/favicon.ico,/health
+        SENTRY_TRACES_IGNORED_RATE (str): Taux des chemins ignorés. Défaut: 0.0
+        SENTRY_TRACES_CANDIDATE_RATE (str): Taux de tracé des requêtes lentes et en
+                                           erreur (voir RouteTracesSampler)
+                                           Défaut: 0.0 (désactivé)
+        SENTRY_TRACES_SLOW_MS (str): Seuil d'une requête lente en ms. Défaut: 1000
+        SENTRY_MIDDLEWARE_SPANS (str): Spans par middleware (true/false). Défaut: true
+        SENTRY_SIGNALS_SPANS (str): Spans par receiver de signal (true/false). Défaut: true
         SENTRY_ENVIRONMENT (str): Environnement de déploiement
                                  Exemples: development, staging, production
                                  Défaut: development
@@ -61,7 +240,7 @@ def configure_sentry():
     sentry_dsn = os.getenv('SENTRY_DSN')
 
     if not sentry_dsn:
-        print("SENTRY_DSN non configuré - Sentry désactivé")
+        print("SENTRY_DSN non configuré - Sentry désactivé", file=sys.stderr)
         return
 
     # Configuration de l'intégration de logging avec Sentry
@@ -70,19 +249,22 @@ def configure_sentry():
         event_level=os.getenv('SENTRY_EVENT_LEVEL', 'ERROR')
     )
 
+    traces_sampler = build_traces_sampler()
+
     # Initialisation de Sentry
     sentry_sdk.init(
         dsn=sentry_dsn,
         integrations=[
             DjangoIntegration(
                 transaction_style='url',
-                middleware_spans=True,
-                signals_spans=True,
+                middleware_spans=os.getenv('SENTRY_MIDDLEWARE_SPANS', 'True').lower() == 'true',
+                signals_spans=os.getenv('SENTRY_SIGNALS_SPANS', 'True').lower() == 'true',
             ),
             sentry_logging,
         ],
-        # Taux d'échantillonnage des traces de performance
-        traces_sample_rate=float(os.getenv('SENTRY_TRACES_SAMPLE_RATE', '0.1')),
+        # Échantillonnage des traces de performance par route
+        traces_sampler=traces_sampler,
+        before_send_transaction=traces_sampler.before_send_transaction,
 
         # Envoi des informations personnelles (activé par défaut selon Sentry)
         send_default_pii=True,
@@ -94,4 +276,4 @@ def configure_sentry():
         release=os.getenv('SENTRY_RELEASE', 'unknown'),
     )
 
-    print(f"Sentry configuré pour l'environnement: {os.getenv('SENTRY_ENVIRONMENT', 'development')}")
+    print(f"Sentry configuré pour l'environnement: {os.getenv('SENTRY_ENVIRONMENT', 'development')}", file=sys.stderr)